@@ -0,0 +1,14 @@
+"""Loopback HTTP/1.1 keep-alive server used by the benchmarks: the bundled
+offline LLM stub (``integra stub``), which also answers GET on any path."""
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from integra_ai.ai.stub import StubServer
+
+
+@contextmanager
+def stub_server(latency: float = 0.0, **options: Any) -> Iterator[str]:
+    """Serve Gemini- and OpenAI-shaped replies after ``latency`` seconds; see ``StubServer``."""
+    with StubServer(latency=latency, **options) as srv:
+        yield srv.url
@@ -0,0 +1,62 @@
+"""Throughput of the sync vs async generation engines against a stub Gemini.
+
+Run: python -m benchmarks.bench_async_engine [N] [CONCURRENCY] [LATENCY_S]
+"""
+from __future__ import annotations
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from integra_ai.ai import gemini
+from integra_ai.core.http import close_async_client, http_config
+from benchmarks._stub import stub_server
+
+
+async def _fan_out(prompts: list[str], concurrency: int) -> None:
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(p: str) -> None:
+        async with gate:
+            await gemini.generate_code_async(p, api_key="bench")
+
+    try:
+        await asyncio.gather(*(one(p) for p in prompts))
+    finally:
+        await close_async_client()
+
+
+def main(n: int = 200, concurrency: int = 20, latency: float = 0.05) -> None:
+    prompts = [f"prompt {i}" for i in range(n)]
+    cfg = http_config()
+    cfg.gemini_key_rpm = cfg.gemini_key_tpm = float("inf")  # the stub has no quota to protect
+    with stub_server(latency=latency) as url:
+        gemini.GEMINI_BASE_URL = url
+
+        start = time.perf_counter()
+        for p in prompts[: max(1, n // 10)]:
+            gemini.generate_code(p, api_key="bench")
+        seq = max(1, n // 10) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(lambda p: gemini.generate_code(p, api_key="bench"), prompts))
+        threaded = n / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        asyncio.run(_fan_out(prompts, concurrency))
+        async_rps = n / (time.perf_counter() - start)
+
+    print(f"stub latency {latency * 1000:.0f} ms, {n} prompts, concurrency {concurrency}")
+    print(f"sync sequential:        {seq:8.1f} req/s")
+    print(f"sync thread pool:       {threaded:8.1f} req/s")
+    print(f"async (one event loop): {async_rps:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 200,
+        int(args[1]) if len(args) > 1 else 20,
+        float(args[2]) if len(args) > 2 else 0.05,
+    )
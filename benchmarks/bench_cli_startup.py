@@ -0,0 +1,89 @@
+"""CLI startup budget: import time of integra_ai.cli and wall-clock per command.
+
+Run: python -m benchmarks.bench_cli_startup [RUNS]
+Exits non-zero when a measurement exceeds its budget in startup_budget.json
+or when a heavy module is imported just to start the CLI.
+"""
+from __future__ import annotations
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BUDGET_PATH = Path(__file__).with_name("startup_budget.json")
+
+COMMANDS = {
+    "--help": ["--help"],
+    "list": ["list"],
+    "ai --help": ["ai", "--help"],
+    "test --help": ["test", "--help"],
+}
+
+# Modules that must stay out of `import integra_ai.cli`
+HEAVY_MODULES = ("requests", "rich.console", "dotenv", "sqlite3", "integra_ai.ai.gemini", "httpx")
+
+
+def import_time_ms(cwd: str) -> float:
+    """Cumulative ``-X importtime`` of integra_ai.cli, in milliseconds."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import integra_ai.cli"],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    ).stderr
+    for line in out.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == "integra_ai.cli":
+            return int(parts[1]) / 1000
+    raise RuntimeError("integra_ai.cli not found in -X importtime output")
+
+
+def heavy_imports(cwd: str) -> list[str]:
+    code = f"import sys, integra_ai.cli; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True).stdout
+    return [m for m in out.strip().split(",") if m]
+
+
+def wall_ms(args: list[str], cwd: str, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "integra_ai.cli", *args], cwd=cwd, capture_output=True, check=False)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def measure(runs: int = 5) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as cwd:
+        env_cwd = os.path.abspath(cwd)
+        results = {"import integra_ai.cli": statistics.median(import_time_ms(env_cwd) for _ in range(runs))}
+        for label, args in COMMANDS.items():
+            results[f"integra {label}"] = wall_ms(args, env_cwd, runs)
+        heavy = heavy_imports(env_cwd)
+        leftovers = sorted(p.name for p in Path(cwd).iterdir())
+    return {"results": results, "heavy_imports": heavy, "side_effect_paths": leftovers}
+
+
+def main(runs: int = 5) -> int:
+    budget = json.loads(BUDGET_PATH.read_text(encoding="utf-8"))
+    data = measure(runs)
+    failed = False
+    for label, ms in data["results"].items():
+        limit = budget.get(label)
+        over = limit is not None and ms > limit
+        failed |= over
+        print(f"{label:<28} {ms:8.1f} ms  (budget {limit} ms){'  OVER BUDGET' if over else ''}")
+    if data["heavy_imports"]:
+        failed = True
+        print(f"heavy modules imported at startup: {', '.join(data['heavy_imports'])}")
+    # `integra list` in an empty dir must not create project directories or logs
+    if data["side_effect_paths"]:
+        failed = True
+        print(f"startup created paths: {', '.join(data['side_effect_paths'])}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5))
@@ -0,0 +1,30 @@
+"""Runs the micro-benchmark shipped inside the generated Python client
+against the loopback stub: unpooled requests vs pooled session vs async.
+
+Run: python -m benchmarks.bench_generated_client [N] [LATENCY_S]
+"""
+from __future__ import annotations
+import sys
+import types
+
+from integra_ai.core.generator import render_python_client
+from benchmarks._stub import stub_server
+
+
+def load_client(base_url: str) -> types.ModuleType:
+    module = types.ModuleType("generated_client")
+    exec(compile(render_python_client(base_url=base_url), "generated_client.py", "exec"), module.__dict__)
+    return module
+
+
+def main(n: int = 300, latency: float = 0.0) -> None:
+    with stub_server(latency) as url:
+        client = load_client(url)
+        print(f"{n} GETs, stub latency {latency * 1000:.0f} ms")
+        for label, ms in client.bench("/", n).items():
+            print(f"{label:20} {ms:8.3f} ms/call")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 300, float(args[1]) if len(args) > 1 else 0.0)
@@ -0,0 +1,34 @@
+"""Per-call connection setup vs the pooled keep-alive session.
+
+Run: python -m benchmarks.bench_http_session [N]
+"""
+from __future__ import annotations
+import sys
+import time
+
+import requests
+
+from integra_ai.core.http import build_session
+from benchmarks._stub import stub_server
+
+
+def _timed(fn, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1000
+
+
+def main(n: int = 500) -> None:
+    with stub_server() as url:
+        session = build_session()
+        session.get(url)  # warm the pool
+        fresh = _timed(lambda: requests.get(url, timeout=5), n)
+        pooled = _timed(lambda: session.get(url, timeout=5), n)
+    print(f"requests.get (new connection): {fresh:.3f} ms/call")
+    print(f"pooled session (keep-alive):   {pooled:.3f} ms/call")
+    print(f"speedup: {fresh / pooled:.2f}x over {n} calls")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
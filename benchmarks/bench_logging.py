@@ -0,0 +1,102 @@
+"""Request latency under concurrent load: no logging vs a synchronous
+FileHandler vs the queue pipeline from ``integra_ai.core.logger``.
+
+Run: python -m benchmarks.bench_logging [REQUESTS] [THREADS]
+"""
+from __future__ import annotations
+import logging
+import logging.handlers
+import queue
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from flask import Flask
+
+from integra_ai.core.loadtest import percentile
+from integra_ai.core.logger import RotatingGzipFileHandler, json_formatter
+
+LINES_PER_REQUEST = 5
+
+
+def _app(log: logging.Logger) -> Flask:
+    app = Flask(__name__)
+
+    @app.get("/work")
+    def work():
+        for i in range(LINES_PER_REQUEST):
+            log.info("step done", extra={"step": i, "model": "gemini-1.5-flash", "status": 200})
+        return {"ok": True}
+
+    return app
+
+
+def _run(app: Flask, requests: int, threads: int) -> list[float]:
+    latencies: list[float] = []
+    lock = threading.Lock()
+    per_thread = requests // threads
+
+    def worker() -> None:
+        client = app.test_client()
+        local = []
+        for _ in range(per_thread):
+            t0 = time.perf_counter()
+            client.get("/work")
+            local.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return sorted(latencies)
+
+
+def _logger(name: str, handler: logging.Handler | None) -> logging.Logger:
+    log = logging.getLogger(f"bench.{name}")
+    log.propagate = False
+    log.setLevel(logging.INFO if handler else logging.CRITICAL)
+    if handler:
+        log.addHandler(handler)
+    return log
+
+
+def main(requests: int = 2000, threads: int = 8) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        def file_handler(name: str) -> logging.Handler:
+            h = RotatingGzipFileHandler(Path(tmp) / f"{name}.log", max_bytes=10 * 1024 * 1024, backup_count=2, interval=0)
+            h.setFormatter(json_formatter())
+            return h
+
+        q: queue.SimpleQueue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(q, file_handler("queue"))
+        queued = logging.handlers.QueueHandler(q)
+        queued.setFormatter(logging.Formatter("%(message)s"))
+        listener.start()
+
+        cases = {
+            "no logging": _logger("off", None),
+            "sync FileHandler": _logger("sync", file_handler("sync")),
+            "queue pipeline": _logger("queue", queued),
+        }
+        print(f"{requests} requests, {threads} threads, {LINES_PER_REQUEST} log lines/request")
+        for label, log in cases.items():
+            app = _app(log)
+            _run(app, threads * 10, threads)  # warm up
+            start = time.perf_counter()
+            lat = _run(app, requests, threads)
+            wall = time.perf_counter() - start
+            print(
+                f"{label:18} p50 {percentile(lat, 50):6.2f} ms  p99 {percentile(lat, 99):6.2f} ms"
+                f"  {len(lat) / wall:8.1f} req/s"
+            )
+        listener.stop()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
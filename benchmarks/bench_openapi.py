@@ -0,0 +1,91 @@
+"""Client generation from a synthetic OpenAPI spec, offline: cold parse
+(no spec cache) vs cached parse, JSON vs YAML, Python vs Node output.
+
+Run: python -m benchmarks.bench_openapi [OPERATIONS]
+"""
+from __future__ import annotations
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from integra_ai.core.openapi import parse_spec, render_openapi_client
+
+
+def synthetic_spec(operations: int) -> dict[str, Any]:
+    """A spec with ``operations`` operations over ``operations // 4`` resources."""
+    schemas: dict[str, Any] = {}
+    paths: dict[str, Any] = {}
+    for i in range(max(1, operations // 4)):
+        name = f"Resource{i}"
+        schemas[name] = {
+            "type": "object",
+            "required": ["id"],
+            "properties": {
+                "id": {"type": "integer"},
+                "name": {"type": "string"},
+                "tags": {"type": "array", "items": {"type": "string"}},
+                "status": {"type": "string", "enum": ["active", "archived"]},
+                "parent": {"$ref": "#/components/schemas/Resource0"},
+            },
+        }
+        ref = {"$ref": f"#/components/schemas/{name}"}
+        ok = {"description": "ok", "content": {"application/json": {"schema": ref}}}
+        paths[f"/r{i}"] = {
+            "get": {
+                "operationId": f"listResource{i}",
+                "parameters": [{"name": "limit", "in": "query", "schema": {"type": "integer"}}],
+                "responses": {"200": {"description": "ok", "content": {"application/json": {"schema": {"type": "array", "items": ref}}}}},
+            },
+            "post": {
+                "operationId": f"createResource{i}",
+                "requestBody": {"required": True, "content": {"application/json": {"schema": ref}}},
+                "responses": {"201": ok},
+            },
+        }
+        paths[f"/r{i}/{{id}}"] = {
+            "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}],
+            "get": {"operationId": f"getResource{i}", "responses": {"200": ok}},
+            "delete": {"operationId": f"deleteResource{i}", "responses": {"204": {"description": "gone"}}},
+        }
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Synthetic", "version": "1.0"},
+        "servers": [{"url": "https://api.example.com"}],
+        "components": {"securitySchemes": {"bearer": {"type": "http", "scheme": "bearer"}}, "schemas": schemas},
+        "paths": paths,
+    }
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main(operations: int = 500) -> None:
+    import yaml
+
+    spec = synthetic_spec(operations)
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {"json": Path(tmp) / "spec.json", "yaml": Path(tmp) / "spec.yaml"}
+        files["json"].write_text(json.dumps(spec), encoding="utf-8")
+        files["yaml"].write_text(yaml.safe_dump(spec, sort_keys=False), encoding="utf-8")
+        print(f"{operations} operations, {len(spec['components']['schemas'])} schemas")
+        for fmt, path in files.items():
+            cache = Path(tmp) / f"cache-{fmt}"
+            cold = _time(lambda: parse_spec(path, cache_dir=cache))
+            parsed = parse_spec(path, cache_dir=cache)
+            warm = _time(lambda: parse_spec(path, cache_dir=cache))
+            for language in ("python", "node"):
+                render = _time(lambda: sum(len(b) for b in render_openapi_client(parsed, language)))
+                print(
+                    f"{fmt:4} {language:6} parse cold {cold:7.1f} ms  cached {warm:6.1f} ms"
+                    f"  render {render:6.1f} ms  total cold {cold + render:7.1f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:2]])
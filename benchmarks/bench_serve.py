@@ -0,0 +1,91 @@
+"""Flask dev server vs `integra serve` under the same load: the listing
+(catalog query + JSON) and job submission (config + jobs.db insert), in a
+throwaway workspace with 200 integrations.
+
+Run: python -m benchmarks.bench_serve [REQUESTS] [CONCURRENCY] [-- integra serve options]
+"""
+from __future__ import annotations
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator
+
+from integra_ai.core.loadtest import run_load_test
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait(port: int, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def _servers(workdir: Path, serve_args: list[str]) -> Iterator[tuple[str, str, subprocess.Popen]]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    commands = {
+        "flask run": lambda port: [sys.executable, "-m", "flask", "--app", "web.app", "run", "--port", str(port)],
+        "integra serve": lambda port: [sys.executable, "-m", "integra_ai.cli", "serve", "--port", str(port), *serve_args],
+    }
+    for label, command in commands.items():
+        port = _free_port()
+        proc = subprocess.Popen(command(port), cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            _wait(port, proc)
+            yield label, f"http://127.0.0.1:{port}", proc
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+
+def main(requests: int = 2000, concurrency: int = 16, serve_args: list[str] | None = None) -> None:
+    with tempfile.TemporaryDirectory(prefix="integra-bench-serve-") as d:
+        workdir = Path(d)
+        subprocess.run(
+            [sys.executable, "-c", "from integra_ai.core.storage import save_integration_metadata as s\n"
+             "for i in range(200): s(f'api-{i}', {'name': f'api-{i}', 'language': 'python'})"],
+            cwd=workdir, env=dict(os.environ, PYTHONPATH=str(ROOT)), check=True,
+        )
+        results: dict[str, dict[str, dict]] = {}
+        for label, url, _ in _servers(workdir, serve_args or []):
+            results[label] = {
+                "GET /api/integrations?limit=20": run_load_test(
+                    url, "/api/integrations?limit=20", "GET", {}, requests=requests, concurrency=concurrency,
+                ),
+                "POST /api/generate": run_load_test(
+                    url, "/api/generate", "POST", {}, requests=requests // 2, concurrency=concurrency,
+                    payload=lambda i: {"prompt": f"bench {i}", "name": f"bench-{i}"},
+                ),
+            }
+
+    dev, prod = results["flask run"], results["integra serve"]
+    print(f"{'endpoint':32} {'flask run':>14} {'integra serve':>14} {'speedup':>8}   p99 (ms)")
+    for endpoint, report in dev.items():
+        a, b = report["throughput_rps"], prod[endpoint]["throughput_rps"]
+        p99 = f"{report['latency_ms']['p99']:.1f} -> {prod[endpoint]['latency_ms']['p99']:.1f}"
+        print(f"{endpoint:32} {a:10.1f} rps {b:10.1f} rps {b / a:7.2f}x   {p99}")
+    print(f"{requests} requests, concurrency {concurrency}, {os.cpu_count()} CPU(s)")
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    extra = argv[argv.index("--") + 1:] if "--" in argv else []
+    positional = argv[: argv.index("--")] if "--" in argv else argv
+    main(*(int(a) for a in positional), serve_args=extra)
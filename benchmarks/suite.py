@@ -0,0 +1,314 @@
+"""Benchmark suite: CLI startup, storage, code generation and the web API,
+compared against a stored baseline.
+
+Run: python -m benchmarks.suite [--only GROUP ...] [--quick] [--save] [--threshold 0.25] [--output FILE]
+
+Each benchmark returns ``{metric: {"value": v, "unit": u}}``; the unit gives
+the direction (ms/s: lower is better, ops/s, req/s, MB/s: higher is better).
+Without ``--save`` the results are compared with ``baseline.json`` and the
+run exits non-zero when any metric is worse than the baseline by more than
+``--threshold`` (a fraction). Everything runs in a throwaway directory; the
+web benchmarks serve ``web/app.py`` on loopback with the bundled stub as Gemini.
+"""
+from __future__ import annotations
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+LOWER_IS_BETTER = {"ms", "s"}
+HIGHER_IS_BETTER = {"ops/s", "req/s", "MB/s"}
+
+SIZES = (10, 1_000, 10_000)
+QUICK_SIZES = (10, 1_000)
+
+BENCHMARKS: dict[str, Callable[[bool], dict[str, dict[str, Any]]]] = {}
+
+
+def benchmark(group: str):
+    def register(fn: Callable[[bool], dict[str, dict[str, Any]]]):
+        BENCHMARKS[group] = fn
+        return fn
+    return register
+
+
+def metric(value: float, unit: str, threshold: float | None = None) -> dict[str, Any]:
+    """One measurement; ``threshold`` loosens the comparison for noisy metrics."""
+    m = {"value": round(value, 3), "unit": unit}
+    if threshold is not None:
+        m["threshold"] = threshold
+    return m
+
+
+def _median_ms(fn: Callable[[], Any], repeat: int = 15) -> float:
+    """Median wall time of ``fn`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+@contextmanager
+def _workspace(name: str) -> Iterator[Path]:
+    """Run in a fresh directory: ``.integra/`` is cwd-relative and the
+    integrations dir is resolved at import, so both are redirected."""
+    from integra_ai.core import storage
+
+    cwd, saved = os.getcwd(), storage.INTEGRATIONS_DIR
+    with tempfile.TemporaryDirectory(prefix=f"integra-bench-{name}-") as d:
+        os.chdir(d)
+        storage.INTEGRATIONS_DIR = Path(d) / "integrations"
+        try:
+            yield Path(d)
+        finally:
+            storage.INTEGRATIONS_DIR = saved
+            os.chdir(cwd)
+
+
+@benchmark("cli")
+def bench_cli(quick: bool) -> dict[str, dict[str, Any]]:
+    from benchmarks.bench_cli_startup import measure
+
+    data = measure(3 if quick else 5)
+    return {f"cli.{label}": metric(ms, "ms") for label, ms in data["results"].items()}
+
+
+def _seed_integrations(root: Path, n: int) -> None:
+    languages, auths = ("python", "javascript", "go"), ("none", "bearer", "api_key")
+    for i in range(n):
+        d = root / f"api-{i:05d}"
+        d.mkdir(parents=True)
+        meta = {"language": languages[i % 3], "auth": auths[i % 3], "base_url": f"https://api{i % 50}.example.com"}
+        (d / "integration.json").write_text(json.dumps(meta), encoding="utf-8")
+
+
+@benchmark("storage")
+def bench_storage(quick: bool) -> dict[str, dict[str, Any]]:
+    from integra_ai.core import storage
+
+    out = {}
+    for n in QUICK_SIZES if quick else SIZES:
+        with _workspace(f"storage-{n}") as d:
+            _seed_integrations(d / "integrations", n)
+            out[f"storage.reindex[{n}]"] = metric(_median_ms(storage.reindex, repeat=3), "ms")
+            out[f"storage.list_integrations[{n}]"] = metric(_median_ms(storage.list_integrations), "ms")
+            out[f"storage.query_integrations[{n}]"] = metric(
+                _median_ms(lambda: storage.query_integrations(language="python", limit=50)), "ms"
+            )
+    return out
+
+
+@benchmark("generator")
+def bench_generator(quick: bool) -> dict[str, dict[str, Any]]:
+    from integra_ai.core.generator import render_python_client, save_generated_code
+
+    n = 100 if quick else 300
+    body = "def endpoint(**params):\n    return params\n" * 200  # ~8 KB
+    out = {}
+    with _workspace("generator"):
+        contents = [f"# version {i}\n{body}" for i in range(n)]
+        start = time.perf_counter()
+        for i, content in enumerate(contents):
+            save_generated_code(f"api-{i % 10}", "python", content)
+        elapsed = time.perf_counter() - start
+        out["generator.save_generated_code"] = metric(n / elapsed, "ops/s")
+        out["generator.save_generated_code.throughput"] = metric(sum(map(len, contents)) / elapsed / 1e6, "MB/s")
+        # Same content again: skipped by the content-addressed store
+        start = time.perf_counter()
+        for i, content in enumerate(contents):
+            save_generated_code(f"api-{i % 10}", "python", content)
+        out["generator.save_generated_code.duplicate"] = metric(n / (time.perf_counter() - start), "ops/s")
+
+    renders = 500 if quick else 2000
+    start = time.perf_counter()
+    for i in range(renders):
+        render_python_client(f"https://api{i}.example.com", "token")
+    out["generator.render_python_client"] = metric(renders / (time.perf_counter() - start), "ops/s")
+    return out
+
+
+@contextmanager
+def _web_server() -> Iterator[str]:
+    """``web/app.py`` on loopback through werkzeug's threaded server."""
+    from werkzeug.serving import make_server
+
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    from web.app import app
+
+    srv = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{srv.server_port}"
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+def _web_metrics(prefix: str, report: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    ok = sum(c for s, c in report["status_codes"].items() if s.isdigit() and int(s) < 400)
+    if ok != report["requests"]:
+        raise RuntimeError(f"{prefix}: unexpected statuses {report['status_codes']}")
+    return {
+        f"{prefix}.p50": metric(report["latency_ms"]["p50"], "ms"),
+        f"{prefix}.p99": metric(report["latency_ms"]["p99"], "ms", threshold=1.0),  # tail latency on a shared box
+        f"{prefix}.rps": metric(report["throughput_rps"], "req/s"),
+    }
+
+
+@benchmark("web")
+def bench_web(quick: bool) -> dict[str, dict[str, Any]]:
+    from integra_ai.ai import gemini, providers
+    from integra_ai.ai.stub import StubServer
+    from integra_ai.core import storage
+    from integra_ai.core.http import http_config
+    from integra_ai.core.loadtest import run_load_test
+
+    n, concurrency = (100, 8) if quick else (400, 16)
+    for name in ("werkzeug", "integra_ai"):  # per-request INFO lines would dominate the output
+        logging.getLogger(name).setLevel(logging.WARNING)
+    out: dict[str, dict[str, Any]] = {}
+    saved_url, saved_key = gemini.GEMINI_BASE_URL, os.environ.get("GEMINI_API_KEY")
+    with _workspace("web") as d, StubServer(latency=0.02) as stub, _web_server() as base:
+        cfg = http_config()
+        cfg.gemini_key_rpm = cfg.gemini_key_tpm = float("inf")  # the stub has no quota to protect
+        gemini.GEMINI_BASE_URL = stub.url
+        os.environ["GEMINI_API_KEY"] = "bench"
+        providers.set_provider(providers.GeminiProvider())
+        try:
+            _seed_integrations(d / "integrations", 1_000)
+            storage.reindex()
+            out.update(_web_metrics("web.api_integrations", run_load_test(
+                base, "/api/integrations?limit=50", requests=n, concurrency=concurrency,
+            )))
+            # Enqueue only; distinct prompts so no request joins another's job
+            out.update(_web_metrics("web.api_generate", run_load_test(
+                base, "/api/generate", "POST", payload=lambda i: {"prompt": f"bench {i}", "name": f"gen-{i}"},
+                requests=n, concurrency=concurrency,
+            )))
+            # Full round trip: stub Gemini, streamed to the client and saved
+            out.update(_web_metrics("web.api_generate_stream", run_load_test(
+                base, "/api/generate/stream", "POST", payload=lambda i: {"prompt": f"stream {i}", "name": f"stream-{i % 20}"},
+                requests=n // 2, concurrency=concurrency,
+            )))
+        finally:
+            providers.set_provider(None)
+            gemini.GEMINI_BASE_URL = saved_url
+            if saved_key is None:
+                os.environ.pop("GEMINI_API_KEY", None)
+            else:
+                os.environ["GEMINI_API_KEY"] = saved_key
+    return out
+
+
+def compare(
+    baseline: dict[str, dict[str, Any]], current: dict[str, dict[str, Any]], threshold: float
+) -> list[dict[str, Any]]:
+    """Metrics worse than the baseline by more than ``threshold`` (a fraction),
+    or by more than the metric's own ``threshold`` when that is looser.
+
+    Metrics missing from either side or with an unknown unit are ignored.
+    """
+    regressions = []
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            continue
+        change = (cur["value"] - base["value"]) / base["value"]
+        allowed = max(threshold, cur.get("threshold", 0.0))
+        if cur["unit"] in LOWER_IS_BETTER:
+            worse = change > allowed
+        elif cur["unit"] in HIGHER_IS_BETTER:
+            worse = -change > allowed
+        else:
+            continue
+        if worse:
+            regressions.append({"metric": name, "baseline": base["value"], "current": cur["value"],
+                                "unit": cur["unit"], "change": round(change, 3)})
+    return regressions
+
+
+def machine_info() -> dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run(groups: list[str] | None = None, quick: bool = False) -> dict[str, dict[str, Any]]:
+    results: dict[str, dict[str, Any]] = {}
+    for group, fn in BENCHMARKS.items():
+        if groups and group not in groups:
+            continue
+        print(f"[{group}]", flush=True)
+        for name, m in fn(quick).items():
+            print(f"  {name:<48} {m['value']:>12.3f} {m['unit']}", flush=True)
+            results[name] = m
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="groups to run (default: all)")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations and no 10k storage case")
+    parser.add_argument("--save", action="store_true", help=f"write the results to {BASELINE_PATH.name}")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed regression, as a fraction")
+    parser.add_argument("--output", type=Path, help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args.only, args.quick)
+    doc = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "quick": args.quick,
+        "metrics": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    if args.save:
+        # Merge so a partial run (--only) refreshes just its own metrics
+        if args.baseline.exists():
+            old = json.loads(args.baseline.read_text(encoding="utf-8"))
+            doc["metrics"] = {**old.get("metrics", {}), **results}
+        args.baseline.write_text(json.dumps(doc, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --save first")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("quick", False) != args.quick:
+        # Iteration counts and concurrency differ between the modes
+        print(f"baseline was recorded {'with' if baseline.get('quick') else 'without'} --quick; not comparable")
+        return 2
+    if baseline.get("machine") != machine_info():
+        print("warning: baseline was recorded on a different machine/interpreter")
+    regressions = compare(baseline.get("metrics", {}), results, args.threshold)
+    for r in regressions:
+        print(f"REGRESSION {r['metric']}: {r['baseline']} -> {r['current']} {r['unit']} ({r['change']:+.0%})")
+    print(f"{len(regressions)} regression(s) over {args.threshold:.0%} across {len(results)} metrics")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+from __future__ import annotations
+import asyncio
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterable, Iterator
+
+from ..core.artifacts import ai_inputs, find_unchanged
+from ..core.cache import cache_key
+from ..core.generator import save_generated_code
+from ..core.http import close_async_client
+from ..core.logger import get_logger
+from ..core.metrics import COALESCED
+from ..core.ratelimit import ModelSlots, TokenBucket
+from ..core.singleflight import SingleFlight, flight_key
+from ..core.storage import save_integration_metadata, slugify
+from .gemini import default_model, generate_code_coalesced
+from .providers import generate_code_async
+from .repair import validated_code
+
+log = get_logger(__name__)
+
+
+def normalize_job(item: Any) -> dict[str, Any]:
+    """A batch item is a prompt string or a dict with ``prompt`` and optional
+    ``name``, ``language`` and ``model``."""
+    if isinstance(item, str):
+        item = {"prompt": item}
+    if not isinstance(item, dict) or not item.get("prompt"):
+        raise ValueError(f"invalid batch item (prompt is required): {item!r}")
+    return item
+
+
+def load_manifest(path: Path) -> list[dict[str, Any]]:
+    """Read batch items from a JSONL file or a YAML list (or ``items:`` key)."""
+    text = Path(path).read_text(encoding="utf-8")
+    if Path(path).suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise RuntimeError("PyYAML is required for YAML manifests (pip install pyyaml)") from e
+        data = yaml.safe_load(text) or []
+        if isinstance(data, dict):
+            data = data.get("items", [])
+    else:
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [normalize_job(item) for item in data]
+
+
+def _job_fields(job: dict[str, Any], language: str) -> tuple[str, str, str]:
+    model = job.get("model") or default_model()
+    name = job.get("name") or slugify(job["prompt"])[:40]
+    return model, name, job.get("language") or language
+
+
+def _item_key(prompt: str, model: str, name: str, lang: str) -> str:
+    return cache_key(flight_key(prompt, model), name, lang)
+
+
+def _save(name: str, lang: str, code: str, inputs: dict[str, Any]) -> str:
+    # Validation runs on the shared process pool, so concurrent items don't queue behind each other
+    code, report = validated_code(code, lang, model=inputs["model"])
+    path = save_generated_code(name, lang, code, inputs)
+    meta: dict[str, Any] = {"name": name, "language": lang, "generated_file": str(path)}
+    if report is not None:
+        meta["validation"] = report
+    save_integration_metadata(name, meta)
+    return str(path)
+
+
+def run_batch(
+    jobs: Iterable[dict[str, Any]],
+    workers: int = 4,
+    per_model: int = 4,
+    rpm: float | None = 60.0,
+    language: str = "python",
+    cache: bool = True,
+    engine: str = "thread",
+    force: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """Generate and save every job on a bounded thread pool.
+
+    Results are yielded as each job finishes (not in input order); every
+    result carries its ``index`` in the input. Network calls share one
+    token bucket of ``rpm`` requests/minute so the batch stays inside the
+    Gemini quota; cache hits don't consume it. With ``engine="async"`` the
+    jobs are fanned out on one event loop instead (see ``run_batch_async``)
+    and ``workers`` bounds the number of in-flight calls. Items whose
+    integration was already generated from the same inputs are skipped
+    (``unchanged`` in the result) unless ``force`` is set.
+    """
+    if engine == "async":
+        yield from iterate_async(lambda: run_batch_async(jobs, workers, per_model, rpm, language, cache, force))
+        return
+    if engine != "thread":
+        raise ValueError(f"unknown batch engine: {engine!r}")
+
+    limiter = TokenBucket(rate=rpm / 60.0) if rpm else None
+    # Taken around each provider call, once model="auto" is resolved to a concrete model
+    slots = ModelSlots(per_model)
+    items = SingleFlight()
+
+    def run(index: int, job: dict[str, Any]) -> dict[str, Any]:
+        model, name, lang = _job_fields(job, language)
+        result: dict[str, Any] = {"index": index, "name": name, "model": model}
+        start = time.perf_counter()
+
+        def generate_and_save() -> tuple[str, bool, bool]:
+            inputs = ai_inputs(job["prompt"], model, lang)
+            unchanged = None if force else find_unchanged(name, inputs)
+            if unchanged is not None:
+                return str(unchanged), False, True
+            code, joined = generate_code_coalesced(job["prompt"], model=model, cache=cache, limiter=limiter, slots=slots)
+            return _save(name, lang, code, inputs), joined, False
+
+        try:
+            # Duplicate items share one call and one file; other processes can join the call
+            (path, joined, unchanged), shared = items.do(_item_key(job["prompt"], model, name, lang), generate_and_save)
+            result.update(ok=True, generated_file=path, coalesced=joined or shared, unchanged=unchanged)
+        except Exception as e:  # noqa: BLE001 - one bad item must not stop the batch
+            log.error("Batch item failed", extra={"integration": name, "model": model, "error": str(e)})
+            result.update(ok=False, error=str(e))
+        result["elapsed"] = round(time.perf_counter() - start, 3)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="integra-batch") as pool:
+        futures = [pool.submit(run, i, job) for i, job in enumerate(jobs)]
+        try:
+            for fut in as_completed(futures):
+                yield fut.result()
+        finally:
+            # Consumer went away (e.g. HTTP client disconnected): drop queued work
+            for fut in futures:
+                fut.cancel()
+
+
+async def run_batch_async(
+    jobs: Iterable[dict[str, Any]],
+    concurrency: int = 4,
+    per_model: int = 4,
+    rpm: float | None = 60.0,
+    language: str = "python",
+    cache: bool = True,
+    force: bool = False,
+) -> AsyncIterator[dict[str, Any]]:
+    """Event-loop counterpart of ``run_batch`` built on ``generate_code_async``.
+
+    File writes are pushed to a worker thread so disk I/O never blocks the loop.
+    """
+    limiter = TokenBucket(rate=rpm / 60.0) if rpm else None
+    gate = asyncio.Semaphore(max(1, concurrency))
+    slots = ModelSlots(per_model)
+    inflight: dict[str, asyncio.Future] = {}
+
+    async def generate_and_save(job: dict[str, Any], model: str, name: str, lang: str) -> str:
+        inputs = ai_inputs(job["prompt"], model, lang)
+        unchanged = None if force else await asyncio.to_thread(find_unchanged, name, inputs)
+        if unchanged is not None:
+            return str(unchanged)
+        async with gate:
+            code = await generate_code_async(job["prompt"], model=model, cache=cache, limiter=limiter, slots=slots)
+        return await asyncio.to_thread(_save, name, lang, code, inputs)
+
+    async def run(index: int, job: dict[str, Any]) -> dict[str, Any]:
+        model, name, lang = _job_fields(job, language)
+        result: dict[str, Any] = {"index": index, "name": name, "model": model}
+        key = _item_key(job["prompt"], model, name, lang)
+        start = time.perf_counter()
+        try:
+            shared = inflight.get(key)
+            if shared is not None:
+                # Duplicate item: wait for the one already running
+                COALESCED.inc(scope="task")
+                result.update(ok=True, generated_file=await asyncio.shield(shared), coalesced=True)
+            else:
+                fut = inflight[key] = asyncio.get_running_loop().create_future()
+                try:
+                    fut.set_result(await generate_and_save(job, model, name, lang))
+                except asyncio.CancelledError:
+                    fut.cancel()
+                    raise
+                except Exception as e:
+                    fut.set_exception(e)
+                    fut.exception()  # retrieved here; followers re-raise it themselves
+                    raise
+                finally:
+                    del inflight[key]
+                result.update(ok=True, generated_file=fut.result(), coalesced=False)
+        except Exception as e:  # noqa: BLE001 - one bad item must not stop the batch
+            log.error("Batch item failed", extra={"integration": name, "model": model, "error": str(e)})
+            result.update(ok=False, error=str(e))
+        result["elapsed"] = round(time.perf_counter() - start, 3)
+        return result
+
+    tasks = [asyncio.create_task(run(i, job)) for i, job in enumerate(jobs)]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+_DONE = object()
+
+
+def iterate_async(factory) -> Iterator[Any]:
+    """Drive an async iterator on a private event loop in a background thread
+    and hand its items to synchronous callers (CLI loops, Flask responses)."""
+    q: queue.Queue = queue.Queue()
+    stop = threading.Event()
+
+    async def pump() -> None:
+        try:
+            async for item in factory():
+                q.put(item)
+                if stop.is_set():
+                    break
+        except BaseException as e:  # noqa: BLE001 - re-raised in the consumer
+            q.put(e)
+        finally:
+            await close_async_client()
+            q.put(_DONE)
+
+    t = threading.Thread(target=asyncio.run, args=(pump(),), name="integra-async", daemon=True)
+    t.start()
+    try:
+        while (item := q.get()) is not _DONE:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,261 @@
+from __future__ import annotations
+import io
+import math
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, TextIO, Union
+
+from ..core.config import AppConfig
+from ..core.logger import get_logger
+from ..core.ratelimit import ModelSlots, TokenBucket
+
+log = get_logger(__name__)
+
+# Rough average for English prose, code and JSON with Gemini's tokenizer
+CHARS_PER_TOKEN = 4
+# Read size for file input; lines longer than a chunk are cut, so memory stays
+# proportional to chunk size x parallelism, not to the document.
+_READ_BLOCK = 64 * 1024
+
+# Markdown headings, OpenAPI path keys ("  /users/{id}:") and "GET /path" lines
+_SECTION_START = re.compile(
+    r"^(#{1,6}\s|\s{0,4}[\"']?/[\w{}\-./]*[\"']?\s*:\s*\{?\s*$|(GET|POST|PUT|PATCH|DELETE|HEAD|OPTIONS)\s+/)",
+    re.IGNORECASE,
+)
+
+Source = Union[str, Path, TextIO]
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _open(source: Source) -> TextIO:
+    if isinstance(source, Path):
+        return source.open("r", encoding="utf-8", errors="replace")
+    if isinstance(source, str):
+        return io.StringIO(source)
+    return source
+
+
+def iter_lines(source: Source, max_chars: int) -> Iterator[str]:
+    """Lines of ``source`` (keeping ``\\n``), with any line longer than
+    ``max_chars`` (e.g. minified JSON) cut into pieces."""
+    f = _open(source)
+    try:
+        pending = ""
+        while block := f.read(_READ_BLOCK):
+            pending += block
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield from _cut(line + "\n", max_chars)
+            if len(pending) > max_chars:
+                yield from _cut(pending[:max_chars], max_chars)
+                pending = pending[max_chars:]
+        if pending:
+            yield from _cut(pending, max_chars)
+    finally:
+        if f is not source:
+            f.close()
+
+
+def _cut(text: str, size: int) -> Iterator[str]:
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+def iter_sections(lines: Iterable[str], max_chars: int) -> Iterator[str]:
+    """Group lines into sections starting at headings or endpoint definitions;
+    a section is cut at ``max_chars`` if no boundary comes first."""
+    buf: list[str] = []
+    size = 0
+    for line in lines:
+        if buf and (_SECTION_START.match(line) or size + len(line) > max_chars):
+            yield "".join(buf)
+            buf, size = [], 0
+        buf.append(line)
+        size += len(line)
+    if buf:
+        yield "".join(buf)
+
+
+def iter_chunks(source: Source, max_tokens: int) -> Iterator[str]:
+    """Pack consecutive sections of ``source`` into chunks of at most ``max_tokens``."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    buf: list[str] = []
+    size = 0
+    for section in iter_sections(iter_lines(source, max_chars), max_chars):
+        if buf and size + len(section) > max_chars:
+            yield "".join(buf)
+            buf, size = [], 0
+        buf.append(section)
+        size += len(section)
+    if buf:
+        yield "".join(buf)
+
+
+def split_instruction(prompt: str, limit: int = 2000) -> tuple[str, str]:
+    """Separate the request from pasted documentation: the first paragraph
+    (up to ``limit`` characters) is the instruction, the rest is the doc."""
+    head, sep, rest = prompt.partition("\n\n")
+    if not sep or len(head) > limit:
+        return prompt[:limit], prompt[limit:]
+    return head, rest
+
+
+def _map_prompt(instruction: str, language: str, i: int, chunk: str) -> str:
+    return (
+        f"{instruction}\n\n"
+        "The API documentation is too large for a single request, so it was split into parts. "
+        f"This is part {i}. Generate {language} client code covering only the endpoints described "
+        "in this part. Reply with code only.\n\n"
+        f"--- documentation part {i} ---\n{chunk}"
+    )
+
+
+def _reduce_prompt(instruction: str, language: str, parts: list[str]) -> str:
+    body = "\n\n".join(f"--- part {i} ---\n{p}" for i, p in enumerate(parts, 1))
+    return (
+        f"{instruction}\n\n"
+        f"Below are partial {language} clients, each generated from a different part of the same API "
+        "documentation. Merge them into one cohesive client: a single set of imports, shared helpers "
+        "and authentication defined once, and every endpoint method kept. Reply with code only.\n\n"
+        f"{body}"
+    )
+
+
+_FENCE = re.compile(r"^```[\w+-]*\s*$")
+_IMPORT = re.compile(r"^(import\s|from\s\S+\simport\s|const\s+\S+\s*=\s*require\(|import\s.*\sfrom\s)")
+
+
+def merge_locally(parts: list[str], language: str = "python") -> str:
+    """Concatenate partial clients without a model call: code fences dropped,
+    top-level imports hoisted and de-duplicated."""
+    comment = "//" if language == "node" else "#"
+    imports: dict[str, None] = {}
+    bodies = []
+    for i, part in enumerate(parts, 1):
+        lines = []
+        for line in part.splitlines():
+            if _FENCE.match(line.strip()):
+                continue
+            if _IMPORT.match(line):
+                imports.setdefault(line.rstrip(), None)
+            else:
+                lines.append(line)
+        bodies.append(f"{comment} --- part {i} ---\n" + "\n".join(lines).strip() + "\n")
+    return "\n".join(imports) + "\n\n\n" + "\n\n".join(bodies)
+
+
+def _map_bounded(fn: Callable[[int, str], str], items: Iterable[str], workers: int) -> list[str]:
+    """Ordered ``fn(i, item)`` results on a pool, pulling at most ``2 * workers``
+    items from ``items`` ahead of completion."""
+    results: dict[int, str] = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="integra-chunk") as pool:
+        pending = {}
+        for i, item in enumerate(items, 1):
+            pending[pool.submit(fn, i, item)] = i
+            if len(pending) >= 2 * workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    results[pending.pop(fut)] = fut.result()
+        for fut in list(pending):
+            results[pending.pop(fut)] = fut.result()
+    return [results[i] for i in sorted(results)]
+
+
+def fits(text: str, model: str, max_tokens: int, remote: bool = False) -> bool:
+    """Whether ``text`` fits in ``max_tokens``; with ``remote`` a borderline
+    local estimate is settled by ``countTokens`` (cached)."""
+    estimate = estimate_tokens(text)
+    if not remote or estimate < max_tokens // 2 or estimate > max_tokens * 2:
+        return estimate <= max_tokens
+    from . import providers
+
+    try:
+        return providers.count_tokens(text, model=model) <= max_tokens
+    except Exception as e:  # noqa: BLE001 - fall back to the estimate
+        log.warning("countTokens failed, using local estimate", extra={"model": model, "error": str(e)})
+        return estimate <= max_tokens
+
+
+def generate_code_chunked(
+    prompt: str,
+    docs: Optional[Source] = None,
+    model: Optional[str] = None,
+    cache: bool = False,
+    limiter: Optional[TokenBucket] = None,
+    language: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    workers: Optional[int] = None,
+    api_key: Optional[str] = None,
+    slots: Optional[ModelSlots] = None,
+) -> str:
+    """Size-aware front end to ``generate_code``.
+
+    A prompt (plus ``docs``, a string, file path or text stream) that fits in
+    ``max_tokens`` is sent as-is; a stream is never read whole, so it always
+    goes through the chunker. Otherwise the documentation is split into
+    chunks along sections/endpoints, each chunk is generated in parallel
+    (map) and the partial clients are merged into one (reduce), by the model
+    in rounds while they fit in a request, locally otherwise. Defaults come
+    from ``prompt_*`` settings in ``AppConfig``.
+    """
+    # Imported here: keys (and through it gemini) take the token heuristic from this module
+    from . import gemini, providers
+
+    model = model or gemini.DEFAULT_MODEL
+    cfg = AppConfig.cached()
+    max_tokens = max_tokens or cfg.prompt_max_tokens
+    workers = max(1, workers or cfg.prompt_workers)
+    language = language or cfg.language
+    remote = cfg.prompt_token_count == "remote"
+
+    if docs is None:
+        if fits(prompt, model, max_tokens, remote):
+            return providers.generate_code(prompt, model=model, api_key=api_key, cache=cache, limiter=limiter, slots=slots)
+        instruction, docs = split_instruction(prompt)
+    else:
+        instruction = prompt
+        # Only a string or a small file is tried whole; a stream is chunked as it is read
+        if isinstance(docs, str) or (isinstance(docs, Path) and docs.stat().st_size <= max_tokens * CHARS_PER_TOKEN):
+            text = docs.read_text(encoding="utf-8") if isinstance(docs, Path) else docs
+            if fits(f"{prompt}\n\n{text}", model, max_tokens, remote):
+                return providers.generate_code(f"{prompt}\n\n{text}", model=model, api_key=api_key, cache=cache, limiter=limiter, slots=slots)
+            docs = text
+
+    if limiter is None and cfg.gemini_rpm:
+        limiter = TokenBucket(rate=cfg.gemini_rpm / 60.0)
+    # Room for the instruction and framing text around each chunk
+    chunk_tokens = max(256, max_tokens - estimate_tokens(instruction) - 200)
+
+    def generate(i: int, text: str) -> str:
+        # With model="auto" the router also picks by task (map chunks vs reduce)
+        return providers.generate_code(_map_prompt(instruction, language, i, text), model=model, api_key=api_key, cache=cache, limiter=limiter, slots=slots, task="map")
+
+    parts = _map_bounded(generate, iter_chunks(docs, chunk_tokens), workers)
+    log.info("Generated prompt in chunks", extra={"model": model, "chunks": len(parts)})
+    if len(parts) == 1:
+        return parts[0]
+    if cfg.prompt_reduce == "local":
+        return merge_locally(parts, language)
+
+    while len(parts) > 1:
+        groups: list[list[str]] = [[]]
+        for part in parts:
+            if groups[-1] and sum(estimate_tokens(p) for p in groups[-1]) + estimate_tokens(part) > chunk_tokens:
+                groups.append([])
+            groups[-1].append(part)
+        if len(groups) == len(parts):
+            # Partial clients too big to merge pairwise within one request
+            return merge_locally(parts, language)
+
+        def reduce(i: int, _: str, groups=groups) -> str:
+            group = groups[i - 1]
+            if len(group) == 1:
+                return group[0]
+            return providers.generate_code(_reduce_prompt(instruction, language, group), model=model, api_key=api_key, cache=cache, limiter=limiter, slots=slots, task="reduce")
+
+        parts = _map_bounded(reduce, ("" for _ in groups), workers)
+    return parts[0]
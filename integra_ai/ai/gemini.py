@@ -1,38 +1,58 @@
 from __future__ import annotations
+import json
 import os
+import time
 import requests
 import logging
-from typing import Optional
-from dotenv import load_dotenv
+from typing import Iterator, Optional, cast
+from ..core.config import load_env
 from ..core.logger import get_logger
+from ..core.cache import cache_key, get_response_cache
+from ..core.http import RETRY_STATUSES, SERVER_RETRY_STATUSES, async_request, get_session, http_config
+from ..core.metrics import GEMINI_LATENCY, GEMINI_TTFB, record_usage
+from ..core.ratelimit import ModelSlots, TokenBucket
+from .keys import KeyPool, configured_keys, estimate_tokens, key_pool, retry_after
 
-load_dotenv()
+load_env()
 log = get_logger(__name__)
 
 DEFAULT_MODEL = "gemini-1.5-flash" # Changed from "Generative Language API Key"
+# Not a Gemini model: hand the prompt to the router (ai/routing.py) to pick one
+AUTO_MODEL = "auto"
+# Overridable so benchmarks and offline runs can point at a local stub
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com").rstrip("/")
 
 
-def generate_code(prompt: str, api_key: Optional[str] = None, model: str = DEFAULT_MODEL) -> str:
-    """Generate code using Google Gemini API (Generative Language API).
+def default_model() -> str:
+    """Model used when a caller doesn't name one: ``model_default`` from the config."""
+    return http_config().model_default or DEFAULT_MODEL
 
-    Uses API key via query parameter (?key=) as per REST guidelines.
-    """
-    key = (api_key or os.getenv("GEMINI_API_KEY") or "").strip()
-    if not key:
-        raise RuntimeError("GEMINI_API_KEY not set in environment")
 
+def _api_version(model: str) -> str:
     # Determine API version based on the model
-    api_version = "v1beta"
     if model == "gemini-pro":
-        api_version = "v1"
+        return "v1"
+    return "v1beta"
 
-    url = f"https://generativelanguage.googleapis.com/{api_version}/models/{model}:generateContent"
 
-    headers = {
-        "Content-Type": "application/json",
-    }
-    params = {"key": key}
-    body = {
+def _resolve_key(api_key: Optional[str]) -> str:
+    keys = configured_keys(api_key)
+    if not keys:
+        raise RuntimeError("GEMINI_API_KEY not set in environment")
+    return keys[0][0]
+
+
+def _retry_statuses(pool: KeyPool) -> tuple[int, ...]:
+    # One key: let the transport wait out 429s. Several: fail fast and rotate.
+    return RETRY_STATUSES if len(pool) == 1 else SERVER_RETRY_STATUSES
+
+
+def _endpoint(model: str, method: str = "generateContent") -> str:
+    return f"{GEMINI_BASE_URL}/{_api_version(model)}/models/{model}:{method}"
+
+
+def _request_body(prompt: str) -> dict:
+    return {
         "contents": [
             {
                 "parts": [
@@ -44,28 +64,294 @@ def generate_code(prompt: str, api_key: Optional[str] = None, model: str = DEFAU
         ]
     }
 
-    log.info("Calling Gemini generateContent", extra={"model": model})
-    resp = requests.post(url, headers=headers, params=params, json=body, timeout=60)
-    try:
-        resp.raise_for_status()
-    except requests.HTTPError:
-        log.error("Gemini error", extra={"status": resp.status_code, "text": resp.text[:500]})
-        raise
 
-    data = resp.json()
+def _extract_text(data: dict) -> Optional[str]:
     # Best-effort extraction for v1beta
-    text = None
     try:
         cands = data.get("candidates", [])
         if cands:
             parts = cands[0].get("content", {}).get("parts", [])
             for part in parts:
                 if "text" in part:
-                    text = part["text"]
-                    break
+                    return part["text"]
     except Exception:  # noqa: BLE001
         pass
+    return None
 
+
+def _cache_lookup(prompt: str, model: str) -> tuple[str, Optional[str]]:
+    ck = cache_key(model, _api_version(model), prompt)
+    cached = get_response_cache().get(ck)
+    if cached is not None:
+        log.info("Gemini cache hit", extra={"model": model})
+    return ck, cached
+
+
+def _cache_store(ck: str, text: str, model: str) -> None:
+    get_response_cache().set(ck, text, meta={"model": model, "api_version": _api_version(model)})
+
+
+def generate_code(
+    prompt: str,
+    api_key: Optional[str] = None,
+    model: str = DEFAULT_MODEL,
+    cache: bool = False,
+    limiter: Optional[TokenBucket] = None,
+) -> str:
+    """Generate code using Google Gemini API (Generative Language API).
+
+    Uses API key via query parameter (?key=) as per REST guidelines.
+    With ``cache=True`` responses are served from / stored in the on-disk
+    response cache keyed by model, API version and prompt, so a warm call
+    needs neither network nor API key. ``limiter`` is only consulted when a
+    request actually goes out, so cache hits don't spend quota.
+    ``model="auto"`` routes the prompt with failover and hedging.
+    """
+    if model == AUTO_MODEL:
+        from . import routing
+
+        return routing.generate(prompt, api_key=api_key, cache=cache, limiter=limiter)
+    ck = None
+    if cache:
+        ck, cached = _cache_lookup(prompt, model)
+        if cached is not None:
+            return cached
+
+    pool = key_pool(api_key)
+    url = _endpoint(model)
+    headers = {
+        "Content-Type": "application/json",
+    }
+    body = _request_body(prompt)
+    tokens = estimate_tokens(prompt)
+
+    if limiter is not None:
+        limiter.acquire()
+
+    log.info("Calling Gemini generateContent", extra={"model": model})
+    session = get_session(_retry_statuses(pool), retry_post=True)
+    # A 429 benches that key and the call moves on to the next one with headroom
+    for _ in range(len(pool)):
+        lease = pool.acquire(tokens)
+        with GEMINI_LATENCY.time(model=model, method="generateContent", status="error") as labels:
+            resp = session.post(url, headers=headers, params={"key": lease.key}, json=body, timeout=http_config().gemini_timeout)
+            labels["status"] = resp.status_code
+        if resp.status_code != 429:
+            break
+        pool.rate_limited(lease, retry_after(resp.headers, resp.text))
+    try:
+        resp.raise_for_status()
+    except requests.HTTPError:
+        if resp.status_code != 429:
+            pool.settle(lease, result="error")
+        log.error("Gemini error", extra={"status": resp.status_code, "text": resp.text[:500]})
+        raise
+
+    data = resp.json()
+    pool.settle(lease, data)
+    record_usage(model, data)
+    text = _extract_text(data)
+    if not text:
+        return str(data)
+
+    if ck is not None:
+        _cache_store(ck, text, model)
+    return text
+
+
+def count_tokens(text: str, api_key: Optional[str] = None, model: str = DEFAULT_MODEL) -> int:
+    """Exact prompt size from ``:countTokens``; cached, since the count for a
+    given model and text never changes."""
+    if model == AUTO_MODEL:
+        model = DEFAULT_MODEL  # same tokenizer across the Gemini family
+    ck = cache_key("countTokens", model, _api_version(model), text)
+    cached = get_response_cache().get(ck)
+    if cached is not None:
+        return int(cached)
+
+    key = _resolve_key(api_key)
+    with GEMINI_LATENCY.time(model=model, method="countTokens", status="error") as labels:
+        resp = get_session(retry_post=True).post(
+            _endpoint(model, "countTokens"),
+            headers={"Content-Type": "application/json"},
+            params={"key": key},
+            json=_request_body(text),
+            timeout=http_config().gemini_timeout,
+        )
+        labels["status"] = resp.status_code
+    resp.raise_for_status()
+    total = int(resp.json().get("totalTokens", 0))
+    get_response_cache().set(ck, str(total), meta={"model": model, "method": "countTokens"})
+    return total
+
+
+def generate_code_coalesced(
+    prompt: str,
+    model: str = DEFAULT_MODEL,
+    cache: bool = False,
+    limiter: Optional[TokenBucket] = None,
+    slots: Optional[ModelSlots] = None,
+) -> tuple[str, bool]:
+    """``generate_code`` with single-flight deduplication.
+
+    Identical concurrent requests (same model, prompt equal up to whitespace)
+    in this process or in other local processes wait on one Gemini call and
+    share its text. Oversized prompts go through ``generate_code_chunked``;
+    ``slots`` caps concurrent calls per (routed) model. Returns
+    ``(text, coalesced)``.
+    """
+    from ..core.singleflight import coalesce, flight_key
+    from .chunking import generate_code_chunked
+
+    return coalesce(
+        flight_key(prompt, model),
+        lambda: generate_code_chunked(prompt, model=model, cache=cache, limiter=limiter, slots=slots),
+    )
+
+
+async def generate_code_async(
+    prompt: str,
+    api_key: Optional[str] = None,
+    model: str = DEFAULT_MODEL,
+    cache: bool = False,
+    limiter: Optional[TokenBucket] = None,
+) -> str:
+    """Async twin of ``generate_code`` on the pooled ``httpx.AsyncClient``.
+
+    Same caching, key resolution, logging and text extraction; HTTP errors
+    are logged and raised as ``httpx.HTTPStatusError``. Requires ``httpx``.
+    """
+    if model == AUTO_MODEL:
+        from . import routing
+
+        return await routing.generate_async(prompt, api_key=api_key, cache=cache, limiter=limiter)
+    ck = None
+    if cache:
+        ck, cached = _cache_lookup(prompt, model)
+        if cached is not None:
+            return cached
+
+    pool = key_pool(api_key)
+    tokens = estimate_tokens(prompt)
+    if limiter is not None:
+        await limiter.acquire_async()
+
+    log.info("Calling Gemini generateContent", extra={"model": model, "engine": "async"})
+    for _ in range(len(pool)):
+        lease = await pool.acquire_async(tokens)
+        with GEMINI_LATENCY.time(model=model, method="generateContent", status="error") as labels:
+            resp = await async_request(
+                "POST", _endpoint(model),
+                retry_statuses=_retry_statuses(pool),
+                retry_post=True,
+                headers={"Content-Type": "application/json"},
+                params={"key": lease.key},
+                json=_request_body(prompt),
+                timeout=http_config().gemini_timeout,
+            )
+            labels["status"] = resp.status_code
+        if resp.status_code != 429:
+            break
+        pool.rate_limited(lease, retry_after(resp.headers, resp.text))
+    if resp.is_error:
+        if resp.status_code != 429:
+            pool.settle(lease, result="error")
+        log.error("Gemini error", extra={"status": resp.status_code, "text": resp.text[:500]})
+        resp.raise_for_status()
+
+    data = resp.json()
+    pool.settle(lease, data)
+    record_usage(model, data)
+    text = _extract_text(data)
     if not text:
-        text = str(data)
+        return str(data)
+
+    if ck is not None:
+        _cache_store(ck, text, model)
     return text
+
+
+def stream_generate_code(
+    prompt: str,
+    api_key: Optional[str] = None,
+    model: str = DEFAULT_MODEL,
+    limiter: Optional[TokenBucket] = None,
+) -> Iterator[str]:
+    """Yield generated text chunks as they arrive from ``:streamGenerateContent``.
+
+    Uses the SSE flavour (``alt=sse``) so each ``data:`` line is one JSON
+    chunk. Time to first chunk and total time are logged. Streaming bypasses
+    the response cache, since caching would require buffering the whole text.
+    """
+    if model == AUTO_MODEL:
+        from . import routing
+
+        yield from routing.stream(prompt, api_key=api_key, limiter=limiter)
+        return
+    pool = key_pool(api_key)
+    url = _endpoint(model, "streamGenerateContent")
+    headers = {
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream",
+    }
+    tokens = estimate_tokens(prompt)
+
+    if limiter is not None:
+        limiter.acquire()
+
+    log.info("Calling Gemini streamGenerateContent", extra={"model": model})
+    start = time.perf_counter()
+    status: object = "error"
+    try:
+        session = get_session(_retry_statuses(pool), retry_post=True)
+        # A 429 arrives before any chunk, so the stream can still move to another key
+        for attempt in range(len(pool)):
+            lease = pool.acquire(tokens)
+            resp = session.post(
+                url, headers=headers, params={"key": lease.key, "alt": "sse"}, json=_request_body(prompt),
+                timeout=http_config().gemini_timeout, stream=True,
+            )
+            status = resp.status_code
+            if resp.status_code != 429:
+                break
+            pool.rate_limited(lease, retry_after(resp.headers, resp.text))
+            if attempt + 1 < len(pool):
+                resp.close()
+        with resp:
+            try:
+                resp.raise_for_status()
+            except requests.HTTPError:
+                if resp.status_code != 429:
+                    pool.settle(lease, result="error")
+                log.error("Gemini error", extra={"status": resp.status_code, "text": resp.text[:500]})
+                raise
+
+            chunks = 0
+            last: dict = {}
+            # SSE is UTF-8 by definition; requests would assume ISO-8859-1 for text/*
+            resp.encoding = "utf-8"
+            for line in cast(Iterator[str], resp.iter_lines(decode_unicode=True)):
+                if not line or not line.startswith("data:"):
+                    continue
+                try:
+                    last = json.loads(line[5:].strip())
+                except ValueError:
+                    log.warning("Skipping malformed Gemini stream chunk", extra={"model": model})
+                    continue
+                text = _extract_text(last)
+                if not text:
+                    continue
+                if chunks == 0:
+                    ttfb = time.perf_counter() - start
+                    GEMINI_TTFB.observe(ttfb, model=model)
+                    log.info("Gemini stream first chunk after %.0f ms", ttfb * 1000, extra={"model": model, "ttfb_ms": ttfb * 1000})
+                chunks += 1
+                yield text
+            # usageMetadata in the final chunk holds the totals for the whole stream
+            pool.settle(lease, last)
+            record_usage(model, last)
+    finally:
+        GEMINI_LATENCY.observe(time.perf_counter() - start, model=model, method="streamGenerateContent", status=status)
+
+    total_ms = (time.perf_counter() - start) * 1000
+    log.info("Gemini stream finished: %d chunks in %.0f ms", chunks, total_ms, extra={"model": model, "total_ms": total_ms})
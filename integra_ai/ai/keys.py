@@ -0,0 +1,266 @@
+from __future__ import annotations
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from ..core.config import load_env
+from ..core.http import http_config
+from ..core.logger import get_logger
+from ..core.metrics import GEMINI_KEY_COOLDOWN, GEMINI_KEY_LIMIT, GEMINI_KEY_REQUESTS, GEMINI_KEY_USAGE
+# Same heuristic as the chunker; corrected with usageMetadata once the call returns
+from .chunking import estimate_tokens  # noqa: F401 - re-exported
+
+log = get_logger(__name__)
+
+# Gemini quotas are per minute; usage is tracked over a sliding window of this size
+WINDOW = 60.0
+# Cooldown for a 429 that carries neither Retry-After nor a RetryInfo delay
+DEFAULT_COOLDOWN = WINDOW
+
+_DELAY = re.compile(r"^(\d+(?:\.\d+)?)s$")
+
+
+def mask(key: str) -> str:
+    """Label for logs, metrics and the CLI; never the whole key."""
+    return "…" + key[-4:]
+
+
+def retry_after(headers: Any, body: str = "") -> Optional[float]:
+    """Seconds to back off from a 429: ``Retry-After`` or Gemini's ``RetryInfo.retryDelay``."""
+    value = headers.get("Retry-After") if headers is not None else None
+    try:
+        if value:
+            return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        details = json.loads(body).get("error", {}).get("details", [])
+    except (AttributeError, TypeError, ValueError):
+        return None
+    for d in details if isinstance(details, list) else []:
+        m = _DELAY.match(str(d.get("retryDelay", ""))) if isinstance(d, dict) else None
+        if m:
+            return float(m.group(1))
+    return None
+
+
+@dataclass
+class KeyLease:
+    """One call's claim on a key; ``tokens`` is the estimate charged up-front."""
+
+    key: str
+    tokens: int
+    _entry: list = field(repr=False, default_factory=list)
+
+
+class _KeyState:
+    def __init__(self, key: str, rpm: float, tpm: float) -> None:
+        self.key = key
+        self.label = mask(key)
+        self.rpm = rpm
+        self.tpm = tpm
+        self.calls: deque[list] = deque()  # [started, tokens] per call inside the window
+        self.tokens = 0
+        self.cooldown_until = 0.0
+        self.last_used = 0.0
+
+    def prune(self, now: float) -> None:
+        while self.calls and self.calls[0][0] <= now - WINDOW:
+            self.tokens -= self.calls.popleft()[1]
+
+    def headroom(self) -> float:
+        return min(1 - len(self.calls) / self.rpm, 1 - self.tokens / self.tpm)
+
+    def fits(self, tokens: int, now: float) -> bool:
+        if now < self.cooldown_until or len(self.calls) + 1 > self.rpm:
+            return False
+        # A prompt larger than the whole budget still goes out once the window is empty
+        return self.tokens + tokens <= self.tpm or not self.calls
+
+    def ready_in(self, now: float) -> float:
+        if now < self.cooldown_until:
+            return self.cooldown_until - now
+        return self.calls[0][0] + WINDOW - now if self.calls else 0.0
+
+
+class KeyPool:
+    """Gemini API keys with per-key requests/minute and tokens/minute budgets.
+
+    ``acquire`` hands out the key with the most headroom left in the current
+    minute, waiting when every key is spent or cooling down after a 429.
+    Usage is published to the ``integra_gemini_key_*`` metrics.
+    """
+
+    def __init__(self, specs: list[tuple[str, float, float]], max_wait: float = 300.0) -> None:
+        if not specs:
+            raise ValueError("at least one API key is required")
+        self._keys = [_KeyState(k, rpm, tpm) for k, rpm, tpm in specs]
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        for state in self._keys:
+            GEMINI_KEY_LIMIT.set(state.rpm, key=state.label, budget="rpm")
+            GEMINI_KEY_LIMIT.set(state.tpm, key=state.label, budget="tpm")
+            self._publish(state, time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @staticmethod
+    def _publish(state: _KeyState, now: float) -> None:
+        GEMINI_KEY_USAGE.set(len(state.calls), key=state.label, budget="rpm")
+        GEMINI_KEY_USAGE.set(state.tokens, key=state.label, budget="tpm")
+        GEMINI_KEY_COOLDOWN.set(round(max(0.0, state.cooldown_until - now), 3), key=state.label)
+
+    def _take_or_wait(self, tokens: int) -> tuple[Optional[KeyLease], float]:
+        now = time.monotonic()
+        with self._lock:
+            for state in self._keys:
+                state.prune(now)
+            ready = [s for s in self._keys if s.fits(tokens, now)]
+            if not ready:
+                return None, max(0.01, min(s.ready_in(now) for s in self._keys))
+            state = max(ready, key=lambda s: (s.headroom(), -s.last_used))
+            entry = [now, tokens]
+            state.calls.append(entry)
+            state.tokens += tokens
+            state.last_used = now
+            self._publish(state, now)
+        return KeyLease(state.key, tokens, entry), 0.0
+
+    def _check_wait(self, waited: float, wait: float) -> None:
+        if waited + wait > self.max_wait:
+            raise RuntimeError(f"no Gemini API key has quota left within {self.max_wait:.0f}s")
+        if not waited:
+            log.info("All Gemini API keys are at their budget; waiting %.1fs", wait, extra={"keys": len(self)})
+
+    def acquire(self, tokens: int = 0) -> KeyLease:
+        """Block until some key can take a call of ``tokens`` tokens, then charge it."""
+        waited = 0.0
+        while True:
+            lease, wait = self._take_or_wait(tokens)
+            if lease is not None:
+                return lease
+            self._check_wait(waited, wait)
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, tokens: int = 0) -> KeyLease:
+        """Like ``acquire`` but yields to the event loop while waiting."""
+        waited = 0.0
+        while True:
+            lease, wait = self._take_or_wait(tokens)
+            if lease is not None:
+                return lease
+            self._check_wait(waited, wait)
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def _state(self, key: str) -> _KeyState:
+        return next(s for s in self._keys if s.key == key)
+
+    def settle(self, lease: KeyLease, data: Optional[dict] = None, result: str = "ok") -> None:
+        """Replace the estimate with ``usageMetadata.totalTokenCount`` and count the outcome."""
+        state = self._state(lease.key)
+        used = int(((data or {}).get("usageMetadata") or {}).get("totalTokenCount") or lease.tokens)
+        with self._lock:
+            state.tokens += used - lease._entry[1]
+            lease._entry[1] = used
+            self._publish(state, time.monotonic())
+        GEMINI_KEY_REQUESTS.inc(key=state.label, result=result)
+
+    def rate_limited(self, lease: KeyLease, delay: Optional[float] = None) -> None:
+        """Bench the key after a 429 until ``delay`` (default: a full window) has passed."""
+        state = self._state(lease.key)
+        now = time.monotonic()
+        delay = DEFAULT_COOLDOWN if delay is None else delay
+        with self._lock:
+            state.cooldown_until = max(state.cooldown_until, now + delay)
+            self._publish(state, now)
+        GEMINI_KEY_REQUESTS.inc(key=state.label, result="rate_limited")
+        log.warning("Gemini key %s rate-limited; cooling down %.0fs", state.label, delay, extra={"key": state.label})
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Per-key usage in the current window, for the CLI and ``/metrics``."""
+        now = time.monotonic()
+        with self._lock:
+            out = []
+            for s in self._keys:
+                s.prune(now)
+                self._publish(s, now)
+                out.append({
+                    "key": s.label,
+                    "requests": len(s.calls), "rpm": s.rpm,
+                    "tokens": s.tokens, "tpm": s.tpm,
+                    "cooldown": round(max(0.0, s.cooldown_until - now), 1),
+                    "headroom": round(max(0.0, s.headroom()), 3),
+                })
+            return out
+
+
+_pools: dict[tuple, KeyPool] = {}
+_pools_lock = threading.Lock()
+_file_cache: dict[str, tuple[int, list[tuple[str, float, float]]]] = {}
+
+
+def _parse_keys_file(path: Path, rpm: float, tpm: float) -> list[tuple[str, float, float]]:
+    """``KEY [rpm=N] [tpm=N]`` per line; blank lines and ``#`` comments ignored."""
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return []
+    cached = _file_cache.get(str(path))
+    if cached and cached[0] == mtime:
+        return cached[1]
+    specs = []
+    for lineno, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+        parts = line.split("#", 1)[0].split()
+        if not parts:
+            continue
+        opts = dict(p.split("=", 1) for p in parts[1:] if "=" in p)
+        key_rpm, key_tpm = float(opts.get("rpm", rpm)), float(opts.get("tpm", tpm))
+        if key_rpm <= 0 or key_tpm <= 0:
+            raise ValueError(f"{path}:{lineno}: rpm and tpm must be positive")
+        specs.append((parts[0], key_rpm, key_tpm))
+    _file_cache[str(path)] = (mtime, specs)
+    return specs
+
+
+def configured_keys(api_key: Optional[str] = None) -> list[tuple[str, float, float]]:
+    """``(key, rpm, tpm)`` for the pool: ``api_key`` alone if given, otherwise the
+    keys file, ``GEMINI_API_KEYS`` (comma/space separated) and ``GEMINI_API_KEY``."""
+    cfg = http_config()
+    rpm, tpm = cfg.gemini_key_rpm, cfg.gemini_key_tpm
+    if rpm <= 0 or tpm <= 0:
+        raise ValueError("gemini_key_rpm and gemini_key_tpm must be positive")
+    if api_key and api_key.strip():
+        return [(api_key.strip(), rpm, tpm)]
+    load_env()
+    specs = _parse_keys_file(Path(cfg.gemini_keys_file), rpm, tpm) if cfg.gemini_keys_file else []
+    listed = re.split(r"[\s,]+", os.getenv("GEMINI_API_KEYS") or "")
+    single = (os.getenv("GEMINI_API_KEY") or "").strip()
+    seen = {k for k, _, _ in specs}
+    for key in [*listed, single]:
+        if key and key not in seen:
+            seen.add(key)
+            specs.append((key, rpm, tpm))
+    return specs
+
+
+def key_pool(api_key: Optional[str] = None) -> KeyPool:
+    """Process-wide pool for the configured keys; usage survives across calls."""
+    specs = configured_keys(api_key)
+    if not specs:
+        raise RuntimeError("GEMINI_API_KEY not set in environment")
+    ident = tuple(specs)
+    with _pools_lock:
+        pool = _pools.get(ident)
+        if pool is None:
+            pool = _pools[ident] = KeyPool(specs, max_wait=http_config().gemini_key_max_wait)
+        return pool
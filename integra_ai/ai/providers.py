@@ -0,0 +1,254 @@
+from __future__ import annotations
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+
+import requests
+
+from ..core.cache import cache_key, get_response_cache
+from ..core.config import load_env
+from ..core.http import async_request, get_session, http_config
+from ..core.logger import get_logger
+from ..core.metrics import LLM_LATENCY
+from ..core.ratelimit import ModelSlots, TokenBucket, model_slot, model_slot_async
+from . import gemini
+from .keys import estimate_tokens
+
+log = get_logger(__name__)
+
+_provider: Optional["Provider"] = None
+
+
+class Provider(ABC):
+    """An LLM backend: text in, generated code out, whole or streamed."""
+
+    name = ""
+
+    @abstractmethod
+    def generate(
+        self, prompt: str, model: str, api_key: Optional[str] = None, cache: bool = False,
+        limiter: Optional[TokenBucket] = None,
+    ) -> str: ...
+
+    @abstractmethod
+    async def generate_async(
+        self, prompt: str, model: str, api_key: Optional[str] = None, cache: bool = False,
+        limiter: Optional[TokenBucket] = None,
+    ) -> str: ...
+
+    @abstractmethod
+    def stream(
+        self, prompt: str, model: str, api_key: Optional[str] = None, limiter: Optional[TokenBucket] = None,
+    ) -> Iterator[str]: ...
+
+    def count_tokens(self, text: str, model: str) -> int:
+        return estimate_tokens(text)
+
+
+class GeminiProvider(Provider):
+    """Google Gemini through ``ai/gemini.py`` (key pool, metrics, cache)."""
+
+    name = "gemini"
+
+    def generate(self, prompt, model, api_key=None, cache=False, limiter=None):
+        return gemini.generate_code(prompt, api_key=api_key, model=model, cache=cache, limiter=limiter)
+
+    async def generate_async(self, prompt, model, api_key=None, cache=False, limiter=None):
+        return await gemini.generate_code_async(prompt, api_key=api_key, model=model, cache=cache, limiter=limiter)
+
+    def stream(self, prompt, model, api_key=None, limiter=None):
+        return gemini.stream_generate_code(prompt, api_key=api_key, model=model, limiter=limiter)
+
+    def count_tokens(self, text, model):
+        return gemini.count_tokens(text, model=model)
+
+
+class OpenAICompatibleProvider(Provider):
+    """Any server implementing ``POST /v1/chat/completions`` (llama.cpp,
+    vLLM, Ollama, the bundled stub). ``base_url`` includes the ``/v1`` prefix."""
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, timeout: float = 120.0, name: str = "openai") -> None:
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.name = name
+
+    def _request(self, prompt: str, model: str, api_key: Optional[str], stream: bool = False) -> dict:
+        key = api_key or self.api_key
+        headers = {"Content-Type": "application/json"}
+        if key:
+            headers["Authorization"] = f"Bearer {key}"
+        body = {"model": model, "messages": [{"role": "user", "content": prompt}], "stream": stream}
+        return {"headers": headers, "json": body, "timeout": self.timeout}
+
+    def _cache_key(self, prompt: str, model: str) -> str:
+        return cache_key(self.name, self.base_url, model, prompt)
+
+    @staticmethod
+    def _text(data: dict) -> str:
+        try:
+            return data["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError):
+            return str(data)
+
+    def generate(self, prompt, model, api_key=None, cache=False, limiter=None):
+        ck = self._cache_key(prompt, model) if cache else None
+        if ck is not None and (cached := get_response_cache().get(ck)) is not None:
+            return cached
+        if limiter is not None:
+            limiter.acquire()
+        log.info("Calling %s chat completions", self.name, extra={"model": model, "provider": self.name})
+        with LLM_LATENCY.time(provider=self.name, model=model, method="chat", status="error") as labels:
+            resp = get_session(retry_post=True).post(f"{self.base_url}/chat/completions", **self._request(prompt, model, api_key))
+            labels["status"] = resp.status_code
+        try:
+            resp.raise_for_status()
+        except requests.HTTPError:
+            log.error("%s error", self.name, extra={"status": resp.status_code, "text": resp.text[:500]})
+            raise
+        text = self._text(resp.json())
+        if ck is not None:
+            get_response_cache().set(ck, text, meta={"model": model, "provider": self.name})
+        return text
+
+    async def generate_async(self, prompt, model, api_key=None, cache=False, limiter=None):
+        ck = self._cache_key(prompt, model) if cache else None
+        if ck is not None and (cached := get_response_cache().get(ck)) is not None:
+            return cached
+        if limiter is not None:
+            await limiter.acquire_async()
+        log.info("Calling %s chat completions", self.name, extra={"model": model, "provider": self.name, "engine": "async"})
+        with LLM_LATENCY.time(provider=self.name, model=model, method="chat", status="error") as labels:
+            resp = await async_request(
+                "POST", f"{self.base_url}/chat/completions", retry_post=True, **self._request(prompt, model, api_key)
+            )
+            labels["status"] = resp.status_code
+        if resp.is_error:
+            log.error("%s error", self.name, extra={"status": resp.status_code, "text": resp.text[:500]})
+            resp.raise_for_status()
+        text = self._text(resp.json())
+        if ck is not None:
+            get_response_cache().set(ck, text, meta={"model": model, "provider": self.name})
+        return text
+
+    def stream(self, prompt, model, api_key=None, limiter=None):
+        if limiter is not None:
+            limiter.acquire()
+        log.info("Calling %s chat completions (stream)", self.name, extra={"model": model, "provider": self.name})
+        start = time.perf_counter()
+        status: object = "error"
+        try:
+            with get_session(retry_post=True).post(
+                f"{self.base_url}/chat/completions", stream=True, **self._request(prompt, model, api_key, stream=True)
+            ) as resp:
+                status = resp.status_code
+                try:
+                    resp.raise_for_status()
+                except requests.HTTPError:
+                    log.error("%s error", self.name, extra={"status": resp.status_code, "text": resp.text[:500]})
+                    raise
+                for line in resp.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        delta = json.loads(data)["choices"][0].get("delta") or {}
+                    except (ValueError, KeyError, IndexError):
+                        log.warning("Skipping malformed stream chunk", extra={"model": model, "provider": self.name})
+                        continue
+                    if delta.get("content"):
+                        yield delta["content"]
+        finally:
+            LLM_LATENCY.observe(time.perf_counter() - start, provider=self.name, model=model, method="chat_stream", status=status)
+
+
+def build_provider(name: str) -> Provider:
+    """Provider by name, configured from ``AppConfig`` (``gemini``, ``openai`` or ``stub``)."""
+    cfg = http_config()
+    if name == "gemini":
+        return GeminiProvider()
+    if name == "openai":
+        load_env()
+        return OpenAICompatibleProvider(
+            cfg.openai_base_url, os.getenv(cfg.openai_api_key_env) if cfg.openai_api_key_env else None, cfg.openai_timeout
+        )
+    if name == "stub":
+        return OpenAICompatibleProvider(cfg.stub_url.rstrip("/") + "/v1", timeout=cfg.openai_timeout, name="stub")
+    raise ValueError(f"unknown LLM provider: {name!r} (expected gemini, openai or stub)")
+
+
+def get_provider() -> Provider:
+    """Process-wide provider: ``INTEGRA_PROVIDER`` or ``provider`` from the config."""
+    global _provider
+    if _provider is None:
+        load_env()
+        _provider = build_provider(os.getenv("INTEGRA_PROVIDER") or http_config().provider)
+    return _provider
+
+
+def set_provider(provider: Optional[Provider]) -> None:
+    """Swap the process-wide provider (tests, benchmarks); None re-reads the config."""
+    global _provider
+    _provider = provider
+
+
+# Same signatures as the gemini.* functions, on whichever provider is configured;
+# model="auto" (or no model: ``model_default``) goes through the router.
+
+def generate_code(
+    prompt: str,
+    api_key: Optional[str] = None,
+    model: Optional[str] = None,
+    cache: bool = False,
+    limiter: Optional[TokenBucket] = None,
+    task: str = "generate",
+    slots: Optional[ModelSlots] = None,
+) -> str:
+    model = model or gemini.default_model()
+    if model == gemini.AUTO_MODEL:
+        from . import routing
+
+        return routing.generate(prompt, task=task, api_key=api_key, cache=cache, limiter=limiter, slots=slots)
+    with model_slot(slots, model):
+        return get_provider().generate(prompt, model, api_key=api_key, cache=cache, limiter=limiter)
+
+
+async def generate_code_async(
+    prompt: str,
+    api_key: Optional[str] = None,
+    model: Optional[str] = None,
+    cache: bool = False,
+    limiter: Optional[TokenBucket] = None,
+    task: str = "generate",
+    slots: Optional[ModelSlots] = None,
+) -> str:
+    model = model or gemini.default_model()
+    if model == gemini.AUTO_MODEL:
+        from . import routing
+
+        return await routing.generate_async(prompt, task=task, api_key=api_key, cache=cache, limiter=limiter, slots=slots)
+    async with model_slot_async(slots, model):
+        return await get_provider().generate_async(prompt, model, api_key=api_key, cache=cache, limiter=limiter)
+
+
+def stream_generate_code(
+    prompt: str,
+    api_key: Optional[str] = None,
+    model: Optional[str] = None,
+    limiter: Optional[TokenBucket] = None,
+) -> Iterator[str]:
+    model = model or gemini.default_model()
+    if model == gemini.AUTO_MODEL:
+        from . import routing
+
+        return routing.stream(prompt, api_key=api_key, limiter=limiter)
+    return get_provider().stream(prompt, model, api_key=api_key, limiter=limiter)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    model = model or gemini.default_model()
+    return get_provider().count_tokens(text, gemini.DEFAULT_MODEL if model == gemini.AUTO_MODEL else model)
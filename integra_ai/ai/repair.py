@@ -0,0 +1,67 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Optional
+
+from ..core.config import AppConfig
+from ..core.logger import get_logger
+from ..core.validation import ValidationError, errors, strip_fences, validate_code
+from . import providers
+
+log = get_logger(__name__)
+
+_LANGUAGE_NAMES = {"python": "Python", "node": "JavaScript (Node.js)"}
+
+
+def repair_prompt(code: str, report: dict[str, Any], language: str) -> str:
+    problems = "\n".join(f"- {e}" for e in errors(report))
+    return (
+        f"The following {_LANGUAGE_NAMES.get(language, language)} client failed validation:\n{problems}\n\n"
+        "Fix these problems and keep everything else unchanged. Reply with the complete corrected code only, "
+        f"without markdown fences or explanations.\n\n{code}"
+    )
+
+
+def validated_code(
+    code: str,
+    language: str,
+    model: Optional[str] = None,
+    cfg: Optional[AppConfig] = None,
+) -> tuple[str, Optional[dict[str, Any]]]:
+    """Post-generation stage shared by the CLI, batch, jobs and web: strip
+    markdown fences, validate, and re-prompt the model with the errors up to
+    ``validation_repair_attempts`` times.
+
+    Returns the code to save and its validation report (None when
+    ``validation`` is ``off``). With ``validation: "strict"`` code that still
+    fails raises ``ValidationError`` instead of being saved.
+    """
+    cfg = cfg or AppConfig.cached()
+    code = strip_fences(code, language)
+    if cfg.validation == "off":
+        return code, None
+    report = validate_code(code, language, cfg)
+    repairs = 0
+    while report["status"] == "failed" and repairs < cfg.validation_repair_attempts:
+        repairs += 1
+        log.info("Re-prompting model to repair generated code", extra={"language": language, "attempt": repairs})
+        try:
+            fixed = strip_fences(providers.generate_code(repair_prompt(code, report, language), model=model, task="repair"), language)
+        except Exception as e:  # noqa: BLE001 - a failed repair keeps the original verdict
+            log.warning("Repair call failed", extra={"language": language, "error": str(e)})
+            break
+        fixed_report = validate_code(fixed, language, cfg)
+        if fixed_report["status"] != "failed" or len(errors(fixed_report)) < len(errors(report)):
+            code, report = fixed, fixed_report
+    report = report | {"repairs": repairs}
+    if report["status"] == "failed" and cfg.validation == "strict":
+        raise ValidationError(report)
+    return code, report
+
+
+def validate_saved(path: Path, language: str, cfg: Optional[AppConfig] = None) -> Optional[dict[str, Any]]:
+    """Report for code that was streamed straight to disk (no repair: the
+    reader has already seen it); None when ``validation`` is ``off``."""
+    cfg = cfg or AppConfig.cached()
+    if cfg.validation == "off":
+        return None
+    return validate_code(Path(path).read_text(encoding="utf-8"), language, cfg) | {"repairs": 0}
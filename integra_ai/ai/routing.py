@@ -0,0 +1,316 @@
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+from ..core.config import AppConfig
+from ..core.logger import get_logger
+from ..core.metrics import MODEL_ROUTING
+from ..core.ratelimit import ModelSlots, TokenBucket, model_slot, model_slot_async
+from . import gemini, providers
+from .keys import estimate_tokens
+
+log = get_logger(__name__)
+
+# Hedged requests run here so the caller can wait on whichever model answers first
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_router: Optional["Router"] = None
+
+
+class ModelStats:
+    """Latency and outcome of a model's calls over the last ``window`` seconds."""
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._samples: deque[tuple[float, float, bool]] = deque(maxlen=1000)  # (finished, seconds, ok)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self._samples.append((time.monotonic(), seconds, ok))
+
+    def _recent(self) -> list[tuple[float, float, bool]]:
+        cutoff = time.monotonic() - self.window
+        with self._lock:
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            return list(self._samples)
+
+    def summary(self) -> dict[str, Any]:
+        samples = self._recent()
+        ok = sorted(s for _, s, good in samples if good)
+        return {
+            "calls": len(samples),
+            "error_rate": (len(samples) - len(ok)) / len(samples) if samples else 0.0,
+            "p95": ok[min(len(ok) - 1, int(len(ok) * 0.95))] if ok else None,
+            "ok": len(ok),
+        }
+
+
+class Router:
+    """Picks a model chain per prompt from ``AppConfig.model_routes``, demotes
+    models that are failing or slow, fails over down the chain and hedges a
+    slow call with the next model after the primary's p95 latency."""
+
+    def __init__(self, cfg: AppConfig) -> None:
+        self.routes = cfg.model_routes
+        self.min_samples = max(1, cfg.model_min_samples)
+        self.max_error_rate = cfg.model_max_error_rate
+        self.slow_seconds = cfg.model_slow_seconds
+        self.hedge = cfg.model_hedge
+        self.hedge_min_delay = cfg.model_hedge_min_delay
+        self._window = cfg.model_window_seconds
+        self._stats: dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+
+    def stats(self, model: str) -> ModelStats:
+        with self._lock:
+            s = self._stats.get(model)
+            if s is None:
+                s = self._stats[model] = ModelStats(self._window)
+            return s
+
+    def healthy(self, model: str) -> bool:
+        s = self.stats(model).summary()
+        if s["calls"] < self.min_samples:
+            return True
+        return s["error_rate"] <= self.max_error_rate and (s["p95"] is None or s["p95"] <= self.slow_seconds)
+
+    def chain(self, prompt: str, task: str = "generate") -> list[str]:
+        """Models to try for this prompt: the first matching route, healthy models first."""
+        tokens = estimate_tokens(prompt)
+        models = [gemini.DEFAULT_MODEL]
+        for route in self.routes:
+            if route.get("task") not in (None, task):
+                continue
+            if route.get("max_tokens") is not None and tokens > route["max_tokens"]:
+                continue
+            models = list(route["models"]) or models
+            break
+        # Stable: route order is the preference, health only demotes
+        return sorted(models, key=lambda m: not self.healthy(m))
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """Seconds to wait on ``model`` before hedging, or None (disabled / too few samples)."""
+        if not self.hedge:
+            return None
+        s = self.stats(model).summary()
+        if s["ok"] < self.min_samples:
+            return None
+        return max(s["p95"], self.hedge_min_delay)
+
+    def _timed(self, model: str, call: Callable[[str], str]) -> str:
+        start = time.perf_counter()
+        try:
+            text = call(model)
+        except Exception:
+            self.stats(model).record(time.perf_counter() - start, False)
+            raise
+        self.stats(model).record(time.perf_counter() - start, True)
+        return text
+
+    async def _timed_async(self, model: str, call: Callable[[str], Awaitable[str]]) -> str:
+        start = time.perf_counter()
+        try:
+            text = await call(model)
+        except asyncio.CancelledError:
+            raise  # lost a hedge race: says nothing about the model
+        except Exception:
+            self.stats(model).record(time.perf_counter() - start, False)
+            raise
+        self.stats(model).record(time.perf_counter() - start, True)
+        return text
+
+    def _routed(self, prompt: str, task: str) -> list[str]:
+        chain = self.chain(prompt, task)
+        MODEL_ROUTING.inc(task=task, model=chain[0], event="routed")
+        log.info("Routed %s prompt to %s", task, chain[0], extra={"task": task, "tokens": estimate_tokens(prompt), "chain": chain})
+        return chain
+
+    def _failover(self, task: str, model: str, nxt: Optional[str], error: BaseException) -> None:
+        MODEL_ROUTING.inc(task=task, model=model, event="error")
+        log.warning("Model %s failed, falling back to %s", model, nxt or "nothing",
+                    extra={"task": task, "model": model, "next": nxt, "error": str(error)})
+
+    def run(self, prompt: str, call: Callable[[str], str], task: str = "generate") -> str:
+        """``call(model)`` down the chain until one succeeds; a call slower than
+        its hedge delay races the next model and the first answer wins."""
+        chain = self._routed(prompt, task)
+        pending: dict[Future, str] = {}
+        nxt = 0
+        hedged = False
+        error: Optional[BaseException] = None
+        while True:
+            if not pending:
+                if nxt >= len(chain):
+                    raise error  # type: ignore[misc]
+                model = chain[nxt]
+                nxt += 1
+                delay = None if hedged or nxt >= len(chain) else self.hedge_delay(model)
+                if delay is None:
+                    # Nothing to race against: call inline, no thread hop
+                    try:
+                        return self._timed(model, call)
+                    except Exception as e:  # noqa: BLE001 - try the next model
+                        error = e
+                        self._failover(task, model, chain[nxt] if nxt < len(chain) else None, e)
+                        continue
+                pending[_pool().submit(self._timed, model, call)] = model
+            timeout = None if hedged or nxt >= len(chain) else self.hedge_delay(next(iter(pending.values())))
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                backup = chain[nxt]
+                nxt += 1
+                MODEL_ROUTING.inc(task=task, model=backup, event="hedge")
+                log.info("Hedging slow %s call with %s after %.1fs", pending[next(iter(pending))], backup, timeout,
+                         extra={"task": task, "model": backup})
+                pending[_pool().submit(self._timed, backup, call)] = backup
+                continue
+            for fut in done:
+                model = pending.pop(fut)
+                try:
+                    text = fut.result()
+                except Exception as e:  # noqa: BLE001 - the other call may still succeed
+                    error = e
+                    self._failover(task, model, chain[nxt] if nxt < len(chain) and not pending else None, e)
+                    continue
+                if hedged:
+                    MODEL_ROUTING.inc(task=task, model=model, event="hedge_won" if model != chain[0] else "primary_won")
+                return text  # a losing hedge finishes in the background and still feeds the stats
+
+    async def run_async(self, prompt: str, call: Callable[[str], Awaitable[str]], task: str = "generate") -> str:
+        """Async twin of ``run``; the losing side of a hedge is cancelled."""
+        chain = self._routed(prompt, task)
+        pending: dict[asyncio.Task, str] = {}
+        nxt = 0
+        hedged = False
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                if not pending:
+                    if nxt >= len(chain):
+                        raise error  # type: ignore[misc]
+                    model = chain[nxt]
+                    nxt += 1
+                    pending[asyncio.ensure_future(self._timed_async(model, call))] = model
+                delay = None if hedged or nxt >= len(chain) else self.hedge_delay(next(iter(pending.values())))
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    backup = chain[nxt]
+                    nxt += 1
+                    MODEL_ROUTING.inc(task=task, model=backup, event="hedge")
+                    log.info("Hedging slow %s call with %s after %.1fs", next(iter(pending.values())), backup, delay,
+                             extra={"task": task, "model": backup, "engine": "async"})
+                    pending[asyncio.ensure_future(self._timed_async(backup, call))] = backup
+                    continue
+                for task_ in done:
+                    model = pending.pop(task_)
+                    try:
+                        text = task_.result()
+                    except Exception as e:  # noqa: BLE001 - the other call may still succeed
+                        error = e
+                        self._failover(task, model, chain[nxt] if nxt < len(chain) and not pending else None, e)
+                        continue
+                    if hedged:
+                        MODEL_ROUTING.inc(task=task, model=model, event="hedge_won" if model != chain[0] else "primary_won")
+                    return text
+        finally:
+            for t in pending:
+                t.cancel()
+
+    def stream(self, prompt: str, call: Callable[[str], Iterator[str]], task: str = "generate") -> Iterator[str]:
+        """Fail over between models until the first chunk arrives; no hedging,
+        since two streams cannot be merged once text has been yielded."""
+        chain = self._routed(prompt, task)
+        for i, model in enumerate(chain):
+            start = time.perf_counter()
+            chunks = call(model)
+            try:
+                first = next(chunks, None)
+            except Exception as e:  # noqa: BLE001 - nothing yielded yet: try the next model
+                self.stats(model).record(time.perf_counter() - start, False)
+                if i + 1 >= len(chain):
+                    raise
+                self._failover(task, model, chain[i + 1], e)
+                continue
+            ok = False
+            try:
+                if first is not None:
+                    yield first
+                yield from chunks
+                ok = True
+            finally:
+                self.stats(model).record(time.perf_counter() - start, ok)
+            return
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            models = list(self._stats)
+        return {m: self.stats(m).summary() | {"healthy": self.healthy(m)} for m in models}
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="integra-hedge")
+        return _executor
+
+
+def get_router() -> Router:
+    """Process-wide router, so latency and error windows span every caller."""
+    global _router
+    if _router is None:
+        _router = Router(AppConfig.load(create=False))
+    return _router
+
+
+def generate(
+    prompt: str,
+    task: str = "generate",
+    api_key: Optional[str] = None,
+    cache: bool = False,
+    limiter: Optional[TokenBucket] = None,
+    slots: Optional[ModelSlots] = None,
+) -> str:
+    """``generate`` on the configured provider with the model picked by the router (``model="auto"``);
+    ``slots`` caps concurrent calls per routed model."""
+    provider = providers.get_provider()
+
+    def call(model: str) -> str:
+        with model_slot(slots, model):
+            return provider.generate(prompt, model, api_key=api_key, cache=cache, limiter=limiter)
+
+    return get_router().run(prompt, call, task)
+
+
+async def generate_async(
+    prompt: str,
+    task: str = "generate",
+    api_key: Optional[str] = None,
+    cache: bool = False,
+    limiter: Optional[TokenBucket] = None,
+    slots: Optional[ModelSlots] = None,
+) -> str:
+    provider = providers.get_provider()
+
+    async def call(model: str) -> str:
+        async with model_slot_async(slots, model):
+            return await provider.generate_async(prompt, model, api_key=api_key, cache=cache, limiter=limiter)
+
+    return await get_router().run_async(prompt, call, task)
+
+
+def stream(
+    prompt: str,
+    api_key: Optional[str] = None,
+    limiter: Optional[TokenBucket] = None,
+) -> Iterator[str]:
+    provider = providers.get_provider()
+    return get_router().stream(prompt, lambda model: provider.stream(prompt, model, api_key=api_key, limiter=limiter))
@@ -0,0 +1,237 @@
+from __future__ import annotations
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator, Optional
+
+from .keys import estimate_tokens
+
+# Gemini REST paths: /v1beta/models/<model>:<method>
+_GEMINI_PATH = re.compile(r"^/v1(?:beta)?/models/(?P<model>[^/:]+):(?P<method>\w+)$")
+
+
+def stub_code(prompt: str, model: str, lines: int = 20) -> str:
+    """Deterministic, syntactically valid Python client for ``prompt``."""
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+    out = [
+        f"# Integra.AI stub response ({model}, prompt {digest})",
+        "import requests",
+        "",
+        'BASE_URL = "https://api.example.com"',
+        "",
+    ]
+    i = 0
+    while len(out) < lines:
+        out += [
+            "",
+            f"def endpoint_{i}(**params):",
+            f'    return requests.get(f"{{BASE_URL}}/{digest}/{i}", params=params, timeout=30).json()',
+        ]
+        i += 1
+    return "\n".join(out) + "\n"
+
+
+def _split(text: str, chunks: int) -> list[str]:
+    size = max(1, -(-len(text) // max(1, chunks)))
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_Server"
+
+    def log_message(self, *args: Any) -> None:  # silence stderr
+        pass
+
+    def _json(self, status: int, body: Any, headers: Optional[dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _sse(self, events: Iterator[Any]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for event in events:
+            payload = f"data: {event if isinstance(event, str) else json.dumps(event)}\n\n".encode()
+            self.wfile.write(f"{len(payload):X}\r\n".encode() + payload + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def do_GET(self) -> None:
+        self._json(200, {"status": "ok", **self.server.stub.stats()})
+
+    def do_POST(self) -> None:
+        stub = self.server.stub
+        body = self._body()
+        path = self.path.partition("?")[0]
+        fail = stub.admit()
+        if fail:
+            self._json(stub.error_status, {"error": {"code": stub.error_status, "message": "stub: injected error"}},
+                       {"Retry-After": "0"})
+            return
+        if path.rstrip("/").endswith("/chat/completions"):
+            self._openai(stub, body)
+            return
+        m = _GEMINI_PATH.match(path)
+        if m is None:
+            self._json(404, {"error": {"code": 404, "message": f"stub: unknown path {path}"}})
+            return
+        prompt = "".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+        model, method = m.group("model"), m.group("method")
+        if method == "countTokens":
+            self._json(200, {"totalTokens": estimate_tokens(prompt)})
+            return
+        text = stub.reply(prompt, model)
+        usage = {"promptTokenCount": estimate_tokens(prompt), "candidatesTokenCount": estimate_tokens(text)}
+        usage["totalTokenCount"] = usage["promptTokenCount"] + usage["candidatesTokenCount"]
+        if method == "streamGenerateContent":
+            def events() -> Iterator[Any]:
+                for chunk in stub.chunks(text):
+                    yield {"candidates": [{"content": {"parts": [{"text": chunk}], "role": "model"}}]}
+                yield {"candidates": [{"content": {"parts": [], "role": "model"}, "finishReason": "STOP"}], "usageMetadata": usage}
+
+            self._sse(events())
+        else:
+            stub.wait()
+            self._json(200, {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP"}],
+                             "usageMetadata": usage})
+
+    def _openai(self, stub: "StubServer", body: dict) -> None:
+        prompt = "".join(str(m.get("content", "")) for m in body.get("messages", []))
+        model = body.get("model") or "stub"
+        text = stub.reply(prompt, model)
+        usage = {"prompt_tokens": estimate_tokens(prompt), "completion_tokens": estimate_tokens(text)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        if body.get("stream"):
+            def events() -> Iterator[Any]:
+                for chunk in stub.chunks(text):
+                    yield {"object": "chat.completion.chunk", "model": model, "choices": [{"index": 0, "delta": {"content": chunk}}]}
+                yield {"object": "chat.completion.chunk", "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+                yield "[DONE]"
+
+            self._sse(events())
+        else:
+            stub.wait()
+            self._json(200, {
+                "object": "chat.completion", "model": model, "usage": usage,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            })
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    stub: "StubServer"
+
+
+class StubServer:
+    """Deterministic offline LLM speaking both the Gemini REST API and the
+    OpenAI ``/v1/chat/completions`` API, for benchmarks and load tests.
+
+    ``latency`` (± ``jitter`` as a fraction) is spent before a reply or before
+    the first streamed chunk, ``chunk_delay`` between chunks. ``error_rate``
+    of the requests fail with ``error_status``. Errors and jitter come from a
+    generator seeded with ``seed``, so a run is reproducible request by request.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        chunks: int = 8,
+        chunk_delay: float = 0.0,
+        lines: int = 20,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.n_chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.lines = lines
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._srv = _Server((host, port), _Handler)
+        self._srv.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._srv.socket.getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def admit(self) -> bool:
+        """Count a request; True if it should fail."""
+        with self._lock:
+            self._requests += 1
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+            self._errors += fail
+            return fail
+
+    def _delay(self) -> float:
+        with self._lock:
+            spread = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        return max(0.0, self.latency * (1 + spread))
+
+    def wait(self) -> None:
+        if self.latency:
+            time.sleep(self._delay())
+
+    def reply(self, prompt: str, model: str) -> str:
+        return stub_code(prompt, model, self.lines)
+
+    def chunks(self, text: str) -> Iterator[str]:
+        self.wait()
+        for i, chunk in enumerate(_split(text, self.n_chunks)):
+            if i and self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield chunk
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"requests": self._requests, "errors": self._errors}
+
+    def start(self) -> "StubServer":
+        # Short poll so stop() (and test teardown) doesn't wait half a second
+        self._thread = threading.Thread(target=self._srv.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._srv.serve_forever()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._srv.shutdown()
+        self._srv.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+from typing import Any, Callable
+
+from ..core.artifacts import ai_inputs, find_unchanged
+from ..core.config import AppConfig
+from ..core.generator import render_python_client, save_generated_code
+from ..core.logger import get_logger
+from ..core.storage import save_integration_metadata
+from .gemini import default_model, generate_code_coalesced
+from .repair import validated_code
+
+log = get_logger(__name__)
+
+
+def generate(job: dict[str, Any]) -> dict[str, Any]:
+    """Background version of ``POST /api/generate``.
+
+    Gemini errors are raised so the queue retries them; only on the last
+    attempt does it fall back to the offline client template, as the
+    synchronous endpoint used to. A job whose inputs match the current
+    artifact (and without ``force``) completes without generating.
+    """
+    payload = job["payload"]
+    name = payload.get("name") or "integration"
+    language = payload.get("language") or AppConfig.cached().language
+    model = payload.get("model") or default_model()
+    inputs: dict[str, Any] | None = ai_inputs(payload["prompt"], model, language)
+    unchanged = None if payload.get("force") else find_unchanged(name, inputs)
+    if unchanged is not None:
+        return {"saved_to": str(unchanged), "unchanged": True}
+    result: dict[str, Any] = {}
+    try:
+        # Other workers generating the same prompt (under a different name) share this call
+        code, result["coalesced"] = generate_code_coalesced(payload["prompt"], model=model, cache=bool(payload.get("cache", True)))
+    except Exception as e:
+        if job["attempts"] < job["max_attempts"]:
+            raise
+        log.warning("Gemini unavailable, using offline template", extra={"integration": name, "error": str(e)})
+        code = render_python_client(base_url="https://httpbin.org", token=None)
+        result["fallback"] = True
+        inputs = None  # not what was asked for: the next run must try the model again
+    meta: dict[str, Any] = {"language": language}
+    if not result.get("fallback"):
+        code, report = validated_code(code, language, model=model)
+        if report is not None:
+            meta["validation"] = report
+            result["validation"] = report["status"]
+    path = save_generated_code(name, language, code, inputs)
+    save_integration_metadata(name, {"generated_file": str(path), **meta})
+    result["saved_to"] = str(path)
+    return result
+
+
+TASKS: dict[str, Callable[[dict[str, Any]], Any]] = {
+    "generate": generate,
+}
+
+
+def run_job(job: dict[str, Any]) -> Any:
+    """Default ``WorkerPool`` handler: dispatch on the job's ``kind``."""
+    task = TASKS.get(job["kind"])
+    if task is None:
+        raise ValueError(f"unknown job kind: {job['kind']}")
+    return task(job)
@@ -1,26 +1,42 @@
 from __future__ import annotations
-import json
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, List, Optional
 import typer
-from rich import print
-from rich.table import Table
 
-from .core.config import AppConfig
-from .core.storage import list_integrations, save_integration_metadata, load_integration_metadata, slugify
-from .core.generator import save_generated_code, render_python_client
-from .core.testing import simple_request_test
-from .ai.gemini import generate_code
+if TYPE_CHECKING:
+    from .core.config import AppConfig
+
+# Heavy dependencies (requests, rich, dotenv, the Gemini client, sqlite) are
+# imported inside each command so `integra --help` and cheap commands don't
+# pay for them; see benchmarks/bench_cli_startup.py for the budget.
+
+
+def print(*args, **kwargs) -> None:  # noqa: A001 - rich print, imported on first use
+    from rich import print as rich_print
+
+    rich_print(*args, **kwargs)
+
 
 app = typer.Typer(add_completion=False, help="Integra.AI - Automatize integrações com APIs usando IA generativa")
 
 
+@app.callback()
+def _main():
+    import atexit
+    from .core.metrics import persist
+
+    # Métricas do processo (latência do Gemini, tokens, cache...) somadas em .integra/metrics.json
+    atexit.register(persist)
+
+
 @app.command()
 def init(
     project_name: str = typer.Option("Integra.AI", prompt=True, help="Nome do projeto"),
     language: str = typer.Option("python", prompt=True, help="Linguagem alvo (python|node)"),
     write_env: bool = typer.Option(True, help="Criar .env se não existir"),
 ):
+    from .core.config import AppConfig
+
     cfg = AppConfig(project_name=project_name, language=language)
     cfg.save()
 
@@ -37,64 +53,529 @@ def init(
 
 
 @app.command()
-def list():  # noqa: A001 - intentional name
-    items = list_integrations()
+def list(  # noqa: A001 - intentional name
+    language: Optional[str] = typer.Option(None, help="Filtrar por linguagem"),
+    auth: Optional[str] = typer.Option(None, help="Filtrar por autenticação (ex.: Bearer)"),
+    base_url: Optional[str] = typer.Option(None, help="Filtrar por base URL"),
+    sort: str = typer.Option("name", help="Ordenação: name | recent (última geração)"),
+    limit: int = typer.Option(50, help="Itens por página (0 = todos)"),
+    page: int = typer.Option(1, min=1, help="Página"),
+):
+    from datetime import datetime
+    from rich.table import Table
+    from .core.storage import query_integrations
+
+    items, total = query_integrations(
+        language=language, auth=auth, base_url=base_url, sort=sort,
+        limit=limit or None, offset=(page - 1) * limit,
+    )
     if not items:
         print("[yellow]Nenhuma integração encontrada.[/yellow]")
         raise typer.Exit(code=0)
 
-    table = Table(title="Integrações")
+    table = Table(title=f"Integrações ({len(items)} de {total})")
     table.add_column("Nome")
-    for name in items:
-        table.add_row(name)
+    table.add_column("Linguagem")
+    table.add_column("Auth")
+    table.add_column("Última geração")
+    for it in items:
+        generated = datetime.fromtimestamp(it["generated_at"]).strftime("%Y-%m-%d %H:%M") if it["generated_at"] else "-"
+        table.add_row(it["name"], it["language"] or "-", it["auth"] or "-", generated)
+    print(table)
+
+
+@app.command()
+def reindex():
+    from .core.storage import reindex as reindex_catalog
+
+    n = reindex_catalog()
+    print(f"[green]Catálogo reconstruído:[/green] {n} integrações")
+
+
+@app.command()
+def history(name: str = typer.Option(..., help="Nome da integração")):
+    from datetime import datetime
+    from rich.table import Table
+    from .core.artifacts import NAME_DIGITS, history as load_history
+
+    entries = load_history(name)
+    if not entries:
+        print("[yellow]Nenhuma versão registrada para esta integração.[/yellow]")
+        raise typer.Exit(code=0)
+
+    table = Table(title=f"Versões de {name}")
+    for col in ("Versão", "Hash", "Data", "Tamanho", "Linguagem", "Modelo", "Arquivo"):
+        table.add_column(col)
+    for e in entries:
+        table.add_row(
+            str(e["version"]), e["sha256"][:NAME_DIGITS],
+            datetime.fromtimestamp(e["created"]).strftime("%Y-%m-%d %H:%M:%S"),
+            f"{e['size']} B", e.get("language") or "-", e.get("model") or "-", e["file"],
+        )
     print(table)
 
 
+@app.command()
+def diff(
+    name: str = typer.Option(..., help="Nome da integração"),
+    old: Optional[str] = typer.Argument(None, help="Versão antiga: número, -N (relativo à atual) ou prefixo do hash"),
+    new: Optional[str] = typer.Argument(None, help="Versão nova (padrão: a atual)"),
+):
+    from rich.console import Console
+    from rich.syntax import Syntax
+    from .core.artifacts import diff as diff_versions
+
+    try:
+        text = diff_versions(name, old, new)
+    except LookupError as e:
+        print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1)
+    if not text:
+        print("[green]Sem diferenças.[/green]")
+        return
+    Console().print(Syntax(text, "diff", theme="ansi_dark", background_color="default"))
+
+
 @app.command()
 def ai(
     prompt: str = typer.Option(..., "--prompt", "-p", help="Prompt para geração de código"),
     name: Optional[str] = typer.Option(None, help="Nome da integração (opcional)"),
     language: Optional[str] = typer.Option(None, help="Override de linguagem (python|node)"),
-    model: str = typer.Option("gemini-1.5-flash", help="Modelo Gemini"),
+    model: Optional[str] = typer.Option(None, help="Modelo Gemini; \"auto\" escolhe por tamanho do prompt (padrão: model_default do config, gemini-1.5-flash)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignorar o cache de respostas e chamar o Gemini"),
+    stream: bool = typer.Option(False, "--stream", help="Exibir e gravar o código à medida que é gerado (sem cache)"),
+    doc: Optional[Path] = typer.Option(
+        None, "--doc", exists=True, dir_okay=False, help="Arquivo com a documentação da API (dividido em partes se for grande)"
+    ),
+    force: bool = typer.Option(False, "--force", help="Gerar mesmo que prompt, modelo e documentação não tenham mudado"),
+    repair: Optional[int] = typer.Option(
+        None, "--repair", help="Tentativas de correção pela IA se a validação falhar (padrão: validation_repair_attempts)"
+    ),
+    record: bool = typer.Option(False, "--record", help="Gravar as chamadas ao modelo no cassete \"generate\" da integração"),
+    replay: bool = typer.Option(False, "--replay", help="Responder a partir do cassete \"generate\", sem acessar a rede"),
 ):
+    from .core.artifacts import ai_inputs
+    from .core.config import AppConfig
+    from .core.storage import slugify
+
     cfg = AppConfig.load()
+    if repair is not None:
+        cfg.validation_repair_attempts = repair
     lang = language or cfg.language
+    model = model or cfg.model_default
     integ_name = name or slugify(prompt)[:40]
 
-    code = generate_code(prompt=prompt, model=model)
-    path = save_generated_code(integ_name, lang, code)
+    if stream and doc:
+        print("[red]--stream não suporta --doc (a documentação pode ser dividida em várias chamadas).[/red]")
+        raise typer.Exit(code=1)
+
+    inputs = ai_inputs(prompt, model, lang, doc)
+    tape = _open_cassette(integ_name, "generate", record, replay)
+    if tape is not None:
+        from .core.cassette import installed
+
+        # Gravar exige chamadas reais (sem cache nem atalho de "inalterado"); reproduzir dispensa a chave
+        force = no_cache = True
+        api_key = "replay" if replay else None
+        with installed(tape):
+            _generate(prompt, integ_name, lang, model, inputs, cfg, doc, stream, no_cache, force, api_key)
+        print(f"[dim]Cassete ({tape.mode}): {tape.path}[/dim]")
+        return
+    _generate(prompt, integ_name, lang, model, inputs, cfg, doc, stream, no_cache, force)
+
 
-    meta = {"name": integ_name, "language": lang, "generated_file": str(path)}
+def _generate(
+    prompt: str,
+    integ_name: str,
+    lang: str,
+    model: str,
+    inputs: dict[str, Any],
+    cfg: AppConfig,
+    doc: Optional[Path],
+    stream: bool,
+    no_cache: bool,
+    force: bool,
+    api_key: Optional[str] = None,
+) -> None:
+    from functools import partial
+
+    from .core.artifacts import find_unchanged
+    from .core.storage import save_integration_metadata
+    from .core.generator import GeneratedCodeWriter, save_generated_code
+    from .core.validation import ValidationError, strip_fences
+    from .ai.providers import stream_generate_code
+    from .ai.chunking import generate_code_chunked
+    from .ai.repair import validate_saved, validated_code
+
+    unchanged = None if force else find_unchanged(integ_name, inputs)
+    if unchanged is not None:
+        print(f"[yellow]Entradas inalteradas; mantendo[/yellow] {unchanged} [yellow](use --force para gerar de novo)[/yellow]")
+        return
+
+    if stream:
+        from rich.console import Console
+
+        console = Console()
+        with GeneratedCodeWriter(integ_name, lang, inputs, clean=partial(strip_fences, language=lang)) as w:
+            for chunk in stream_generate_code(prompt=prompt, model=model, api_key=api_key):
+                w.write(chunk)
+                console.print(chunk, end="", markup=False, highlight=False, soft_wrap=True)
+        console.print()
+        path = w.path
+        report = validate_saved(path, lang, cfg)
+    else:
+        code = generate_code_chunked(prompt, docs=doc, model=model, cache=not no_cache, language=lang, api_key=api_key)
+        try:
+            code, report = validated_code(code, lang, model=model, cfg=cfg)
+        except ValidationError as e:
+            print(f"[red]Código gerado não passou na validação; nada foi salvo.[/red] {e}")
+            raise typer.Exit(code=1)
+        path = save_generated_code(integ_name, lang, code, inputs)
+
+    meta: dict[str, Any] = {"name": integ_name, "language": lang, "generated_file": str(path)}
+    if report is not None:
+        meta["validation"] = report
     save_integration_metadata(integ_name, meta)
 
     print(f"[green]Código gerado e salvo em:[/green] {path}")
+    if report is not None:
+        _print_validation(report)
+
+
+def _print_validation(report: dict) -> None:
+    color = {"passed": "green", "warning": "yellow"}.get(report["status"], "red")
+    extra = f", {report['repairs']} correção(ões)" if report.get("repairs") else ""
+    cached = " [dim](cache)[/dim]" if report.get("cached") else ""
+    print(f"[{color}]Validação: {report['status']}[/{color}] ({report['seconds']:.2f}s{extra}){cached}")
+    for check in report["checks"]:
+        if check["status"] in ("warn", "error"):
+            print(f"  [{'yellow' if check['status'] == 'warn' else 'red'}]{check['name']}[/]: {check['message']}")
+
+
+@app.command("ai-batch")
+def ai_batch(
+    manifest: Path = typer.Argument(..., exists=True, dir_okay=False, help="Manifesto JSONL/YAML com os prompts"),
+    workers: Optional[int] = typer.Option(None, help="Número de workers concorrentes"),
+    per_model: Optional[int] = typer.Option(None, help="Chamadas simultâneas por modelo"),
+    rpm: Optional[float] = typer.Option(None, help="Limite de requisições/minuto ao Gemini (0 desativa)"),
+    language: Optional[str] = typer.Option(None, help="Linguagem padrão (python|node)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignorar o cache de respostas e chamar o Gemini"),
+    engine: Optional[str] = typer.Option(None, help="Motor de execução: thread | async (requer httpx)"),
+    force: bool = typer.Option(False, "--force", help="Gerar também os itens cujas entradas não mudaram"),
+):
+    from .core.config import AppConfig
+    from .ai.batch import load_manifest, run_batch
+
+    cfg = AppConfig.load()
+    jobs = load_manifest(manifest)
+    ok = failed = 0
+    for res in run_batch(
+        jobs,
+        workers=workers or cfg.batch_workers,
+        per_model=per_model or cfg.batch_per_model_concurrency,
+        rpm=cfg.gemini_rpm if rpm is None else rpm,
+        language=language or cfg.language,
+        cache=not no_cache,
+        engine=engine or cfg.batch_engine,
+        force=force,
+    ):
+        done = ok + failed + 1
+        if res["ok"]:
+            ok += 1
+            note = " [yellow](inalterado)[/yellow]" if res.get("unchanged") else ""
+            print(f"[green]✔[/green] [{done}/{len(jobs)}] {res['name']} → {res['generated_file']} ({res['elapsed']:.1f}s){note}")
+        else:
+            failed += 1
+            print(f"[red]✘[/red] [{done}/{len(jobs)}] {res['name']}: {res['error']}")
+
+    print(f"[bold]Concluído:[/bold] {ok} ok, {failed} com erro")
+    _print_key_usage()
+    if failed:
+        raise typer.Exit(code=1)
+
+
+def _print_key_usage(rows: Optional[List[dict]] = None) -> None:
+    from rich.table import Table
+
+    if rows is None:
+        from .ai.keys import key_pool
+
+        try:
+            rows = key_pool().snapshot()
+        except RuntimeError:
+            return
+    table = Table(title="Chaves do Gemini (último minuto)")
+    for col in ("Chave", "Req/min", "Tokens/min", "Folga", "Pausa"):
+        table.add_column(col, justify="right")
+    for r in rows:
+        table.add_row(
+            r["key"], f"{r['requests']:.0f}/{r['rpm']:.0f}", f"{r['tokens']:.0f}/{r['tpm']:.0f}",
+            f"{r['headroom']:.0%}", f"{r['cooldown']:.0f}s" if r["cooldown"] else "",
+        )
+    print(table)
+
+
+@app.command()
+def keys(
+    url: Optional[str] = typer.Option(None, help="Ler o uso ao vivo de um servidor web em execução (ex.: http://127.0.0.1:5000)"),
+):
+    if url:
+        import requests
+
+        resp = requests.get(url.rstrip("/") + "/api/keys", timeout=10)
+        resp.raise_for_status()
+        _print_key_usage(resp.json()["keys"])
+        return
+
+    from .ai.keys import configured_keys, mask
+    from .core.metrics import load_persisted
+
+    specs = configured_keys()
+    if not specs:
+        print("[red]Nenhuma chave configurada.[/red] Defina GEMINI_API_KEY, GEMINI_API_KEYS ou o arquivo gemini_keys_file.")
+        raise typer.Exit(code=1)
+    # Sem --url: orçamentos configurados + uso registrado na última execução da CLI
+    reg = load_persisted()
+    usage = {}
+    for m in reg.metrics():
+        if m.name == "integra_gemini_key_usage":
+            usage = {(s["labels"]["key"], s["labels"]["budget"]): s["value"] for s in m.samples()}
+    rows = []
+    for key, rpm, tpm in specs:
+        label = mask(key)
+        used_r, used_t = usage.get((label, "rpm"), 0), usage.get((label, "tpm"), 0)
+        rows.append({
+            "key": label, "requests": used_r, "rpm": rpm, "tokens": used_t, "tpm": tpm,
+            "headroom": max(0.0, min(1 - used_r / rpm, 1 - used_t / tpm)), "cooldown": 0,
+        })
+    _print_key_usage(rows)
+
+
+@app.command()
+def stub(
+    host: str = typer.Option("127.0.0.1", help="Endereço de escuta"),
+    port: int = typer.Option(8765, help="Porta (use provider \"stub\" ou GEMINI_BASE_URL apontando para ela)"),
+    latency: float = typer.Option(0.0, help="Latência (s) antes da resposta ou do primeiro pedaço"),
+    jitter: float = typer.Option(0.0, help="Variação da latência, em fração (0.2 = ±20%)"),
+    error_rate: float = typer.Option(0.0, help="Fração das requisições que falham"),
+    error_status: int = typer.Option(503, help="Status HTTP das falhas injetadas (ex.: 429)"),
+    chunks: int = typer.Option(8, help="Pedaços por resposta em streaming"),
+    chunk_delay: float = typer.Option(0.0, help="Intervalo (s) entre pedaços"),
+    lines: int = typer.Option(20, help="Linhas de código por resposta"),
+    seed: int = typer.Option(0, help="Semente das falhas e da variação (execuções reproduzíveis)"),
+):
+    from .ai.stub import StubServer
+
+    srv = StubServer(
+        host=host, port=port, latency=latency, jitter=jitter, error_rate=error_rate, error_status=error_status,
+        chunks=chunks, chunk_delay=chunk_delay, lines=lines, seed=seed,
+    )
+    print(f"[green]Stub LLM em[/green] {srv.url} (Gemini: /v1beta/models/<modelo>:generateContent, OpenAI: /v1/chat/completions)")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.stop()
+        print(f"[yellow]Encerrado:[/yellow] {srv.stats()}")
+
+
+@app.command()
+def replay(
+    name: str = typer.Option(..., help="Nome da integração"),
+    cassette: str = typer.Option("default", help="Cassete a servir (gravado com `integra test --record`)"),
+    record: bool = typer.Option(False, "--record", help="Encaminhar para a API real e gravar, em vez de reproduzir"),
+    origin: Optional[str] = typer.Option(None, help="URL da API real (padrão: base_url da integração)"),
+    host: str = typer.Option("127.0.0.1", help="Endereço de escuta"),
+    port: int = typer.Option(8766, help="Porta (aponte o API_BASE_URL do cliente gerado para ela)"),
+    latency: float = typer.Option(0.0, help="Latência simulada (s) por resposta reproduzida"),
+):
+    from .core.cassette import CassetteServer
+    from .core.storage import load_integration_metadata
+
+    meta = load_integration_metadata(name) or {}
+    base_url = origin or meta.get("base_url")
+    if not base_url:
+        print("[red]Informe --origin: a integração não tem base_url.[/red]")
+        raise typer.Exit(code=1)
+    tape = _open_cassette(name, cassette, record, not record, latency)
+    srv = CassetteServer(tape, base_url, host=host, port=port)
+    mode = "gravando" if record else f"reproduzindo {len(tape)} resposta(s)"
+    print(f"[green]Cassete em[/green] {srv.url} ({mode} de {tape.path})")
+    print(f"API_BASE_URL={srv.url}")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.stop()
+
+
+@app.command()
+def serve(
+    host: Optional[str] = typer.Option(None, help="Endereço de escuta (padrão: serve_host)"),
+    port: Optional[int] = typer.Option(None, help="Porta (padrão: serve_port)"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", help="Processos (gunicorn; 0 = 2 x CPUs + 1)"),
+    threads: Optional[int] = typer.Option(None, "--threads", "-t", help="Threads por processo"),
+    server: Optional[str] = typer.Option(None, help="auto | gunicorn | waitress"),
+    preload: Optional[bool] = typer.Option(None, "--preload/--no-preload", help="Importar o app uma vez antes de criar os workers"),
+    timeout: Optional[float] = typer.Option(None, help="Segundos até um worker travado ser substituído"),
+    max_requests: Optional[int] = typer.Option(None, help="Reciclar o worker após N requisições (0 = nunca)"),
+    connection_limit: Optional[int] = typer.Option(None, help="Conexões simultâneas por worker"),
+    backlog: Optional[int] = typer.Option(None, help="Fila de conexões pendentes do socket"),
+    pid_file: Optional[Path] = typer.Option(None, help="Arquivo com o PID (recarregar com kill -HUP)"),
+    app_path: str = typer.Option("web.app:app", "--app", help="Aplicação WSGI (módulo:atributo)"),
+):
+    from .core.config import AppConfig
+    from .core.server import ServeOptions, pick_server, serve as run_server
+
+    opts = ServeOptions.from_config(
+        AppConfig.load(create=False), app=app_path, server=server, host=host, port=port, workers=workers,
+        threads=threads, preload=preload, timeout=timeout, max_requests=max_requests,
+        connection_limit=connection_limit, backlog=backlog, pid_file=str(pid_file) if pid_file else None,
+    )
+    try:
+        name = pick_server(opts.server)
+    except (RuntimeError, ValueError) as e:
+        from rich.markup import escape
+
+        print(f"[red]{escape(str(e))}[/red]")
+        raise typer.Exit(code=1)
+    opts.server = name
+    size = f"{opts.worker_count} worker(s) x {opts.threads} thread(s)" if name == "gunicorn" else f"{max(1, opts.workers) * opts.threads} thread(s)"
+    print(f"[green]Servindo[/green] {opts.app} [green]em[/green] http://{opts.host}:{opts.port} ({name}, {size})")
+    run_server(opts)
+
+
+@app.command()
+def worker(
+    processes: Optional[int] = typer.Option(None, "--processes", "-p", help="Número de processos worker"),
+    poll_interval: Optional[float] = typer.Option(None, help="Intervalo (s) entre consultas à fila quando vazia"),
+):
+    import time
+    from .core.config import AppConfig
+    from .core.jobs import WorkerPool, get_job_queue
+
+    cfg = AppConfig.load()
+    counts = get_job_queue().counts()
+    pool = WorkerPool(
+        processes=processes or cfg.job_workers,
+        poll_interval=cfg.job_poll_interval if poll_interval is None else poll_interval,
+    ).start()
+    print(f"[green]{pool.processes} worker(s) em execução[/green] | na fila: {counts['queued']}, em andamento: {counts['running']}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("[yellow]Encerrando (aguardando jobs em andamento)...[/yellow]")
+        pool.stop(timeout=cfg.job_timeout)
 
 
 @app.command()
 def connect(
     name: str = typer.Option(..., help="Nome da integração"),
-    base_url: str = typer.Option(..., help="Base URL da API"),
+    base_url: Optional[str] = typer.Option(None, help="Base URL da API (padrão: servers[0] da especificação)"),
     token: Optional[str] = typer.Option(None, help="Token/JWT (opcional)"),
+    spec: Optional[Path] = typer.Option(
+        None, exists=True, dir_okay=False, help="Especificação OpenAPI 3 / Swagger (JSON ou YAML): gera o cliente sem IA"
+    ),
+    language: str = typer.Option("python", help="Linguagem do cliente gerado a partir de --spec (python|node)"),
+    force: bool = typer.Option(False, "--force", help="Gerar mesmo que especificação, template e opções não tenham mudado"),
 ):
-    code = render_python_client(base_url=base_url, token=token)
-    path = save_generated_code(name, "python", code)
-    meta = {
-        "name": name,
-        "language": "python",
-        "base_url": base_url,
-        "generated_file": str(path),
-        "auth": "Bearer" if token else "None",
-    }
+    from .core.artifacts import find_unchanged
+    from .core.storage import save_integration_metadata
+    from .core.generator import GeneratedCodeWriter, save_generated_code, render_python_client, template_version
+
+    def keep_unchanged(inputs: dict) -> bool:
+        unchanged = None if force else find_unchanged(name, inputs)
+        if unchanged is not None:
+            print(f"[yellow]Entradas inalteradas; mantendo[/yellow] {unchanged} [yellow](use --force para gerar de novo)[/yellow]")
+        return unchanged is not None
+
+    if spec is None:
+        if not base_url:
+            print("[red]Informe --base-url ou --spec.[/red]")
+            raise typer.Exit(code=1)
+        inputs = {"kind": "template", "template": template_version(), "base_url": base_url, "token": token, "language": "python"}
+        if keep_unchanged(inputs):
+            return
+        code = render_python_client(base_url=base_url, token=token)
+        path = save_generated_code(name, "python", code, inputs)
+        meta: dict[str, Any] = {
+            "name": name,
+            "language": "python",
+            "base_url": base_url,
+            "generated_file": str(path),
+            "auth": "Bearer" if token else "None",
+        }
+    else:
+        from .core.openapi import TEMPLATES, parse_spec, render_openapi_client
+
+        if language not in TEMPLATES:
+            print(f"[red]Linguagem inválida para --spec: {language} (use python|node).[/red]")
+            raise typer.Exit(code=1)
+        try:
+            parsed = parse_spec(spec)
+        except (ValueError, RuntimeError) as e:
+            print(f"[red]Especificação inválida:[/red] {e}")
+            raise typer.Exit(code=1)
+        base_url = base_url or parsed.base_url
+        inputs = {
+            "kind": "openapi", "template": template_version(), "spec": parsed.digest,
+            "base_url": base_url, "token": token, "language": language,
+        }
+        if keep_unchanged(inputs):
+            return
+        with GeneratedCodeWriter(name, language, inputs) as w:
+            for piece in render_openapi_client(parsed, language, base_url=base_url, token=token):
+                w.write(piece)
+        path = w.path
+        meta = {
+            "name": name,
+            "language": language,
+            "base_url": base_url,
+            "generated_file": str(path),
+            "auth": parsed.auth,
+            "spec": str(spec.resolve()),
+            "operations": parsed.operation_count,
+        }
     save_integration_metadata(name, meta)
+    if spec is not None:
+        print(f"[green]{meta['operations']} operações de {spec.name}[/green]")
     print(f"[green]Cliente gerado em:[/green] {path}")
 
 
 @app.command()
 def test(
-    name: str = typer.Option(..., help="Nome da integração"),
+    name: Optional[str] = typer.Option(None, help="Nome da integração"),
     endpoint: str = typer.Option("/", help="Endpoint para testar"),
     method: str = typer.Option("GET", help="Método HTTP"),
+    n_requests: Optional[int] = typer.Option(None, "--requests", "-n", help="Modo carga: total de requisições"),
+    concurrency: int = typer.Option(10, "--concurrency", "-c", help="Modo carga: requisições simultâneas"),
+    duration: Optional[float] = typer.Option(None, help="Modo carga: duração máxima em segundos"),
+    ramp_up: float = typer.Option(0.0, help="Modo carga: segundos para iniciar todos os workers"),
+    rps: Optional[float] = typer.Option(None, help="Modo carga: taxa alvo (requisições/segundo)"),
+    record: bool = typer.Option(False, "--record", help="Gravar as requisições e respostas num cassete da integração"),
+    replay: bool = typer.Option(False, "--replay", help="Responder a partir do cassete gravado, sem acessar a rede"),
+    cassette: str = typer.Option("default", help="Nome do cassete (integrations/<nome>/cassettes/<cassete>.json.gz)"),
+    latency: float = typer.Option(0.0, help="Com --replay: latência simulada (s) por resposta"),
+    suite: bool = typer.Option(False, "--suite", help="Rodar a suíte declarada em integrations/<nome>/suite.yaml"),
+    all_integrations: bool = typer.Option(False, "--all-integrations", help="Rodar as suítes de todas as integrações"),
+    suite_file: Optional[Path] = typer.Option(None, "--suite-file", help="Com --suite: arquivo da suíte (YAML ou JSON)"),
+    junit: Optional[Path] = typer.Option(None, help="Com --suite: salvar o resultado em JUnit XML"),
+    report_file: Optional[Path] = typer.Option(None, "--report", help="Com --suite: salvar o relatório JSON combinado"),
 ):
+    if suite or all_integrations:
+        _run_suite_command(
+            name, all_integrations, suite_file, concurrency, junit, report_file, record, replay, cassette, latency,
+        )
+        return
+    if not name:
+        print("[red]Informe --name (ou use --all-integrations).[/red]")
+        raise typer.Exit(code=1)
+
+    from .core.storage import load_integration_metadata
+
     meta = load_integration_metadata(name)
     if not meta:
         print("[red]Integração não encontrada.[/red]")
@@ -105,8 +586,208 @@ def test(
     if meta.get("auth") == "Bearer":
         headers["Authorization"] = "Bearer <TOKEN>"  # substitua pelo token real se necessário
 
-    status, text = simple_request_test(base_url, endpoint, method, headers)
+    tape = _open_cassette(name, cassette, record, replay, latency)
+
+    if n_requests or duration:
+        from contextlib import nullcontext
+
+        from .core.cassette import CassetteServer
+        from .core.loadtest import run_load_test, save_load_test_report
+
+        # Os workers da carga usam sessões próprias: o cassete é servido em loopback
+        with CassetteServer(tape, base_url) if tape else nullcontext() as srv:
+            report = run_load_test(
+                srv.url if srv else base_url, endpoint, method, headers,
+                requests=n_requests, concurrency=concurrency, duration=duration, ramp_up=ramp_up, rps=rps,
+            )
+        if tape:
+            report["cassette"] = {"mode": tape.mode, "path": str(tape.path)}
+        _print_load_report(report)
+        print(f"[green]Relatório salvo em:[/green] {save_load_test_report(name, report)}")
+        return
+
+    from .core.testing import simple_request_test
+
+    if tape is None:
+        status, text = simple_request_test(base_url, endpoint, method, headers)
+    else:
+        from .core.cassette import CassetteMiss, installed
+
+        try:
+            with installed(tape):
+                status, text = simple_request_test(base_url, endpoint, method, headers)
+        except CassetteMiss as e:
+            print(f"[red]Requisição fora do cassete:[/red] {e} [red](grave de novo com --record)[/red]")
+            raise typer.Exit(code=1)
     print(f"[bold]Status:[/bold] {status}\n[text]\n{text[:1000]}\n[/text]")
+    if tape is not None:
+        print(f"[dim]Cassete ({tape.mode}): {tape.path}[/dim]")
+
+
+def _run_suite_command(
+    name: Optional[str],
+    all_integrations: bool,
+    suite_file: Optional[Path],
+    concurrency: int,
+    junit: Optional[Path],
+    report_file: Optional[Path],
+    record: bool,
+    replay: bool,
+    cassette: str,
+    latency: float,
+) -> None:
+    import json
+
+    from rich.markup import escape
+    from rich.table import Table
+
+    from .core.suite import SuiteError, integrations_with_suites, load_suite, run_suites, save_suite_report, to_junit
+
+    if all_integrations:
+        names = integrations_with_suites()
+        if not names:
+            print("[yellow]Nenhuma integração tem suíte (integrations/<nome>/suite.yaml).[/yellow]")
+            raise typer.Exit(code=1)
+    elif name:
+        names = [name]
+    else:
+        print("[red]Informe --name ou --all-integrations.[/red]")
+        raise typer.Exit(code=1)
+
+    suites = []
+    for n in names:
+        try:
+            suites.append(load_suite(n, suite_file if not all_integrations else None))
+        except (SuiteError, FileNotFoundError, RuntimeError) as e:
+            print(f"[red]Suíte inválida ({escape(n)}):[/red] {escape(str(e))}")
+            raise typer.Exit(code=1)
+
+    tapes, sessions = {}, {}
+    if record or replay:
+        from .core.cassette import cassette_session
+
+        # Uma sessão por integração, cada uma com o seu cassete
+        for s in suites:
+            tapes[s.integration] = _open_cassette(s.integration, cassette, record, replay, latency)
+            sessions[s.integration] = cassette_session(tapes[s.integration], pool_maxsize=concurrency)
+
+    def show(s, r):
+        mark = {"passed": "[green]✔[/green]", "skipped": "[yellow]-[/yellow]"}.get(r["outcome"], "[red]✘[/red]")
+        detail = r["error"] or "; ".join(r["failures"])
+        status = r["status"] if r["status"] is not None else "-"
+        line = f"{mark} {escape(s.integration)} {escape(r['id'])} {r['method']} {status} {r['elapsed_ms']:.0f} ms"
+        print(line + (f" [dim]{escape(detail)}[/dim]" if detail else ""))
+
+    try:
+        report = run_suites(suites, concurrency=concurrency, sessions=sessions, on_result=show)
+    finally:
+        for session in sessions.values():
+            session.close()
+        for tape in tapes.values():
+            if tape.mode == "record":
+                tape.save()
+
+    table = Table(title="Suítes")
+    table.add_column("Integração")
+    for col in ("Passou", "Falhou", "Erro", "Pulado", "Tempo (s)"):
+        table.add_column(col, justify="right")
+    for s in report["suites"]:
+        table.add_row(s["integration"], *(str(s[o]) for o in ("passed", "failed", "error", "skipped")), f"{s['duration_s']:.2f}")
+    print(table)
+
+    for s in report["suites"]:
+        save_suite_report(s["integration"], {**report, "suites": [s]})
+    if report_file:
+        report_file.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"[green]Relatório salvo em:[/green] {report_file}")
+    if junit:
+        junit.write_text(to_junit(report), encoding="utf-8")
+        print(f"[green]JUnit salvo em:[/green] {junit}")
+    if not report["ok"]:
+        raise typer.Exit(code=1)
+
+
+def _open_cassette(name: str, cassette: str, record: bool, replay: bool, latency: float = 0.0):
+    """Cassete da integração para --record/--replay (None sem nenhum dos dois)."""
+    if not (record or replay):
+        return None
+    if record and replay:
+        print("[red]Use --record ou --replay, não os dois.[/red]")
+        raise typer.Exit(code=1)
+    from .core.cassette import cassette_path, open_cassette
+
+    try:
+        return open_cassette(cassette_path(name, cassette), "record" if record else "replay", latency)
+    except FileNotFoundError:
+        print(f"[red]Cassete não encontrado:[/red] {cassette_path(name, cassette)} [red](grave com --record)[/red]")
+        raise typer.Exit(code=1)
+
+
+def _print_load_report(report: dict) -> None:
+    from rich.table import Table
+
+    lat = report["latency_ms"]
+    table = Table(title=f"Carga: {report['method']} {report['url']}")
+    for col in ("Requisições", "Duração (s)", "RPS", "p50", "p90", "p99", "max"):
+        table.add_column(col, justify="right")
+    table.add_row(
+        str(report["requests"]), f"{report['duration_s']:.2f}", f"{report['throughput_rps']:.1f}",
+        *(f"{lat[k]:.1f} ms" for k in ("p50", "p90", "p99", "max")),
+    )
+    print(table)
+
+    codes = Table(title="Status")
+    codes.add_column("Código")
+    codes.add_column("Qtd", justify="right")
+    for code, count in report["status_codes"].items():
+        codes.add_row(code, str(count))
+    print(codes)
+
+    peak = max((b["count"] for b in report["histogram"]), default=0) or 1
+    for b in report["histogram"]:
+        if b["count"]:
+            print(f"{b['bucket']:>10} {'█' * max(1, round(40 * b['count'] / peak))} {b['count']}")
+
+
+@app.command()
+def stats(
+    url: Optional[str] = typer.Option(None, help="Ler /metrics de um servidor web em execução (ex.: http://127.0.0.1:5000)"),
+    reset: bool = typer.Option(False, "--reset", help="Zerar as métricas acumuladas pela CLI"),
+):
+    from rich.table import Table
+    from .core.metrics import METRICS_PATH, Histogram, load_persisted
+
+    if url:
+        import requests
+
+        resp = requests.get(url.rstrip("/") + "/metrics", timeout=10)
+        resp.raise_for_status()
+        print(resp.text, end="")
+        return
+    if reset:
+        METRICS_PATH.unlink(missing_ok=True)
+        print("[green]Métricas zeradas.[/green]")
+        return
+
+    reg = load_persisted()
+    if not reg.metrics():
+        print("[yellow]Nenhuma métrica registrada ainda.[/yellow]")
+        return
+
+    table = Table(title="Métricas acumuladas (CLI)")
+    for col in ("Métrica", "Labels", "Total", "Média", "p95 ≤"):
+        table.add_column(col)
+    for m in reg.metrics():
+        for sample in m.samples():
+            labels = ", ".join(f"{k}={v}" for k, v in sample["labels"].items())
+            if isinstance(m, Histogram):
+                n = sum(sample["counts"])
+                mean = sample["sum"] / n if n else 0.0
+                p95 = Histogram.quantile_from_counts(m.buckets, sample["counts"], 0.95)
+                table.add_row(m.name, labels, str(n), f"{mean:.3f}s", f"{p95}s")
+            else:
+                table.add_row(m.name, labels, f"{sample['value']:g}", "", "")
+    print(table)
 
 
 if __name__ == "__main__":
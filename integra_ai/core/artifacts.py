@@ -0,0 +1,180 @@
+from __future__ import annotations
+import difflib
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from .cache import cache_key
+from .metrics import ARTIFACT_WRITES
+from .storage import integration_dir, integration_file_lock
+
+HISTORY_FILE = "history.jsonl"
+# Hex digits of the content hash kept in artifact file names
+NAME_DIGITS = 12
+_TAIL_BLOCK = 8192
+
+
+def inputs_key(inputs: dict[str, Any]) -> str:
+    """Stable key for everything a generation depends on (prompt, model,
+    template version, spec hash, ...)."""
+    return cache_key("inputs", json.dumps(inputs, sort_keys=True, default=str))
+
+
+def ai_inputs(prompt: str, model: str, language: str, doc: Path | None = None) -> dict[str, Any]:
+    """Inputs of a model-generated client (CLI, batch, jobs and web share them)."""
+    inputs = {"kind": "ai", "prompt": prompt, "model": model, "language": language}
+    if doc is not None:
+        inputs["doc"] = file_digest(doc)
+    return inputs
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        while block := f.read(1024 * 1024):
+            h.update(block)
+    return h.hexdigest()
+
+
+def artifact_path(d: Path, digest: str, ext: str) -> Path:
+    return d / f"generated_{digest[:NAME_DIGITS]}.{ext}"
+
+
+def _history_path(name: str) -> Path:
+    return integration_dir(name) / HISTORY_FILE
+
+
+def head(name: str) -> dict[str, Any] | None:
+    """Latest version of an integration, read from the end of its history
+    so the cost doesn't grow with the number of versions."""
+    p = _history_path(name)
+    try:
+        with p.open("rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - _TAIL_BLOCK))
+            tail = f.read()
+    except OSError:
+        return None
+    lines = tail.rstrip(b"\n").rsplit(b"\n", 1)
+    if not lines[-1]:
+        return None
+    if size > _TAIL_BLOCK and len(lines) == 1:
+        # A single entry longer than the tail block: fall back to a full read
+        entries = history(name)
+        return entries[-1] if entries else None
+    try:
+        return json.loads(lines[-1])
+    except ValueError:
+        return None
+
+
+def history(name: str) -> list[dict[str, Any]]:
+    p = _history_path(name)
+    if not p.exists():
+        return []
+    entries = []
+    for line in p.read_text(encoding="utf-8").splitlines():
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            continue  # torn line from a crashed writer
+    return entries
+
+
+def find_unchanged(name: str, inputs: dict[str, Any] | None) -> Path | None:
+    """The current artifact if it was generated from exactly ``inputs``."""
+    if inputs is None:
+        return None
+    entry = head(name)
+    if entry is None or entry.get("inputs_key") != inputs_key(inputs):
+        return None
+    p = integration_dir(name) / entry["file"]
+    if not p.exists():
+        return None
+    ARTIFACT_WRITES.inc(result="skipped")
+    return p
+
+
+def commit(name: str, tmp: Path, digest: str, ext: str, language: str, inputs: dict[str, Any] | None = None) -> Path:
+    """Move a fully written temp file into the store and record the version.
+
+    Content already present is not written again; a new history entry is only
+    appended when the content or the inputs differ from the current head.
+    """
+    d = integration_dir(name)
+    target = artifact_path(d, digest, ext)
+    # Job workers are separate processes: the version number is read and
+    # appended under a lock they all see
+    with integration_file_lock(name):
+        if target.exists():
+            tmp.unlink(missing_ok=True)
+            ARTIFACT_WRITES.inc(result="duplicate")
+        else:
+            os.replace(tmp, target)
+            ARTIFACT_WRITES.inc(result="new")
+        key = inputs_key(inputs) if inputs is not None else None
+        prev = head(name)
+        if prev is None or prev.get("sha256") != digest or prev.get("inputs_key") != key:
+            entry = {
+                "version": (prev or {}).get("version", 0) + 1,
+                "sha256": digest,
+                "parent": (prev or {}).get("sha256"),
+                "file": target.name,
+                "language": language,
+                "size": target.stat().st_size,
+                "created": time.time(),
+                "inputs_key": key,
+                "model": (inputs or {}).get("model"),
+            }
+            with _history_path(name).open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+    return target
+
+
+def resolve(name: str, ref: str | int | None, entries: list[dict[str, Any]] | None = None) -> dict[str, Any]:
+    """Find a version by number (``3``), offset from the head (``-1``) or hash prefix."""
+    entries = entries if entries is not None else history(name)
+    if not entries:
+        raise LookupError(f"no history for {name}")
+    if ref is None:
+        return entries[-1]
+    ref = str(ref)
+    if ref.lstrip("-").isdigit():
+        n = int(ref)
+        if n <= 0:
+            if -n < len(entries):
+                return entries[n - 1]
+        else:
+            for e in entries:
+                if e["version"] == n:
+                    return e
+        raise LookupError(f"no version {ref} for {name}")
+    matches = {e["sha256"]: e for e in entries if e["sha256"].startswith(ref.lower())}
+    if len(matches) != 1:
+        raise LookupError(f"{'ambiguous' if matches else 'unknown'} hash {ref} for {name}")
+    return next(iter(matches.values()))
+
+
+def diff(name: str, old: str | int | None = None, new: str | int | None = None, context: int = 3) -> str:
+    """Unified diff between two versions; ``new`` defaults to the head and
+    ``old`` to the version before ``new``."""
+    entries = history(name)
+    b = resolve(name, new, entries)
+    if old is not None:
+        a = resolve(name, old, entries)
+    else:
+        i = entries.index(b)
+        a = entries[i - 1] if i > 0 else b
+    d = integration_dir(name)
+    lines = difflib.unified_diff(
+        (d / a["file"]).read_text(encoding="utf-8").splitlines(keepends=True),
+        (d / b["file"]).read_text(encoding="utf-8").splitlines(keepends=True),
+        fromfile=f"v{a['version']} ({a['sha256'][:NAME_DIGITS]})",
+        tofile=f"v{b['version']} ({b['sha256'][:NAME_DIGITS]})",
+        n=context,
+    )
+    return "".join(lines)
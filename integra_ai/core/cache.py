@@ -0,0 +1,152 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from .config import CONFIG_DIR, AppConfig
+from .metrics import CACHE_REQUESTS
+
+CACHE_DIR = CONFIG_DIR / "cache"
+
+
+def cache_key(*parts: str) -> str:
+    """Content address for a cache entry: sha256 over the NUL-joined parts."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResponseCache:
+    """On-disk, content-addressed cache with TTL and size-bounded LRU eviction.
+
+    Each entry lives in ``<root>/<key[:2]>/<key>.json``; the file mtime is
+    bumped on every hit so eviction can drop the least recently used entries.
+    """
+
+    def __init__(
+        self,
+        root: Path = CACHE_DIR,
+        ttl: float = 7 * 24 * 3600,
+        max_entries: int = 500,
+        max_bytes: int = 50 * 1024 * 1024,
+    ) -> None:
+        self.root = Path(root)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        p = self._path(key)
+        try:
+            entry = json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            CACHE_REQUESTS.inc(result="miss")
+            return None
+
+        if self.ttl and time.time() - entry.get("created", 0) > self.ttl:
+            p.unlink(missing_ok=True)
+            with self._lock:
+                self.misses += 1
+            CACHE_REQUESTS.inc(result="miss")
+            return None
+
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        CACHE_REQUESTS.inc(result="hit")
+        return entry.get("value")
+
+    def set(self, key: str, value: str, meta: dict[str, Any] | None = None) -> None:
+        p = self._path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"created": time.time(), "meta": meta or {}, "value": value}
+        tmp = p.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(entry), encoding="utf-8")
+        os.replace(tmp, p)
+        self.evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        out: list[tuple[float, int, Path]] = []
+        if not self.root.exists():
+            return out
+        for p in self.root.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            out.append((st.st_mtime, st.st_size, p))
+        return out
+
+    def evict(self) -> int:
+        """Drop expired entries, then the least recently used until within bounds."""
+        entries = self._entries()
+        now = time.time()
+        removed = 0
+        live = []
+        for mtime, size, p in entries:
+            # mtime only moves forward on hits, so an entry older than the TTL
+            # by mtime is certainly expired by creation time too.
+            if self.ttl and now - mtime > self.ttl:
+                p.unlink(missing_ok=True)
+                removed += 1
+            else:
+                live.append((mtime, size, p))
+
+        live.sort()
+        total = sum(size for _, size, _ in live)
+        while live and (len(live) > self.max_entries or total > self.max_bytes):
+            _, size, p = live.pop(0)
+            p.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        entries = self._entries()
+        for _, _, p in entries:
+            p.unlink(missing_ok=True)
+        return len(entries)
+
+    def stats(self) -> dict[str, Any]:
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache configured from ``AppConfig``."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            cfg = AppConfig.load()
+            _cache = ResponseCache(
+                ttl=cfg.cache_ttl_seconds,
+                max_entries=cfg.cache_max_entries,
+                max_bytes=cfg.cache_max_bytes,
+            )
+        return _cache
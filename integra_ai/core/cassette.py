@@ -0,0 +1,397 @@
+from __future__ import annotations
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .http import build_session, http_config, set_interceptor
+from .metrics import CASSETTE_REQUESTS
+from .storage import integration_dir
+
+CASSETTE_DIR = "cassettes"
+FORMAT_VERSION = 1
+MODES = ("record", "replay")
+
+MATCH_HEADERS = ("accept", "content-type")
+# Credentials sent in the query string are neither matched on nor written to disk
+IGNORE_PARAMS = ("key", "api_key", "apikey", "access_token", "token")
+# Dropped from stored responses: the body is stored decoded and re-framed on replay
+_SKIP_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive", "set-cookie"}
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Replay found no recorded response for a request."""
+
+
+def cassette_path(name: str, cassette: str = "default") -> Path:
+    """``integrations/<name>/cassettes/<cassette>.json.gz``."""
+    return integration_dir(name) / CASSETTE_DIR / f"{cassette}.json.gz"
+
+
+def normalize_url(url: str, ignore_params: Iterable[str] = IGNORE_PARAMS) -> str:
+    """Lower-cased scheme/host, sorted query, credentials removed."""
+    parts = urlsplit(url)
+    ignored = {p.lower() for p in ignore_params}
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in ignored)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", urlencode(query), ""))
+
+
+def body_digest(body: bytes | str | None) -> str:
+    """sha256 of the request body; JSON bodies are canonicalized first so key order doesn't matter."""
+    if body is None:
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        pass
+    return hashlib.sha256(body).hexdigest()
+
+
+class Cassette:
+    """Recorded HTTP interactions of one integration (or one generation run),
+    stored gzip-compressed and indexed by method, normalized URL, body hash
+    and the ``match_headers`` values.
+
+    A key recorded several times is replayed in order (consecutive identical
+    responses are stored once); the last response then repeats. Recording a
+    key again replaces what an earlier session stored for it.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        mode: str = "replay",
+        latency: float = 0.0,
+        match_headers: Iterable[str] = MATCH_HEADERS,
+        ignore_params: Iterable[str] = IGNORE_PARAMS,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"unknown cassette mode: {mode!r} (expected record or replay)")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self.match_headers = tuple(h.lower() for h in match_headers)
+        self.ignore_params = tuple(ignore_params)
+        self._lock = threading.Lock()
+        self._interactions: dict[str, list[dict[str, Any]]] = {}
+        self._played: dict[str, int] = {}
+        self._recorded: set[str] = set()
+        self.dirty = False
+        if self.path.exists():
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                self._interactions = json.load(f).get("interactions", {})
+        elif mode == "replay":
+            raise FileNotFoundError(f"no cassette at {self.path} (record one with --record first)")
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._interactions.values())
+
+    def key(self, method: str, url: str, body: bytes | str | None, headers: Any) -> str:
+        matched = [f"{h}:{(headers.get(h) or '').strip().lower()}" for h in self.match_headers]
+        return hashlib.sha256(
+            "\n".join([method.upper(), normalize_url(url, self.ignore_params), body_digest(body), *matched]).encode("utf-8")
+        ).hexdigest()
+
+    def play(self, key: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            entries = self._interactions.get(key)
+            if not entries:
+                CASSETTE_REQUESTS.inc(mode="replay", result="miss")
+                return None
+            i = self._played.get(key, 0)
+            self._played[key] = i + 1
+        CASSETTE_REQUESTS.inc(mode="replay", result="hit")
+        return entries[min(i, len(entries) - 1)]
+
+    def record(self, key: str, method: str, url: str, status: int, reason: str, headers: Any, body: bytes, elapsed: float) -> None:
+        try:
+            stored = {"text": body.decode("utf-8")}
+        except UnicodeDecodeError:
+            stored = {"base64": base64.b64encode(body).decode("ascii")}
+        entry = {
+            "request": {"method": method.upper(), "url": normalize_url(url, self.ignore_params)},
+            "response": {
+                "status": status,
+                "reason": reason,
+                "headers": {k: v for k, v in headers.items() if k.lower() not in _SKIP_RESPONSE_HEADERS},
+                **stored,
+            },
+            "elapsed": round(elapsed, 4),
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            if key not in self._recorded:
+                self._recorded.add(key)
+                self._interactions[key] = []
+            entries = self._interactions[key]
+            # A load test repeats the same request thousands of times: keep only changes
+            if not entries or entries[-1]["response"] != entry["response"]:
+                entries.append(entry)
+                self.dirty = True
+        CASSETTE_REQUESTS.inc(mode="record", result="recorded")
+
+    def save(self) -> Path:
+        with self._lock:
+            if not self.dirty:
+                return self.path
+            data = json.dumps({"version": FORMAT_VERSION, "interactions": self._interactions}, sort_keys=True)
+            self.dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+        return self.path
+
+    def wait(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    # Hooks for core/http.py: wrap the transports of every client built while installed
+
+    def adapter(self, inner: BaseAdapter) -> "CassetteAdapter":
+        return CassetteAdapter(self, inner)
+
+    def async_transport(self, inner: Any) -> Any:
+        return _async_transport(self, inner)
+
+
+def open_cassette(path: Path, mode: str = "replay", latency: float = 0.0) -> Cassette:
+    """Cassette with the matching rules from ``AppConfig``."""
+    cfg = http_config()
+    return Cassette(path, mode, latency, cfg.cassette_match_headers, cfg.cassette_ignore_params)
+
+
+def cassette_session(cassette: Cassette, pool_maxsize: int = 10) -> requests.Session:
+    """Session of its own (no retries) going through ``cassette``, for callers
+    that run several cassettes side by side instead of installing one globally."""
+    session = build_session(pool_maxsize=pool_maxsize, retries=0)
+    for prefix in ("http://", "https://"):
+        session.mount(prefix, cassette.adapter(session.adapters[prefix]))
+    return session
+
+
+@contextmanager
+def installed(cassette: Cassette) -> Iterator[Cassette]:
+    """Record or replay every call made through ``core.http`` (endpoint tests,
+    Gemini and other providers, sync and async) inside the block."""
+    set_interceptor(cassette)
+    try:
+        yield cassette
+    finally:
+        set_interceptor(None)
+        if cassette.mode == "record":
+            cassette.save()
+
+
+def use_cassette(path: Path, mode: str = "replay", latency: float = 0.0):
+    """``installed`` for the cassette at ``path``."""
+    return installed(open_cassette(path, mode, latency))
+
+
+def from_env(path: str) -> Cassette:
+    """Cassette at ``path`` (the ``INTEGRA_CASSETTE`` value) in mode
+    ``INTEGRA_CASSETTE_MODE`` (default replay; ``INTEGRA_CASSETTE_LATENCY``
+    seconds), saved at exit."""
+    import atexit
+
+    cassette = open_cassette(
+        Path(path),
+        os.environ.get("INTEGRA_CASSETTE_MODE", "replay"),
+        float(os.environ.get("INTEGRA_CASSETTE_LATENCY") or 0),
+    )
+    if cassette.mode == "record":
+        atexit.register(cassette.save)
+    return cassette
+
+
+def _body(entry: dict[str, Any]) -> bytes:
+    resp = entry["response"]
+    return base64.b64decode(resp["base64"]) if "base64" in resp else resp["text"].encode("utf-8")
+
+
+class CassetteAdapter(BaseAdapter):
+    """requests transport adapter: records through ``inner`` or replays from the cassette."""
+
+    def __init__(self, cassette: Cassette, inner: BaseAdapter) -> None:
+        super().__init__()
+        self.cassette = cassette
+        self.inner = inner
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> requests.Response:
+        # A streamed upload (file or generator body) can't be read twice; it is matched without its body
+        body = request.body if isinstance(request.body, (bytes, str)) else None
+        key = self.cassette.key(request.method or "GET", request.url or "", body, request.headers)
+        if self.cassette.mode == "record":
+            start = time.perf_counter()
+            resp = self.inner.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+            body = resp.content  # buffers streamed bodies; iter_content/iter_lines then read from memory
+            self.cassette.record(
+                key, request.method or "GET", request.url or "", resp.status_code, resp.reason or "", resp.headers, body,
+                time.perf_counter() - start,
+            )
+            return resp
+        entry = self.cassette.play(key)
+        if entry is None:
+            raise CassetteMiss(f"no recorded response for {request.method} {normalize_url(request.url or '')}", request=request)
+        self.cassette.wait()
+        return self._build(request, entry)
+
+    @staticmethod
+    def _build(request: requests.PreparedRequest, entry: dict[str, Any]) -> requests.Response:
+        body = _body(entry)
+        resp = requests.Response()
+        resp.status_code = entry["response"]["status"]
+        resp.reason = entry["response"].get("reason", "")
+        resp.headers = CaseInsensitiveDict(entry["response"]["headers"])
+        resp.headers["Content-Length"] = str(len(body))
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp.raw = io.BytesIO(body)
+        resp._content = body
+        resp._content_consumed = True
+        resp.url = request.url or ""
+        resp.request = request
+        return resp
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+def _async_transport(cassette: Cassette, inner: Any) -> Any:
+    import asyncio
+
+    import httpx
+
+    class CassetteTransport(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+            body = await request.aread()
+            key = cassette.key(request.method, str(request.url), body or None, request.headers)
+            if cassette.mode == "record":
+                start = time.perf_counter()
+                resp = await inner.handle_async_request(request)
+                content = await resp.aread()
+                cassette.record(
+                    key, request.method, str(request.url), resp.status_code, resp.reason_phrase, resp.headers, content,
+                    time.perf_counter() - start,
+                )
+                headers = [(k, v) for k, v in resp.headers.items() if k.lower() not in ("content-encoding", "content-length")]
+                return httpx.Response(resp.status_code, headers=headers, content=content, request=request)
+            entry = cassette.play(key)
+            if entry is None:
+                raise CassetteMiss(f"no recorded response for {request.method} {normalize_url(str(request.url))}")
+            if cassette.latency:
+                await asyncio.sleep(cassette.latency)
+            return httpx.Response(entry["response"]["status"], headers=entry["response"]["headers"], content=_body(entry), request=request)
+
+        async def aclose(self) -> None:
+            await inner.aclose()
+
+    return CassetteTransport()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_Server"
+
+    def log_message(self, *args: Any) -> None:  # silence stderr
+        pass
+
+    def _handle(self) -> None:
+        srv = self.server.owner
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        headers = {k: v for k, v in self.headers.items() if k.lower() not in ("host", "content-length", "connection")}
+        try:
+            resp = srv.session.request(self.command, srv.origin + self.path, headers=headers, data=body, timeout=srv.timeout)
+        except CassetteMiss as e:
+            data = json.dumps({"error": str(e)}).encode()
+            status, resp_headers = 599, {"Content-Type": "application/json"}
+        except requests.RequestException as e:
+            data = json.dumps({"error": str(e)}).encode()
+            status, resp_headers = 502, {"Content-Type": "application/json"}
+        else:
+            data, status = resp.content, resp.status_code
+            resp_headers = {k: v for k, v in resp.headers.items() if k.lower() not in _SKIP_RESPONSE_HEADERS}
+        self.send_response(status)
+        for k, v in resp_headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _handle
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    owner: "CassetteServer"
+
+
+class CassetteServer:
+    """Loopback HTTP server in front of a cassette, for clients in another
+    process (generated clients, load tests): replays recorded responses, or
+    in record mode proxies to ``origin`` and records them. Requests that are
+    not in the cassette get status 599.
+    """
+
+    def __init__(self, cassette: Cassette, origin: str, host: str = "127.0.0.1", port: int = 0, timeout: float = 30.0) -> None:
+        self.cassette = cassette
+        self.origin = origin.rstrip("/")
+        self.timeout = timeout
+        self.session = cassette_session(cassette)
+        self._srv = _Server((host, port), _Handler)
+        self._srv.owner = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._srv.socket.getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "CassetteServer":
+        self._thread = threading.Thread(target=self._srv.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._srv.serve_forever()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._srv.shutdown()
+        self._srv.server_close()
+        self.session.close()
+        if self.cassette.mode == "record":
+            self.cassette.save()
+
+    def __enter__(self) -> "CassetteServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
@@ -0,0 +1,180 @@
+from __future__ import annotations
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS integrations (
+    name TEXT PRIMARY KEY,
+    language TEXT,
+    auth TEXT,
+    base_url TEXT,
+    generated_file TEXT,
+    generated_at REAL,
+    updated_at REAL NOT NULL,
+    meta TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS ix_integrations_language ON integrations(language);
+CREATE INDEX IF NOT EXISTS ix_integrations_auth ON integrations(auth);
+CREATE INDEX IF NOT EXISTS ix_integrations_base_url ON integrations(base_url);
+CREATE INDEX IF NOT EXISTS ix_integrations_generated_at ON integrations(generated_at);
+CREATE TABLE IF NOT EXISTS catalog_state (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Bumped in the same transaction as every write, so readers in any process
+# can tell whether the index changed (HTTP validators for the web listing)
+_BUMP_VERSION = """
+INSERT INTO catalog_state (key, value) VALUES ('version', '1')
+ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+"""
+_SET_MODIFIED = "INSERT OR REPLACE INTO catalog_state (key, value) VALUES ('modified_at', ?)"
+
+SORTS = {
+    "name": "name ASC",
+    "recent": "generated_at IS NULL, generated_at DESC, name ASC",
+}
+
+
+class Catalog:
+    """SQLite index of integrations, so listing and filtering never scan the disk.
+
+    ``integration.json`` files stay the source of truth; the catalog is kept in
+    sync by the storage layer and can be rebuilt at any time with ``reindex``.
+    Each thread gets its own connection; WAL mode lets readers run alongside
+    the writer.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def is_built(self) -> bool:
+        row = self._conn().execute("SELECT value FROM catalog_state WHERE key = 'built_at'").fetchone()
+        return row is not None
+
+    def _touch(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute(_BUMP_VERSION)
+        conn.execute(_SET_MODIFIED, (str(now),))
+
+    def state(self) -> tuple[int, float]:
+        """``(version, modified_at)`` of the index; the version changes on every write."""
+        rows = dict(self._conn().execute("SELECT key, value FROM catalog_state WHERE key IN ('version', 'modified_at')").fetchall())
+        return int(rows.get("version") or 0), float(rows.get("modified_at") or 0)
+
+    def upsert(self, name: str, meta: dict[str, Any], generated_at: float | None = None) -> None:
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO integrations (name, language, auth, base_url, generated_file, generated_at, updated_at, meta)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    language = excluded.language,
+                    auth = excluded.auth,
+                    base_url = excluded.base_url,
+                    generated_file = COALESCE(excluded.generated_file, integrations.generated_file),
+                    generated_at = COALESCE(excluded.generated_at, integrations.generated_at),
+                    updated_at = excluded.updated_at,
+                    meta = excluded.meta
+                """,
+                (
+                    name,
+                    meta.get("language"),
+                    meta.get("auth"),
+                    meta.get("base_url"),
+                    meta.get("generated_file"),
+                    generated_at,
+                    now,
+                    json.dumps(meta),
+                ),
+            )
+            self._touch(conn, now)
+
+    def record_generated(self, name: str, generated_file: str, generated_at: float | None = None) -> None:
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO integrations (name, generated_file, generated_at, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    generated_file = excluded.generated_file,
+                    generated_at = excluded.generated_at,
+                    updated_at = excluded.updated_at
+                """,
+                (name, generated_file, generated_at or now, now),
+            )
+            self._touch(conn, now)
+
+    def _where(self, filters: dict[str, str | None]) -> tuple[str, list[Any]]:
+        clauses, args = [], []
+        for col in ("language", "auth", "base_url"):
+            value = filters.get(col)
+            if value is not None:
+                clauses.append(f"{col} = ?")
+                args.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def query(
+        self,
+        language: str | None = None,
+        auth: str | None = None,
+        base_url: str | None = None,
+        sort: str = "name",
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        if sort not in SORTS:
+            raise ValueError(f"sort must be one of {sorted(SORTS)}")
+        where, args = self._where({"language": language, "auth": auth, "base_url": base_url})
+        sql = (
+            "SELECT name, language, auth, base_url, generated_file, generated_at, updated_at FROM integrations"
+            f"{where} ORDER BY {SORTS[sort]} LIMIT ? OFFSET ?"
+        )
+        rows = self._conn().execute(sql, [*args, -1 if limit is None else limit, offset]).fetchall()
+        return [dict(r) for r in rows]
+
+    def count(self, language: str | None = None, auth: str | None = None, base_url: str | None = None) -> int:
+        where, args = self._where({"language": language, "auth": auth, "base_url": base_url})
+        return self._conn().execute(f"SELECT COUNT(*) FROM integrations{where}", args).fetchone()[0]
+
+    def names(self) -> list[str]:
+        return [r[0] for r in self._conn().execute("SELECT name FROM integrations ORDER BY name")]
+
+    def replace_all(self, entries: Iterable[tuple[str, dict[str, Any], float | None]]) -> int:
+        """Atomically swap the index contents for ``(name, meta, generated_at)`` entries."""
+        conn = self._conn()
+        now = time.time()
+        n = 0
+        with conn:
+            conn.execute("DELETE FROM integrations")
+            for name, meta, generated_at in entries:
+                conn.execute(
+                    "INSERT INTO integrations (name, language, auth, base_url, generated_file, generated_at, updated_at, meta)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        name, meta.get("language"), meta.get("auth"), meta.get("base_url"),
+                        meta.get("generated_file"), generated_at, now, json.dumps(meta),
+                    ),
+                )
+                n += 1
+            conn.execute("INSERT OR REPLACE INTO catalog_state (key, value) VALUES ('built_at', ?)", (str(now),))
+            self._touch(conn, now)
+        return n
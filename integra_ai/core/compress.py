@@ -0,0 +1,48 @@
+from __future__ import annotations
+import gzip
+from functools import lru_cache
+from typing import Any, Optional
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "text/css",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+    "text/x-python",
+}
+
+
+@lru_cache(maxsize=None)
+def _brotli() -> Any:
+    try:
+        import brotli  # optional: pip install "integra-ai[web]"
+    except ImportError:
+        return None
+    return brotli
+
+
+def available() -> tuple[str, ...]:
+    """Content codings this process can produce, preferred first."""
+    return ("br", "gzip") if _brotli() is not None else ("gzip",)
+
+
+def negotiate(accept_encodings: Any) -> Optional[str]:
+    """Best coding the client accepts (``Accept-Encoding`` parsed by werkzeug,
+    or anything with ``quality(name)``); None means send it uncompressed."""
+    best, best_q = None, 0.0
+    for encoding in available():
+        q = accept_encodings.quality(encoding)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data: bytes, encoding: str, level: int = 6) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if encoding == "br" and _brotli() is not None:
+        # brotli quality runs 0-11; gzip-like levels map to its fast-but-dense middle range
+        return _brotli().compress(data, quality=min(11, max(0, level - 1)))
+    raise ValueError(f"unsupported content coding: {encoding!r}")
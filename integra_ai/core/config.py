@@ -1,15 +1,20 @@
 from __future__ import annotations
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
 import json
 import os
-from dotenv import load_dotenv
+from functools import lru_cache
 
 CONFIG_DIR = Path(".integra")
-CONFIG_DIR.mkdir(parents=True, exist_ok=True)
 CONFIG_PATH = CONFIG_DIR / "config.json"
 
-load_dotenv()
+
+@lru_cache(maxsize=None)
+def load_env() -> None:
+    """Load ``.env`` into the environment once, on first need rather than at import."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
 
 
 @dataclass
@@ -17,19 +22,123 @@ class AppConfig:
     project_name: str = "Integra.AI"
     language: str = "python"  # python | node
     output_dir: str = "integrations"
+    cache_ttl_seconds: int = 7 * 24 * 3600
+    cache_max_entries: int = 500
+    cache_max_bytes: int = 50 * 1024 * 1024
+    http_pool_connections: int = 10
+    http_pool_maxsize: int = 10
+    http_pool_block: bool = False
+    http_retries: int = 3
+    http_backoff_factor: float = 0.5
+    http_timeout: float = 30.0
+    gemini_timeout: float = 60.0
+    # Record/replay (`integra test --record/--replay`): what identifies a request besides method, URL and body
+    cassette_match_headers: list[str] = field(default_factory=lambda: ["accept", "content-type"])
+    cassette_ignore_params: list[str] = field(default_factory=lambda: ["key", "api_key", "apikey", "access_token", "token"])
+    provider: str = "gemini"  # gemini | openai (llama.cpp, vLLM...) | stub; INTEGRA_PROVIDER overrides
+    openai_base_url: str = "http://127.0.0.1:8080/v1"
+    openai_api_key_env: str = "OPENAI_API_KEY"
+    openai_timeout: float = 120.0
+    stub_url: str = "http://127.0.0.1:8765"  # `integra stub`
+    gemini_rpm: float = 60.0
+    gemini_keys_file: str = ".integra/gemini_keys"  # one key per line, optional "rpm=" / "tpm=" overrides
+    gemini_key_rpm: float = 60.0  # per-key budgets for the GEMINI_API_KEYS pool
+    gemini_key_tpm: float = 1_000_000
+    gemini_key_max_wait: float = 300.0  # give up when no key frees up within this many seconds
+    # Same as gemini.DEFAULT_MODEL; "auto" picks the model per prompt from
+    # model_routes (first match on task / max_tokens)
+    model_default: str = "gemini-1.5-flash"
+    model_routes: list[dict] = field(default_factory=lambda: [
+        {"task": "reduce", "models": ["gemini-1.5-pro", "gemini-1.5-flash"]},
+        {"max_tokens": 8000, "models": ["gemini-1.5-flash", "gemini-1.5-pro"]},
+        {"models": ["gemini-1.5-pro", "gemini-1.5-flash"]},
+    ])
+    model_window_seconds: float = 300.0  # moving window for per-model latency and error rate
+    model_min_samples: int = 5
+    model_max_error_rate: float = 0.5  # above this a model drops to the end of its chain
+    model_slow_seconds: float = 90.0  # ... and likewise when its p95 latency exceeds this
+    model_hedge: bool = False  # race the next model once a call outlives the primary's p95 (a second paid call)
+    model_hedge_min_delay: float = 5.0
+    batch_workers: int = 4
+    batch_per_model_concurrency: int = 4
+    batch_engine: str = "thread"  # thread | async
+    log_level: str = "INFO"
+    log_levels: dict[str, str] = field(default_factory=dict)  # per-module overrides, e.g. {"integra_ai.ai": "DEBUG"}
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_backup_count: int = 5
+    log_rotate_hours: float = 24.0
+    prompt_max_tokens: int = 30000  # larger prompts are split into chunks (map-reduce)
+    prompt_workers: int = 4
+    prompt_token_count: str = "local"  # local | remote (countTokens near the limit)
+    prompt_reduce: str = "model"  # model | local
+    validation: str = "warn"  # off | warn (record and save) | strict (refuse to save failing code)
+    validation_workers: int = 2  # process pool for the checks; 0 runs them inline
+    validation_import: bool = False  # unsafe: executes the generated module on this machine
+    validation_timeout: float = 10.0
+    validation_repair_attempts: int = 0  # re-prompt the model with the errors this many times
+    web_compress_min_bytes: int = 1024  # smaller responses are sent uncompressed
+    web_compress_level: int = 6  # gzip level (brotli uses the matching quality)
+    web_max_request_bytes: int = 16 * 1024 * 1024  # larger request bodies get 413
+    serve_server: str = "auto"  # `integra serve`: auto | gunicorn | waitress
+    serve_host: str = "127.0.0.1"
+    serve_port: int = 5000
+    serve_workers: int = 0  # gunicorn processes; 0 = 2 x CPUs + 1
+    serve_threads: int = 4  # per worker; an SSE stream holds one for its whole duration
+    serve_preload: bool = True  # import the app once in the master before forking
+    serve_timeout: float = 120.0
+    serve_graceful_timeout: float = 30.0
+    serve_keepalive: float = 5.0
+    serve_max_requests: int = 0  # recycle a worker after this many requests (0 = never)
+    serve_backlog: int = 2048
+    serve_connection_limit: int = 1000  # simultaneous clients per worker
+    job_workers: int = 2
+    job_timeout: float = 120.0
+    job_max_attempts: int = 3
+    job_poll_interval: float = 0.5
 
     @property
     def gemini_api_key(self) -> str | None:
+        load_env()
         return os.getenv("GEMINI_API_KEY")
 
     def save(self) -> None:
-        CONFIG_PATH.write_text(json.dumps(asdict(self), indent=2), encoding="utf-8")
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        # Atomic, so processes reading through ``cached`` never see a half-written file
+        tmp = CONFIG_PATH.with_name(f".{CONFIG_PATH.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(asdict(self), indent=2), encoding="utf-8")
+        os.replace(tmp, CONFIG_PATH)
 
     @staticmethod
-    def load() -> "AppConfig":
+    def load(create: bool = True) -> "AppConfig":
         if CONFIG_PATH.exists():
             data = json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
             return AppConfig(**data)
         cfg = AppConfig()
-        cfg.save()
+        if create:
+            cfg.save()
+        return cfg
+
+    @staticmethod
+    def cached() -> "AppConfig":
+        """Process-wide config for hot paths (web requests, per-call defaults).
+
+        Held in memory and re-read only when ``config.json`` changes (mtime,
+        size or inode differ, including a switch of working directory); never
+        creates the file. The instance is shared: treat it as read-only and
+        use ``load`` for a copy to modify.
+        """
+        global _cached
+        try:
+            st = CONFIG_PATH.stat()
+            stamp: tuple = (os.getcwd(), st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = (os.getcwd(), None)
+        current = _cached
+        if current is not None and current[0] == stamp:
+            return current[1]
+        cfg = AppConfig.load(create=False)
+        _cached = (stamp, cfg)
         return cfg
+
+
+_cached: tuple[tuple, AppConfig] | None = None
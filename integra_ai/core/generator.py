@@ -1,18 +1,93 @@
 from __future__ import annotations
+import hashlib
+import os
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
-from .storage import integration_dir, slugify
+from typing import Any, Callable
+from . import artifacts
+from .metrics import FILE_WRITE
+from .storage import get_catalog, integration_dir
 
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
+EXTENSIONS = {"python": "py", "node": "js"}
 
-def save_generated_code(name: str, language: str, content: str) -> Path:
-    d = integration_dir(name)
-    ext = {"python": "py", "node": "js"}.get(language, "txt")
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    p = d / f"generated_{ts}.{ext}"
-    p.write_text(content, encoding="utf-8")
-    return p
+
+@lru_cache(maxsize=None)
+def template_version() -> str:
+    """Hash of the bundled templates, part of the inputs of template-based
+    generation so editing a template invalidates unchanged-input skips."""
+    h = hashlib.sha256()
+    for p in sorted(TEMPLATES_DIR.rglob("*")):
+        if p.is_file() and "__pycache__" not in p.parts:
+            h.update(p.relative_to(TEMPLATES_DIR).as_posix().encode())
+            h.update(p.read_bytes())
+    return h.hexdigest()[:16]
+
+
+class GeneratedCodeWriter:
+    """Write generated code to disk incrementally as chunks arrive.
+
+    Chunks go to a hidden temp file while being hashed; on success it is
+    renamed to ``generated_<hash>.<ext>`` (or dropped if that content is
+    already stored) and the version is appended to the integration history
+    along with the ``inputs`` it was generated from. If the block raises, the
+    temp file is removed so a failed stream never leaves a truncated client.
+    ``clean`` (e.g. ``validation.strip_fences``) rewrites the complete text
+    once before it is stored.
+    """
+
+    path: Path
+
+    def __init__(
+        self, name: str, language: str, inputs: dict[str, Any] | None = None, clean: Callable[[str], str] | None = None
+    ) -> None:
+        self.name = name
+        self.language = language
+        self.inputs = inputs
+        self.clean = clean
+
+    def __enter__(self) -> "GeneratedCodeWriter":
+        d = integration_dir(self.name)
+        self._tmp = d / f".generated.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._f = self._tmp.open("w", encoding="utf-8")
+        self._hash = hashlib.sha256()
+        self._write_seconds = 0.0
+        return self
+
+    def write(self, chunk: str) -> None:
+        start = time.perf_counter()
+        self._hash.update(chunk.encode("utf-8"))
+        self._f.write(chunk)
+        self._write_seconds += time.perf_counter() - start
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._f.close()
+        if exc_type is not None:
+            self._tmp.unlink(missing_ok=True)
+            return
+        ext = EXTENSIONS.get(self.language, "txt")
+        start = time.perf_counter()
+        digest = self._hash.hexdigest()
+        if self.clean is not None:
+            text = self._tmp.read_text(encoding="utf-8")
+            cleaned = self.clean(text)
+            if cleaned != text:
+                self._tmp.write_text(cleaned, encoding="utf-8")
+                digest = hashlib.sha256(cleaned.encode("utf-8")).hexdigest()
+        self.path = artifacts.commit(self.name, self._tmp, digest, ext, self.language, self.inputs)
+        # Only disk time: for streams the gaps between chunks are network time
+        FILE_WRITE.observe(self._write_seconds + time.perf_counter() - start, language=self.language)
+        get_catalog().record_generated(self.path.parent.name, str(self.path))
+
+
+def save_generated_code(name: str, language: str, content: str, inputs: dict[str, Any] | None = None) -> Path:
+    with GeneratedCodeWriter(name, language, inputs) as w:
+        w.write(content)
+    return w.path
 
 
 def render_python_client(base_url: str, token: str | None = None) -> str:
-    template = (Path(__file__).parent.parent / "templates" / "python_client_template.py").read_text(encoding="utf-8")
+    template = (TEMPLATES_DIR / "python_client_template.py").read_text(encoding="utf-8")
     return template.replace("{{BASE_URL}}", base_url).replace("{{TOKEN}}", token or "")
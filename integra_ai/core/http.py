@@ -0,0 +1,205 @@
+from __future__ import annotations
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import AppConfig
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# With several Gemini keys a 429 is answered by switching keys, not by waiting
+SERVER_RETRY_STATUSES = (500, 502, 503, 504)
+# Retried by default; anything else (a user's POST/PATCH) may already have taken effect
+IDEMPOTENT_METHODS = Retry.DEFAULT_ALLOWED_METHODS
+
+_config: AppConfig | None = None
+_sessions: dict[tuple[tuple[int, ...], bool], requests.Session] = {}
+_lock = threading.Lock()
+# httpx.AsyncClient is bound to the loop it was first used on: one per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+# Wraps the transports of every client built while installed (a core.cassette.Cassette)
+_interceptor: Any = None
+_env_checked = False
+
+
+def build_session(
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    pool_block: bool = False,
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+    retry_statuses: tuple[int, ...] = RETRY_STATUSES,
+    retry_post: bool = False,
+) -> requests.Session:
+    """Keep-alive session with bounded per-host pools and retry/backoff on 429/5xx.
+
+    ``pool_connections`` is the number of hosts whose pools are kept,
+    ``pool_maxsize`` the connections kept per host; with ``pool_block`` the
+    per-host limit is enforced instead of opening throwaway connections.
+    Only idempotent methods are retried unless ``retry_post`` is set.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=retry_statuses,
+        allowed_methods=None if retry_post else IDEMPOTENT_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        max_retries=retry,
+    )
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def http_config() -> AppConfig:
+    """Config snapshot used by the HTTP layer, loaded once per process."""
+    global _config
+    if _config is None:
+        _config = AppConfig.load()
+    return _config
+
+
+def get_session(retry_statuses: tuple[int, ...] = RETRY_STATUSES, retry_post: bool = False) -> requests.Session:
+    """Process-wide pooled session shared by Gemini calls and endpoint tests.
+
+    ``retry_post`` is for LLM provider calls: generation is a POST that can
+    safely be sent again. Endpoint tests keep the default, so a user's
+    POST/PATCH is never replayed against their API.
+    """
+    with _lock:
+        _check_env_interceptor()
+        session = _sessions.get((retry_statuses, retry_post))
+        if session is None:
+            cfg = http_config()
+            session = _sessions[(retry_statuses, retry_post)] = build_session(
+                pool_connections=cfg.http_pool_connections,
+                pool_maxsize=cfg.http_pool_maxsize,
+                pool_block=cfg.http_pool_block,
+                retries=cfg.http_retries,
+                backoff_factor=cfg.http_backoff_factor,
+                retry_statuses=retry_statuses,
+                retry_post=retry_post,
+            )
+            if _interceptor is not None:
+                for prefix in ("https://", "http://"):
+                    session.mount(prefix, _interceptor.adapter(session.adapters[prefix]))
+        return session
+
+
+def set_interceptor(interceptor: Any) -> None:
+    """Send the shared session and async clients through ``interceptor``
+    (record/replay, see ``core.cassette``); None restores direct access.
+    Clients built before the switch are dropped."""
+    global _interceptor, _env_checked
+    with _lock:
+        _interceptor = interceptor
+        _env_checked = True
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _async_clients.clear()
+
+
+def _check_env_interceptor() -> None:
+    # INTEGRA_CASSETTE=<path> (+ INTEGRA_CASSETTE_MODE) puts a whole process
+    # (web app, workers, batch) in record/replay mode; checked once, under _lock
+    global _interceptor, _env_checked
+    if _env_checked:
+        return
+    _env_checked = True
+    path = os.environ.get("INTEGRA_CASSETTE")
+    if path:
+        from .cassette import from_env
+
+        _interceptor = from_env(path)
+
+
+def reset_session() -> None:
+    """Close the shared sessions; the next ``get_session`` builds a fresh one."""
+    global _config
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _config = None
+
+
+def _import_httpx():
+    try:
+        import httpx
+    except ImportError as e:
+        raise RuntimeError("httpx is required for the async engine (pip install 'integra-ai[async]')") from e
+    return httpx
+
+
+def get_async_client():
+    """Pooled ``httpx.AsyncClient`` for the running event loop, sized from ``AppConfig``."""
+    httpx = _import_httpx()
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        cfg = http_config()
+        limits = httpx.Limits(
+            max_connections=cfg.http_pool_connections * cfg.http_pool_maxsize,
+            max_keepalive_connections=cfg.http_pool_maxsize,
+        )
+        with _lock:
+            _check_env_interceptor()
+            interceptor = _interceptor
+        transport = interceptor.async_transport(httpx.AsyncHTTPTransport(limits=limits)) if interceptor is not None else None
+        client = httpx.AsyncClient(limits=limits, timeout=cfg.http_timeout, transport=transport)
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_client() -> None:
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _retry_after(value: str | None) -> float | None:
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+async def async_request(
+    method: str, url: str, retry_statuses: tuple[int, ...] = RETRY_STATUSES, retry_post: bool = False, **kwargs: Any,
+):
+    """``AsyncClient.request`` with the same retry policy as ``build_session``:
+    transport errors and 429/5xx are retried with exponential backoff,
+    honouring ``Retry-After``. Without ``retry_post`` a non-idempotent method
+    is only retried when the connection failed (nothing was sent). The last
+    response is returned unraised."""
+    httpx = _import_httpx()
+    cfg = http_config()
+    client = get_async_client()
+    retry_all = retry_post or method.upper() in IDEMPOTENT_METHODS
+    attempt = 0
+    while True:
+        try:
+            resp = await client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            if attempt >= cfg.http_retries or not (retry_all or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))):
+                raise
+            delay = None
+        else:
+            if resp.status_code not in retry_statuses or attempt >= cfg.http_retries or not retry_all:
+                return resp
+            delay = _retry_after(resp.headers.get("Retry-After"))
+            await resp.aclose()
+        await asyncio.sleep(delay if delay is not None else cfg.http_backoff_factor * (2 ** attempt))
+        attempt += 1
@@ -0,0 +1,365 @@
+from __future__ import annotations
+import importlib
+import json
+import multiprocessing
+import os
+import signal
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+
+from .config import CONFIG_DIR
+from .logger import get_logger
+from .metrics import COALESCED, persist
+
+JOBS_PATH = CONFIG_DIR / "jobs.db"
+DEFAULT_HANDLER = "integra_ai.ai.tasks:run_job"
+# Extra lease time on top of the job timeout before another worker may reclaim it
+LEASE_GRACE = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    timeout REAL NOT NULL,
+    run_after REAL NOT NULL,
+    lease_until REAL,
+    worker TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_ready ON jobs(status, priority DESC, created_at);
+"""
+# Columns added after the first release; applied to existing databases on open
+_MIGRATIONS = {
+    "dedupe_key": "ALTER TABLE jobs ADD COLUMN dedupe_key TEXT",
+}
+
+STATUSES = ("queued", "running", "done", "failed")
+
+
+class JobQueue:
+    """Persistent priority queue of background jobs in a local SQLite file.
+
+    ``claim`` hands a job to one worker under a lease of ``timeout`` plus a
+    grace period; a job whose worker died (or the whole machine restarted)
+    is requeued once its lease expires, and counts as a failed attempt.
+    Failed attempts are retried with exponential backoff up to
+    ``max_attempts``. Like the catalog, each thread gets its own connection.
+    """
+
+    def __init__(self, path: Path = JOBS_PATH, retry_backoff: float = 2.0) -> None:
+        self.path = Path(path)
+        self.retry_backoff = retry_backoff
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit mode: claim() manages its own IMMEDIATE transaction
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(jobs)")}
+            for column, ddl in _MIGRATIONS.items():
+                if column not in columns:
+                    try:
+                        conn.execute(ddl)
+                    except sqlite3.OperationalError as e:
+                        # Another thread or process added it between our check and the ALTER
+                        if "duplicate column" not in str(e):
+                            raise
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_dedupe ON jobs(dedupe_key, status)")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        priority: int = 0,
+        timeout: float = 120.0,
+        max_attempts: int = 3,
+        dedupe_key: str | None = None,
+    ) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._conn().execute(
+            "INSERT INTO jobs (id, kind, payload, status, priority, max_attempts, timeout, run_after, created_at, dedupe_key)"
+            " VALUES (?, ?, ?, 'queued', ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload), int(priority), max(1, int(max_attempts)), float(timeout), now, now, dedupe_key),
+        )
+        return job_id
+
+    def enqueue_or_join(self, kind: str, payload: dict[str, Any], dedupe_key: str, **kwargs: Any) -> tuple[str, bool]:
+        """Return the id of a queued or running job with ``dedupe_key``, or enqueue a new one.
+
+        The second item is True when an existing job was joined. A joined job
+        keeps its priority unless the new request's is higher.
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running') LIMIT 1", (dedupe_key,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET priority = MAX(priority, ?) WHERE id = ?", (int(kwargs.get("priority", 0)), row["id"])
+                )
+                conn.execute("COMMIT")
+                COALESCED.inc(scope="job")
+                return row["id"], True
+            job_id = self.enqueue(kind, payload, dedupe_key=dedupe_key, **kwargs)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return job_id, False
+
+    def claim(self, worker: str) -> dict[str, Any] | None:
+        """Lease the highest-priority ready job to ``worker``, or return None."""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases: the worker crashed or hung. Retry or give up.
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'lease expired (worker lost or timed out)',"
+                " finished_at = ?, lease_until = NULL"
+                " WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts",
+                (now, now),
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL, lease_until = NULL,"
+                " error = 'lease expired (worker lost or timed out)'"
+                " WHERE status = 'running' AND lease_until < ?",
+                (now,),
+            )
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' AND run_after <= ?"
+                " ORDER BY priority DESC, created_at ASC LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1,"
+                " started_at = ?, lease_until = ? + timeout + ? WHERE id = ?",
+                (worker, now, now, LEASE_GRACE, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row["id"])
+
+    def complete(self, job_id: str, result: Any) -> None:
+        self._conn().execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, finished_at = ?, lease_until = NULL"
+            " WHERE id = ? AND status = 'running'",
+            (json.dumps(result), time.time(), job_id),
+        )
+
+    def fail(self, job_id: str, error: str) -> str:
+        """Record a failed attempt; requeue with backoff if attempts remain. Returns the new status."""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = 'running'", (job_id,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return "unknown"
+            if row["attempts"] < row["max_attempts"]:
+                delay = self.retry_backoff * 2 ** (row["attempts"] - 1)
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, worker = NULL, lease_until = NULL, run_after = ?"
+                    " WHERE id = ?",
+                    (error, now + delay, job_id),
+                )
+                status = "queued"
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, lease_until = NULL WHERE id = ?",
+                    (error, now, job_id),
+                )
+                status = "failed"
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return status
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def counts(self) -> dict[str, int]:
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {s: 0 for s in STATUSES} | {r[0]: r[1] for r in rows}
+
+
+_queue: JobQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
+
+
+def _resolve(handler: str) -> Callable[[dict[str, Any]], Any]:
+    module, _, attr = handler.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def run_worker(
+    path: Path = JOBS_PATH,
+    handler: str | Callable[[dict[str, Any]], Any] = DEFAULT_HANDLER,
+    poll_interval: float = 0.5,
+    stop: Any = None,
+    worker_id: str | None = None,
+) -> None:
+    """Claim and run jobs until ``stop`` is set.
+
+    ``handler`` is called with the claimed job; worker processes get it as a
+    ``module:function`` path.
+    Each job runs in a daemon thread so its timeout can be enforced; a thread
+    that overruns cannot be killed, so the worker records the timeout and
+    returns, letting ``WorkerPool`` replace the process.
+    """
+    log = get_logger(__name__)
+    queue = JobQueue(path)
+    fn = _resolve(handler) if isinstance(handler, str) else handler
+    stop = stop or threading.Event()
+    worker_id = worker_id or f"{os.getpid()}"
+
+    while not stop.is_set():
+        job = queue.claim(worker_id)
+        if job is None:
+            stop.wait(poll_interval)
+            continue
+
+        outcome: dict[str, Any] = {}
+
+        def execute(job=job, outcome=outcome) -> None:
+            try:
+                outcome["result"] = fn(job)
+            except Exception as e:  # noqa: BLE001 - recorded on the job
+                outcome["error"] = f"{type(e).__name__}: {e}"
+
+        t = threading.Thread(target=execute, daemon=True)
+        t.start()
+        t.join(job["timeout"])
+        if t.is_alive():
+            status = queue.fail(job["id"], f"timed out after {job['timeout']:g}s")
+            log.warning("Job timed out", extra={"job_id": job["id"], "kind": job["kind"], "status": status})
+            return
+        if "error" in outcome:
+            status = queue.fail(job["id"], outcome["error"])
+            log.warning("Job failed", extra={"job_id": job["id"], "kind": job["kind"], "status": status, "error": outcome["error"]})
+        else:
+            queue.complete(job["id"], outcome.get("result"))
+            log.info("Job done", extra={"job_id": job["id"], "kind": job["kind"], "attempt": job["attempts"]})
+
+
+def _worker_main(path: str, handler: str, poll_interval: float, stop: Any, worker_id: str) -> None:
+    # Ctrl+C reaches the whole process group; shutdown is driven by the pool's stop event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        run_worker(Path(path), handler, poll_interval, stop, worker_id)
+    finally:
+        # Spawned workers never run the CLI callback, so fold their metrics in here
+        persist()
+
+
+class WorkerPool:
+    """Supervised pool of worker processes draining a ``JobQueue``.
+
+    Processes are started with ``spawn`` (the same on every platform) and
+    replaced if they exit, e.g. after a job timeout.
+    """
+
+    def __init__(
+        self,
+        processes: int = 2,
+        path: Path = JOBS_PATH,
+        handler: str = DEFAULT_HANDLER,
+        poll_interval: float = 0.5,
+    ) -> None:
+        self.processes = max(1, processes)
+        self.path = Path(path)
+        self.handler = handler
+        self.poll_interval = poll_interval
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._procs: list[Any] = []
+        self._supervisor: threading.Thread | None = None
+        self._log = get_logger(__name__)
+
+    def _spawn(self, i: int):
+        p = self._ctx.Process(
+            target=_worker_main,
+            args=(str(self.path), self.handler, self.poll_interval, self._stop, f"{os.getpid()}-w{i}"),
+            name=f"integra-worker-{i}",
+            daemon=True,
+        )
+        p.start()
+        return p
+
+    def _supervise(self) -> None:
+        while not self._stop.wait(1.0):
+            for i, p in enumerate(self._procs):
+                if not p.is_alive():
+                    self._log.warning("Worker exited, restarting", extra={"worker": p.name, "exitcode": p.exitcode})
+                    self._procs[i] = self._spawn(i)
+
+    def start(self) -> "WorkerPool":
+        self._procs = [self._spawn(i) for i in range(self.processes)]
+        self._supervisor = threading.Thread(target=self._supervise, name="integra-worker-supervisor", daemon=True)
+        self._supervisor.start()
+        return self
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop after the jobs in progress finish; stragglers are terminated."""
+        self._stop.set()
+        if self._supervisor is not None:
+            self._supervisor.join()
+        deadline = time.monotonic() + timeout
+        for p in self._procs:
+            p.join(max(0.0, deadline - time.monotonic()))
+            if p.is_alive():
+                p.terminate()
+                p.join()
+
+    def __enter__(self) -> "WorkerPool":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
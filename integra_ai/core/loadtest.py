@@ -0,0 +1,142 @@
+from __future__ import annotations
+import json
+import math
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from .http import build_session
+from .ratelimit import TokenBucket
+from .storage import integration_dir
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open-ended
+HISTOGRAM_BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), math.ceil(pct / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+def histogram(latencies_ms: list[float]) -> list[dict[str, Any]]:
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for v in latencies_ms:
+        for i, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if v <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f"<={b}ms" for b in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}ms"]
+    return [{"bucket": label, "count": c} for label, c in zip(labels, counts)]
+
+
+def run_load_test(
+    base_url: str,
+    endpoint: str = "/",
+    method: str = "GET",
+    headers: dict[str, str] | None = None,
+    payload: Any = None,
+    requests: int | None = 100,
+    concurrency: int = 10,
+    duration: float | None = None,
+    ramp_up: float = 0.0,
+    rps: float | None = None,
+    timeout: float = 30.0,
+) -> dict[str, Any]:
+    """Hammer one endpoint and summarize latency, throughput and status codes.
+
+    Stops after ``requests`` requests or ``duration`` seconds, whichever
+    comes first (at least one must be set). Workers start evenly spread over
+    ``ramp_up`` seconds; ``rps`` caps the aggregate rate. Retries are
+    disabled so every attempt is measured as-is. ``payload`` may be a
+    callable taking the request index, for a distinct body per request.
+    """
+    if not requests and not duration:
+        raise ValueError("requests or duration is required")
+    concurrency = max(1, concurrency)
+    url = base_url.rstrip("/") + "/" + endpoint.lstrip("/")
+    m = method.upper()
+    session = build_session(pool_maxsize=concurrency, pool_block=True, retries=0)
+    limiter = TokenBucket(rate=rps, capacity=1) if rps else None
+
+    latencies: list[float] = []
+    statuses: Counter[str] = Counter()
+    lock = threading.Lock()
+    issued = 0
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    def take_slot() -> int | None:
+        nonlocal issued
+        with lock:
+            if requests and issued >= requests:
+                return None
+            if deadline and time.perf_counter() >= deadline:
+                return None
+            issued += 1
+            return issued - 1
+
+    def worker(i: int) -> None:
+        if ramp_up:
+            time.sleep(ramp_up * i / concurrency)
+        while (n := take_slot()) is not None:
+            body = payload(n) if callable(payload) else payload
+            if limiter is not None:
+                limiter.acquire()
+            t0 = time.perf_counter()
+            try:
+                resp = session.request(m, url, headers=headers or {}, json=body, timeout=timeout)
+                resp.content  # include body transfer in the latency
+                key = str(resp.status_code)
+            except Exception as e:  # noqa: BLE001 - counted as an error bucket
+                key = f"error:{type(e).__name__}"
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            with lock:
+                latencies.append(elapsed_ms)
+                statuses[key] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    session.close()
+
+    ordered = sorted(latencies)
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "url": url,
+        "method": m,
+        "concurrency": concurrency,
+        "ramp_up": ramp_up,
+        "target_rps": rps,
+        "requests": len(ordered),
+        "duration_s": round(wall, 3),
+        "throughput_rps": round(len(ordered) / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "min": round(ordered[0], 2) if ordered else 0.0,
+            "mean": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+            "p50": round(percentile(ordered, 50), 2),
+            "p90": round(percentile(ordered, 90), 2),
+            "p99": round(percentile(ordered, 99), 2),
+            "max": round(ordered[-1], 2) if ordered else 0.0,
+        },
+        "status_codes": dict(sorted(statuses.items())),
+        "histogram": histogram(ordered),
+    }
+
+
+def save_load_test_report(name: str, report: dict[str, Any]) -> Path:
+    """Store the report as ``loadtest_<ts>.json`` next to ``integration.json``."""
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    p = integration_dir(name) / f"loadtest_{ts}.json"
+    p.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return p
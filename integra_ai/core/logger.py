@@ -1,23 +1,147 @@
 from __future__ import annotations
+import atexit
+import gzip
 import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+import time
 from pathlib import Path
 
+from .config import AppConfig
+
 _LOG_DIR = Path("logs")
-_LOG_DIR.mkdir(parents=True, exist_ok=True)
 
 _formatter = logging.Formatter(
     fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
 )
 
-_console = logging.StreamHandler()
-_console.setFormatter(_formatter)
+_configured = False
+_configure_lock = threading.Lock()
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _drop_formatter_attrs(logger, method_name, event_dict):
+    # Set on the shared record by the queue handler / text formatter, not user extras
+    event_dict.pop("message", None)
+    event_dict.pop("asctime", None)
+    return event_dict
+
+
+def json_formatter() -> logging.Formatter:
+    """structlog formatter rendering one JSON object per record, ``extra=`` fields included."""
+    import structlog
+
+    return structlog.stdlib.ProcessorFormatter(
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(),
+        ],
+        foreign_pre_chain=[
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.ExtraAdder(),
+            _drop_formatter_attrs,
+            structlog.processors.TimeStamper(fmt="iso"),
+        ],
+    )
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class RotatingGzipFileHandler(logging.handlers.RotatingFileHandler):
+    """Rolls over when the file exceeds ``max_bytes`` or is older than
+    ``interval`` seconds; rotated files are gzipped (``integra.log.1.gz``...).
+
+    The directory is created and the file opened on the first record.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, backup_count: int, interval: float) -> None:
+        super().__init__(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.interval = interval
+        self.rollover_at = time.time() + interval if interval else float("inf")
+        self.namer = lambda name: name + ".gz"
+        self.rotator = _gzip_rotator
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if time.time() >= self.rollover_at and os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename):
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        if self.interval:
+            self.rollover_at = time.time() + self.interval
+
+
+def _configure() -> None:
+    global _configured, _listener
+    with _configure_lock:
+        if _configured:
+            return
+        cfg = AppConfig.load(create=False)
+
+        _console = logging.StreamHandler()
+        _console.setFormatter(_formatter)
+
+        _file = RotatingGzipFileHandler(
+            _LOG_DIR / "integra.log",
+            max_bytes=cfg.log_max_bytes,
+            backup_count=cfg.log_backup_count,
+            interval=cfg.log_rotate_hours * 3600,
+        )
+        _file.setFormatter(json_formatter())
+
+        # Callers only enqueue; a background thread does the formatting and disk I/O
+        q: queue.SimpleQueue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(q, _console, _file, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+        _queue_handler = logging.handlers.QueueHandler(q)
+        _queue_handler.setFormatter(logging.Formatter("%(message)s"))
+        logging.basicConfig(level=cfg.log_level.upper(), handlers=[_queue_handler])
+        # httpx logs every request URL at INFO, which would leak the ?key= parameter
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        for name, level in cfg.log_levels.items():
+            logging.getLogger(name).setLevel(level.upper())
+        _configured = True
+
+
+def _restart_listener_in_child() -> None:
+    # A forked child (gunicorn --preload, fork-started workers) inherits the
+    # queue but not the listener thread: start a fresh one on the same handlers
+    global _listener
+    if _listener is not None:
+        _listener = logging.handlers.QueueListener(_listener.queue, *_listener.handlers, respect_handler_level=True)
+        _listener.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
 
-_file = logging.FileHandler(_LOG_DIR / "integra.log", encoding="utf-8")
-_file.setFormatter(_formatter)
 
-logging.basicConfig(level=logging.INFO, handlers=[_console, _file])
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background listener."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
 
 
 def get_logger(name: str) -> logging.Logger:
+    _configure()
     return logging.getLogger(name)
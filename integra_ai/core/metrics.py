@@ -0,0 +1,331 @@
+from __future__ import annotations
+import bisect
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from .config import CONFIG_DIR
+
+METRICS_PATH = CONFIG_DIR / "metrics.json"
+
+# Seconds; covers file writes (ms) up to slow Gemini generations (minutes)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(v: Any) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class _Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...]) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    @abstractmethod
+    def samples(self) -> list[dict[str, Any]]: ...
+
+    @abstractmethod
+    def merge(self, samples: list[dict[str, Any]]) -> None: ...
+
+    @abstractmethod
+    def render(self) -> list[str]: ...
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [{"labels": self._labels(k), "value": v} for k, v in self._values.items()]
+
+    def merge(self, samples: list[dict[str, Any]]) -> None:
+        for s in samples:
+            self.inc(s["value"], **s["labels"])
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_fmt_labels(s['labels'])} {_fmt_value(s['value'])}" for s in self.samples()]
+
+
+class Gauge(Counter):
+    """Current value per label set; merging keeps the newest value instead of summing."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def merge(self, samples: list[dict[str, Any]]) -> None:
+        for s in samples:
+            self.set(s["value"], **s["labels"])
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [per-bucket counts..., +Inf count], sum
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][i] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[dict[str, Any]]:
+        """Observe the block's duration; labels can be filled in inside the block."""
+        start = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    @staticmethod
+    def quantile_from_counts(buckets: tuple[float, ...], counts: list[int], q: float) -> float:
+        """Upper bound of the bucket holding quantile ``q`` (inf if in the overflow bucket)."""
+        total = sum(counts)
+        if not total:
+            return 0.0
+        cumulative = 0
+        for bound, c in zip((*buckets, float("inf")), counts):
+            cumulative += c
+            if cumulative >= q * total:
+                return bound
+        return float("inf")
+
+    def samples(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [
+                {"labels": self._labels(k), "counts": list(c), "sum": s[0]}
+                for k, (c, s) in self._values.items()
+            ]
+
+    def merge(self, samples: list[dict[str, Any]]) -> None:
+        for s in samples:
+            if len(s["counts"]) != len(self.buckets) + 1:
+                continue  # bucket layout changed between versions; drop old data
+            key = self._key(s["labels"])
+            with self._lock:
+                entry = self._values.get(key)
+                if entry is None:
+                    entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+                for i, c in enumerate(s["counts"]):
+                    entry[0][i] += c
+                entry[1][0] += s["sum"]
+
+    def render(self) -> list[str]:
+        lines = []
+        for s in self.samples():
+            cumulative = 0
+            for bound, c in zip((*self.buckets, float("inf")), s["counts"]):
+                cumulative += c
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_fmt_labels({**s['labels'], 'le': le})} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(s['labels'])} {_fmt_value(s['sum'])}")
+            lines.append(f"{self.name}_count{_fmt_labels(s['labels'])} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Process-wide set of metrics with Prometheus text exposition."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args: Any, **kwargs: Any):
+        with self._lock:
+            m = self._metrics.get(name)
+            if m is None:
+                m = self._metrics[name] = cls(name, *args, **kwargs)
+            elif type(m) is not cls:
+                raise ValueError(f"metric {name} already registered as {m.type}")
+            return m
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(
+        self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets)
+
+    def render(self) -> str:
+        out = []
+        for m in list(self._metrics.values()):
+            lines = m.render()
+            if not lines:
+                continue
+            out.append(f"# HELP {m.name} {m.help}")
+            out.append(f"# TYPE {m.name} {m.type}")
+            out.extend(lines)
+        return "\n".join(out) + "\n"
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            name: {"type": m.type, "help": m.help, "labelnames": list(m.labelnames), "samples": m.samples()}
+            | ({"buckets": list(m.buckets)} if isinstance(m, Histogram) else {})
+            for name, m in list(self._metrics.items())
+            if m.samples()
+        }
+
+    def merge(self, snapshot: dict[str, Any]) -> None:
+        for name, data in snapshot.items():
+            if data["type"] == "gauge":
+                self.gauge(name, data["help"], tuple(data["labelnames"])).merge(data["samples"])
+            elif data["type"] == "counter":
+                self.counter(name, data["help"], tuple(data["labelnames"])).merge(data["samples"])
+            elif data["type"] == "histogram":
+                buckets = tuple(data.get("buckets") or DEFAULT_BUCKETS)
+                self.histogram(name, data["help"], tuple(data["labelnames"]), buckets).merge(data["samples"])
+
+    def metrics(self) -> list[_Metric]:
+        return list(self._metrics.values())
+
+
+REGISTRY = Registry()
+
+# Shared instruments, created up-front so every module records into the same series
+GEMINI_LATENCY = REGISTRY.histogram(
+    "integra_gemini_request_seconds", "Gemini API call latency", ("model", "method", "status")
+)
+GEMINI_TTFB = REGISTRY.histogram(
+    "integra_gemini_ttfb_seconds", "Time to first streamed chunk from Gemini", ("model",)
+)
+GEMINI_TOKENS = REGISTRY.counter(
+    "integra_gemini_tokens_total", "Tokens reported by Gemini usageMetadata", ("model", "kind")
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "integra_cache_requests_total", "Response cache lookups", ("result",)
+)
+COALESCED = REGISTRY.counter(
+    "integra_coalesced_requests_total", "Generation requests that joined an identical in-flight call", ("scope",)
+)
+FILE_WRITE = REGISTRY.histogram(
+    "integra_generated_file_write_seconds", "Time spent writing generated code to disk", ("language",)
+)
+ARTIFACT_WRITES = REGISTRY.counter(
+    "integra_artifact_writes_total", "Generated artifacts by outcome (new, duplicate content, skipped as unchanged)", ("result",)
+)
+GEMINI_KEY_REQUESTS = REGISTRY.counter(
+    "integra_gemini_key_requests_total", "Gemini calls per API key (masked) and outcome", ("key", "result")
+)
+GEMINI_KEY_USAGE = REGISTRY.gauge(
+    "integra_gemini_key_usage", "Requests/tokens spent per API key in the last minute", ("key", "budget")
+)
+GEMINI_KEY_LIMIT = REGISTRY.gauge(
+    "integra_gemini_key_limit", "Per-minute budget per API key", ("key", "budget")
+)
+GEMINI_KEY_COOLDOWN = REGISTRY.gauge(
+    "integra_gemini_key_cooldown_seconds", "Seconds left before a rate-limited API key is used again", ("key",)
+)
+MODEL_ROUTING = REGISTRY.counter(
+    "integra_model_routing_total", "Model routing events (routed, error, hedge, hedge_won, primary_won)", ("task", "model", "event")
+)
+LLM_LATENCY = REGISTRY.histogram(
+    "integra_llm_request_seconds", "Latency of calls to non-Gemini LLM providers", ("provider", "model", "method", "status")
+)
+VALIDATIONS = REGISTRY.counter(
+    "integra_validations_total", "Generated code validations by outcome (passed, warning, failed)", ("language", "status", "cached")
+)
+CASSETTE_REQUESTS = REGISTRY.counter(
+    "integra_cassette_requests_total", "HTTP calls served from or recorded to cassettes", ("mode", "result")
+)
+SUITE_STEPS = REGISTRY.counter(
+    "integra_suite_steps_total", "Test suite steps by outcome (passed, failed, error, skipped)", ("integration", "outcome")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "integra_http_request_seconds", "Web request latency by route", ("route", "method", "status")
+)
+
+
+def record_usage(model: str, data: dict[str, Any]) -> None:
+    usage = data.get("usageMetadata") or {}
+    for field, kind in (("promptTokenCount", "prompt"), ("candidatesTokenCount", "candidates"), ("totalTokenCount", "total")):
+        if usage.get(field):
+            GEMINI_TOKENS.inc(usage[field], model=model, kind=kind)
+
+
+def persist(path: Path = METRICS_PATH) -> None:
+    """Fold this process' samples into ``path`` so short-lived CLI runs add up.
+
+    Concurrent processes can race here; losing a run's samples is acceptable
+    for these statistics, so there is no cross-process lock.
+    """
+    snap = REGISTRY.snapshot()
+    if not snap:
+        return
+    merged = Registry()
+    try:
+        merged.merge(json.loads(path.read_text(encoding="utf-8")))
+    except (OSError, ValueError):
+        pass
+    merged.merge(snap)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(merged.snapshot()), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_persisted(path: Path = METRICS_PATH) -> Registry:
+    reg = Registry()
+    try:
+        reg.merge(json.loads(path.read_text(encoding="utf-8")))
+    except (OSError, ValueError):
+        pass
+    return reg
@@ -0,0 +1,656 @@
+from __future__ import annotations
+import hashlib
+import json
+import keyword
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator
+
+from .cache import CACHE_DIR
+
+# Bump when the normalized format changes so stale cache entries are ignored
+PARSER_VERSION = "1"
+SPEC_CACHE_DIR = CACHE_DIR / "specs"
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates" / "openapi"
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+ANY: dict[str, Any] = {"k": "any"}
+_PRIMITIVES = ("string", "integer", "number", "boolean")
+# Names the generated modules define or import themselves
+_RESERVED_TYPES = {"Any", "Literal", "TypedDict", "TypeAlias", "HTTPAdapter", "Retry", "Object", "Array", "Promise", "Error", "URL"}
+# Module-level names of the generated clients an operation must not shadow
+_RESERVED_NAMES = {"os", "requests", "quote", "fetch", "process", "exports", "require", "module", "console", "buffer"}
+_JS_RESERVED = set("""
+    arguments await break case catch class const continue debugger default delete do else enum eval export
+    extends false finally for function if implements import in instanceof interface let new null package
+    private protected public return static super switch this throw true try typeof var void while with yield
+""".split())
+
+
+@dataclass
+class ParsedSpec:
+    """Normalized view of an OpenAPI 3 / Swagger 2 document.
+
+    Everything but the operations is held in memory; operations live one
+    per line in the cache file and are streamed by ``operations()``.
+    """
+
+    title: str
+    version: str
+    base_url: str
+    auth: str  # Bearer | ApiKey | Basic | None
+    api_key: dict[str, str] | None
+    schemas: dict[str, dict[str, Any]]
+    operation_count: int
+    ops_path: Path
+    source: Path = field(default=Path("."))
+    digest: str = ""  # content hash of the source file (with the parser version)
+
+    def operations(self) -> Iterator[dict[str, Any]]:
+        with self.ops_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+
+# --- names -----------------------------------------------------------------
+
+def snake_case(name: str) -> str:
+    s = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", name)
+    s = re.sub(r"[^0-9a-zA-Z]+", "_", s).strip("_").lower()
+    if not s:
+        s = "param"
+    if s[0].isdigit():
+        s = f"p_{s}"
+    return f"{s}_" if keyword.iskeyword(s) else s
+
+
+def js_ident(snake: str) -> str:
+    """camelCase form of a ``snake_case`` identifier, safe as a JS name."""
+    core = snake.rstrip("_")
+    head, *rest = core.split("_")
+    name = head + "".join(p.capitalize() for p in rest) + snake[len(core):]
+    return f"{name}_" if name in _JS_RESERVED else name
+
+
+def type_name(name: str) -> str:
+    s = re.sub(r"\W+", "_", name).strip("_") or "Schema"
+    if s[0].isdigit():
+        s = f"_{s}"
+    s = s[0].upper() + s[1:]
+    return f"{s}_" if s in _RESERVED_TYPES or keyword.iskeyword(s) else s
+
+
+def _operation_name(method: str, path: str, op: dict[str, Any]) -> str:
+    if op.get("operationId"):
+        return snake_case(op["operationId"])
+    parts = [method]
+    for seg in path.strip("/").split("/"):
+        if seg.startswith("{") and seg.endswith("}"):
+            parts.append(f"by_{seg[1:-1]}")
+        elif seg:
+            parts.append(seg)
+    return snake_case("_".join(parts))
+
+
+# --- schema normalization --------------------------------------------------
+
+def _deref(obj: Any, top: dict[str, Any], depth: int = 0) -> Any:
+    """Follow local ``$ref`` pointers (``#/components/...``)."""
+    while isinstance(obj, dict) and isinstance(obj.get("$ref"), str) and depth < 32:
+        ref = obj["$ref"]
+        if not ref.startswith("#/"):
+            return {}
+        node: Any = top
+        for token in ref[2:].split("/"):
+            token = token.replace("~1", "/").replace("~0", "~")
+            node = node.get(token) if isinstance(node, dict) else None
+        obj = node if node is not None else {}
+        depth += 1
+    return obj
+
+
+def _schema_ref_name(ref: str) -> str | None:
+    for prefix in ("#/components/schemas/", "#/definitions/"):
+        if ref.startswith(prefix):
+            return ref[len(prefix):].replace("~1", "/").replace("~0", "~")
+    return None
+
+
+def schema_type(schema: Any, top: dict[str, Any], depth: int = 0) -> dict[str, Any]:
+    """Language-neutral type tree for a JSON schema (rendered by template filters)."""
+    if not isinstance(schema, dict) or depth > 16:
+        return ANY
+    if "$ref" in schema:
+        name = _schema_ref_name(schema["$ref"])
+        if name is not None:
+            return {"k": "ref", "name": type_name(name)}
+        return schema_type(_deref(schema, top), top, depth + 1)
+
+    t: dict[str, Any]
+    for key in ("oneOf", "anyOf"):
+        if isinstance(schema.get(key), list):
+            t = {"k": "union", "of": [schema_type(s, top, depth + 1) for s in schema[key]]}
+            break
+    else:
+        if isinstance(schema.get("allOf"), list) and len(schema["allOf"]) == 1:
+            t = schema_type(schema["allOf"][0], top, depth + 1)
+        elif isinstance(schema.get("enum"), list) and all(isinstance(v, (str, int, float, bool)) for v in schema["enum"]):
+            t = {"k": "enum", "values": schema["enum"]}
+        else:
+            kind = schema.get("type")
+            if isinstance(kind, list):
+                nullable = "null" in kind
+                kind = next((k for k in kind if k != "null"), None)
+                if nullable:
+                    schema = {**schema, "nullable": True}
+            if kind == "array":
+                t = {"k": "array", "items": schema_type(schema.get("items"), top, depth + 1)}
+            elif kind == "object" or "properties" in schema or "allOf" in schema:
+                extra = schema.get("additionalProperties")
+                t = {"k": "map", "values": schema_type(extra, top, depth + 1) if isinstance(extra, dict) else ANY}
+            elif kind in _PRIMITIVES:
+                t = {"k": "prim", "n": kind, "fmt": schema.get("format")}
+            else:
+                t = ANY
+    if schema.get("nullable") and t is not ANY:
+        t = {"k": "union", "of": [t, {"k": "null"}]}
+    return t
+
+
+def _object_fields(schema: dict[str, Any], top: dict[str, Any], depth: int = 0) -> list[dict[str, Any]] | None:
+    """Properties of an object schema, following ``allOf``; None if not an object."""
+    schema = _deref(schema, top)
+    if not isinstance(schema, dict) or depth > 8:
+        return None
+    fields: dict[str, dict[str, Any]] = {}
+    if isinstance(schema.get("allOf"), list):
+        for part in schema["allOf"]:
+            sub = _object_fields(part, top, depth + 1)
+            if sub is None:
+                return None
+            fields.update((f["name"], f) for f in sub)
+    props = schema.get("properties")
+    if not isinstance(props, dict):
+        return list(fields.values()) if fields else None
+    required = set(schema.get("required") or ())
+    for name, prop in props.items():
+        fields[name] = {
+            "name": name,
+            "type": schema_type(prop, top),
+            "required": name in required,
+            "description": (prop.get("description") or "") if isinstance(prop, dict) else "",
+        }
+    return list(fields.values())
+
+
+def _schemas(top: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    raw = (top.get("components") or {}).get("schemas") or top.get("definitions") or {}
+    out: dict[str, dict[str, Any]] = {}
+    for name, schema in raw.items():
+        fields = _object_fields(schema, top)
+        if fields is not None:
+            out[type_name(name)] = {"kind": "object", "fields": fields}
+        else:
+            out[type_name(name)] = {"kind": "alias", "type": schema_type(schema, top)}
+    return out
+
+
+# --- operations ------------------------------------------------------------
+
+_BODY_KINDS = (
+    ("application/json", "json"),
+    ("application/x-www-form-urlencoded", "form"),
+    ("multipart/form-data", "multipart"),
+)
+
+
+def _body(op: dict[str, Any], params: list[dict[str, Any]], top: dict[str, Any]) -> dict[str, Any] | None:
+    body = _deref(op.get("requestBody"), top)
+    if isinstance(body, dict) and isinstance(body.get("content"), dict):
+        content = body["content"]
+        for media, kind in _BODY_KINDS:
+            for ct, media_obj in content.items():
+                if ct.split(";")[0].strip() == media or (kind == "json" and ct.endswith("+json")):
+                    return {"kind": kind, "type": schema_type((media_obj or {}).get("schema"), top), "required": bool(body.get("required"))}
+        return {"kind": "raw", "type": ANY, "required": bool(body.get("required"))}
+    # Swagger 2: a single "in: body" parameter, or formData parameters
+    for p in params:
+        if p.get("in") == "body":
+            return {"kind": "json", "type": schema_type(p.get("schema"), top), "required": bool(p.get("required"))}
+    if any(p.get("in") == "formData" for p in params):
+        return {"kind": "form", "type": {"k": "map", "values": ANY}, "required": True}
+    return None
+
+
+def _returns(op: dict[str, Any], top: dict[str, Any]) -> dict[str, Any]:
+    responses = op.get("responses") or {}
+    for code in sorted(responses, key=str):
+        if not str(code).startswith("2"):
+            continue
+        resp = _deref(responses[code], top)
+        if not isinstance(resp, dict):
+            continue
+        if str(code) == "204":
+            return {"k": "null"}
+        if "schema" in resp:  # Swagger 2
+            return schema_type(resp["schema"], top)
+        for ct, media in (resp.get("content") or {}).items():
+            if "json" in ct:
+                return schema_type((media or {}).get("schema"), top)
+        return ANY
+    return ANY
+
+
+def _operation(path: str, method: str, op: dict[str, Any], shared: list[Any], top: dict[str, Any]) -> dict[str, Any]:
+    merged: dict[tuple[str, str], dict[str, Any]] = {}
+    for p in [*shared, *(op.get("parameters") or [])]:
+        p = _deref(p, top)
+        if isinstance(p, dict) and p.get("name"):
+            merged[(p["name"], p.get("in", ""))] = p
+    raw_params = list(merged.values())
+
+    params, idents = [], {"body"}
+    for p in raw_params:
+        if p.get("in") not in ("path", "query", "header"):
+            continue
+        ident = snake_case(p["name"])
+        while ident in idents:
+            ident += "_"
+        idents.add(ident)
+        params.append({
+            "name": p["name"],
+            "ident": ident,
+            "in": p["in"],
+            "required": bool(p.get("required")) or p["in"] == "path",
+            "type": schema_type(p.get("schema", p), top),
+            "description": p.get("description") or "",
+        })
+    summary = (op.get("summary") or op.get("description") or "").strip()
+    return {
+        "name": _operation_name(method, path, op),
+        "method": method.upper(),
+        "path": path,
+        "summary": summary.splitlines()[0] if summary else "",
+        "deprecated": bool(op.get("deprecated")),
+        "params": params,
+        "body": _body(op, raw_params, top),
+        "returns": _returns(op, top),
+    }
+
+
+def _base_url(top: dict[str, Any]) -> str:
+    servers = top.get("servers")
+    if isinstance(servers, list) and servers and isinstance(servers[0], dict):
+        url = servers[0].get("url", "")
+        for name, var in (servers[0].get("variables") or {}).items():
+            url = url.replace("{" + name + "}", str(var.get("default", "")))
+        return url
+    if top.get("host"):
+        scheme = (top.get("schemes") or ["https"])[0]
+        return f"{scheme}://{top['host']}{top.get('basePath', '')}"
+    return ""
+
+
+def _auth(top: dict[str, Any]) -> tuple[str, dict[str, str] | None]:
+    schemes = (top.get("components") or {}).get("securitySchemes") or top.get("securityDefinitions") or {}
+    for scheme in schemes.values():
+        scheme = _deref(scheme, top)
+        kind = scheme.get("type")
+        if kind == "http" and str(scheme.get("scheme", "")).lower() == "basic" or kind == "basic":
+            return "Basic", None
+        if kind in ("http", "oauth2", "openIdConnect"):
+            return "Bearer", None
+        if kind == "apiKey" and scheme.get("in") in ("header", "query"):
+            return "ApiKey", {"name": scheme.get("name", "X-API-Key"), "in": scheme["in"]}
+    return "None", None
+
+
+# --- reading ---------------------------------------------------------------
+
+def _iter_json_stream(path: Path, top: dict[str, Any]) -> Iterator[tuple[str, Any]]:
+    """Stream a JSON spec with ijson: yields ``(path, path_item)`` one at a time
+    while every other top-level member is collected into ``top``."""
+    import ijson
+    from ijson.common import ObjectBuilder
+
+    with path.open("rb") as f:
+        top_key = path_key = ""
+        builder: ObjectBuilder | None = None
+        depth = 0
+        target: str | None = None
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if builder is None:
+                if event == "map_key":
+                    if prefix == "":
+                        top_key = value
+                    else:
+                        path_key = value
+                    continue
+                if prefix == "" or (top_key == "paths" and prefix == "paths" and event in ("start_map", "end_map")):
+                    continue
+                builder = ObjectBuilder()
+                target = path_key if top_key == "paths" and prefix != "paths" else None
+                depth = 0
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+            if depth == 0:
+                if target is not None:
+                    yield target, builder.value
+                else:
+                    top[top_key] = builder.value
+                builder = None
+
+
+def _load_whole(path: Path) -> dict[str, Any]:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise RuntimeError("PyYAML is required for YAML specs (pip install pyyaml)") from e
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        data = yaml.load(text, Loader=loader)  # noqa: S506 - safe loader
+    else:
+        data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} is not an OpenAPI document")
+    return data
+
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.sha256(PARSER_VERSION.encode())
+    with path.open("rb") as f:
+        while block := f.read(1024 * 1024):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _can_stream(path: Path) -> bool:
+    if path.suffix.lower() in (".yaml", ".yml"):
+        return False
+    try:
+        import ijson  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def parse_spec(path: Path, cache_dir: Path = SPEC_CACHE_DIR) -> ParsedSpec:
+    """Parse (or load from cache) an OpenAPI 3 / Swagger 2 file, JSON or YAML.
+
+    JSON is streamed with ``ijson`` when installed, so only the non-``paths``
+    members and one path item at a time are held in memory; YAML (and JSON
+    without ijson) is loaded whole. The normalized result is cached under
+    ``cache_dir`` keyed by the file's content hash.
+    """
+    path = Path(path)
+    digest = _file_digest(path)
+    meta_path = cache_dir / f"{digest}.json"
+    ops_path = cache_dir / f"{digest}.jsonl"
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if ops_path.exists():
+            return ParsedSpec(**meta, ops_path=ops_path, source=path, digest=digest)
+    except (OSError, ValueError, TypeError):
+        pass
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    suffix = f".{os.getpid()}.tmp"
+    raw_tmp = cache_dir / f"{digest}.raw{suffix}"
+    ops_tmp = cache_dir / f"{digest}.jsonl{suffix}"
+    top: dict[str, Any] = {}
+    try:
+        if _can_stream(path):
+            # Path items may precede components, so park them until the refs can be resolved
+            with raw_tmp.open("w", encoding="utf-8") as raw:
+                for item in _iter_json_stream(path, top):
+                    raw.write(json.dumps(item) + "\n")
+
+            def path_items() -> Iterator[tuple[str, Any]]:
+                with raw_tmp.open("r", encoding="utf-8") as raw:
+                    for line in raw:
+                        yield tuple(json.loads(line))
+        else:
+            top = _load_whole(path)
+            paths = top.pop("paths", None) or {}
+
+            def path_items() -> Iterator[tuple[str, Any]]:
+                return iter(paths.items())
+
+        if "openapi" not in top and "swagger" not in top:
+            raise ValueError(f"{path} is not an OpenAPI/Swagger document (no 'openapi' or 'swagger' key)")
+
+        count = 0
+        names = set(_RESERVED_NAMES)
+        with ops_tmp.open("w", encoding="utf-8") as out:
+            for route, item in path_items():
+                item = _deref(item, top)
+                if not isinstance(item, dict):
+                    continue
+                shared = item.get("parameters") or []
+                for method in HTTP_METHODS:
+                    op = item.get(method)
+                    if not isinstance(op, dict):
+                        continue
+                    norm = _operation(route, method, op, shared, top)
+                    base = norm["name"]
+                    n = 1
+                    while norm["name"] in names:
+                        n += 1
+                        norm["name"] = f"{base}_{n}"
+                    names.add(norm["name"])
+                    out.write(json.dumps(norm) + "\n")
+                    count += 1
+
+        info = top.get("info") or {}
+        auth, api_key = _auth(top)
+        meta = {
+            "title": str(info.get("title") or path.stem),
+            "version": str(info.get("version") or ""),
+            "base_url": _base_url(top),
+            "auth": auth,
+            "api_key": api_key,
+            "schemas": _schemas(top),
+            "operation_count": count,
+        }
+        os.replace(ops_tmp, ops_path)
+        meta_tmp = meta_path.with_name(meta_path.name + suffix)
+        meta_tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(meta_tmp, meta_path)  # written last: marks the entry complete
+    finally:
+        raw_tmp.unlink(missing_ok=True)
+        ops_tmp.unlink(missing_ok=True)
+    return ParsedSpec(**meta, ops_path=ops_path, source=path, digest=digest)
+
+
+# --- rendering -------------------------------------------------------------
+
+def py_type(t: dict[str, Any]) -> str:
+    k = t.get("k")
+    if k == "prim":
+        if t["n"] == "string":
+            return "bytes" if t.get("fmt") == "binary" else "str"
+        return {"integer": "int", "number": "float", "boolean": "bool"}[t["n"]]
+    if k == "array":
+        return f"list[{py_type(t['items'])}]"
+    if k == "map":
+        return f"dict[str, {py_type(t['values'])}]"
+    if k == "ref":
+        return t["name"]
+    if k == "enum":
+        return "Literal[" + ", ".join(repr(v) for v in t["values"]) + "]"
+    if k == "union":
+        seen = dict.fromkeys(py_type(x) for x in t["of"])
+        return " | ".join(seen) if "Any" not in seen else "Any"
+    if k == "null":
+        return "None"
+    return "Any"
+
+
+def js_type(t: dict[str, Any]) -> str:
+    k = t.get("k")
+    if k == "prim":
+        if t["n"] == "string":
+            return "Blob" if t.get("fmt") == "binary" else "string"
+        return "boolean" if t["n"] == "boolean" else "number"
+    if k == "array":
+        return f"Array<{js_type(t['items'])}>"
+    if k == "map":
+        return f"Object<string, {js_type(t['values'])}>"
+    if k == "ref":
+        return t["name"]
+    if k == "enum":
+        return "(" + "|".join(json.dumps(v) for v in t["values"]) + ")"
+    if k == "union":
+        seen = dict.fromkeys(js_type(x) for x in t["of"])
+        return "*" if "*" in seen else "(" + "|".join(seen) + ")"
+    if k == "null":
+        return "null"
+    return "*"
+
+
+def _py_path(op: dict[str, Any]) -> str:
+    if not any(p["in"] == "path" for p in op["params"]):
+        return repr(op["path"])
+    path = op["path"]
+    for p in op["params"]:
+        if p["in"] == "path":
+            path = path.replace("{" + p["name"] + "}", "\0" + p["ident"] + "\1")
+    path = path.replace("{", "{{").replace("}", "}}")
+    return "f" + repr(path).replace("\\x00", "{_q(").replace("\\x01", ")}")
+
+
+def _js_path(op: dict[str, Any]) -> str:
+    path = op["path"].replace("\\", "\\\\").replace("`", "\\`").replace("${", "\\${")
+    for p in op["params"]:
+        if p["in"] == "path":
+            path = path.replace("{" + p["name"] + "}", "${encodeURIComponent(" + js_ident(p["ident"]) + ")}")
+    return "`" + path + "`"
+
+
+def _py_signature(op: dict[str, Any]) -> str:
+    required = [f"{p['ident']}: {py_type(p['type'])}" for p in op["params"] if p["required"]]
+    optional = [f"{p['ident']}: {py_type(p['type'])} | None = None" for p in op["params"] if not p["required"]]
+    body = op["body"]
+    if body and body["required"]:
+        required.append(f"body: {py_type(body['type'])}")
+    elif body:
+        optional.insert(0, f"body: {py_type(body['type'])} | None = None")
+    return ", ".join(required + (["*", *optional] if optional else []))
+
+
+def _js_signature(op: dict[str, Any]) -> str:
+    args = [js_ident(p["ident"]) for p in op["params"] if p["required"]]
+    if op["body"]:
+        args.append("body")
+    optional = [js_ident(p["ident"]) for p in op["params"] if not p["required"]]
+    if optional:
+        args.append("{ " + ", ".join(optional) + " } = {}")
+    return ", ".join(args)
+
+
+def _js_params(op: dict[str, Any]) -> str:
+    """JSDoc ``@param`` lines matching ``_js_signature``."""
+    lines = [f" * @param {{{js_type(p['type'])}}} {js_ident(p['ident'])}" for p in op["params"] if p["required"]]
+    if op["body"]:
+        name = "body" if op["body"]["required"] else "[body]"
+        lines.append(f" * @param {{{js_type(op['body']['type'])}}} {name}")
+    optional = [p for p in op["params"] if not p["required"]]
+    if optional:
+        lines.append(" * @param {Object} [options]")
+        lines += [f" * @param {{{js_type(p['type'])}}} [options.{js_ident(p['ident'])}]" for p in optional]
+    return "\n".join(lines)
+
+
+def _js_property(name: str, required: bool) -> str:
+    if not re.fullmatch(r"[A-Za-z_$][\w$]*", name):
+        name = json.dumps(name)
+    return name if required else f"[{name}]"
+
+
+def _py_doc(text: str) -> str:
+    return text.replace("\\", "\\\\").replace('"""', '\\"\\"\\"')
+
+
+def _py_docstring(op: dict[str, Any]) -> str:
+    lines = [f"{op['method']} {op['path']}"]
+    if op["summary"]:
+        lines += ["", op["summary"]]
+    if op["deprecated"]:
+        lines += ["", "Obsoleto na especificação."]
+    if len(lines) == 1:
+        return f'"""{_py_doc(lines[0])}"""'
+    return '"""' + "\n    ".join(_py_doc(line) for line in lines).replace("\n    \n", "\n\n") + '\n    """'
+
+
+def _js_comment(text: str) -> str:
+    return text.replace("*/", "*\\/")
+
+
+@lru_cache(maxsize=None)
+def _environment():
+    import jinja2
+
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(str(TEMPLATES_DIR)),
+        autoescape=False,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+        undefined=jinja2.StrictUndefined,
+    )
+    env.filters.update(
+        py_type=py_type,
+        js_type=js_type,
+        py_path=_py_path,
+        js_path=_js_path,
+        py_signature=_py_signature,
+        js_signature=_js_signature,
+        js_params=_js_params,
+        js_property=_js_property,
+        py_doc=_py_doc,
+        py_docstring=_py_docstring,
+        js_comment=_js_comment,
+        pyrepr=repr,
+        json=json.dumps,
+        js_ident=js_ident,
+    )
+    return env
+
+
+TEMPLATES = {"python": "python_client.py.j2", "node": "node_client.js.j2"}
+# Template output comes in tiny pieces; hand it to the writer in blocks
+_RENDER_BLOCK = 64 * 1024
+
+
+def _blocks(pieces: Iterator[str]) -> Iterator[str]:
+    buf: list[str] = []
+    size = 0
+    for piece in pieces:
+        buf.append(piece)
+        size += len(piece)
+        if size >= _RENDER_BLOCK:
+            yield "".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield "".join(buf)
+
+
+def render_openapi_client(spec: ParsedSpec, language: str = "python", base_url: str | None = None, token: str | None = None) -> Iterator[str]:
+    """Yield the generated client source in blocks, rendered as operations are
+    read from the spec cache, so the whole client is never held in memory."""
+    if language not in TEMPLATES:
+        raise ValueError(f"language must be one of {sorted(TEMPLATES)}")
+    template = _environment().get_template(TEMPLATES[language])
+    return _blocks(template.generate(
+        spec=spec,
+        operations=spec.operations(),
+        base_url=base_url or spec.base_url,
+        token=token or "",
+    ))
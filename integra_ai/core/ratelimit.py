@@ -0,0 +1,88 @@
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from contextlib import AbstractAsyncContextManager, AbstractContextManager, nullcontext
+from typing import Any
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens/second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def _take_or_wait(self, tokens: float) -> float:
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until ``tokens`` are available, then take them."""
+        while (wait := self._take_or_wait(tokens)) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        """Like ``acquire`` but yields to the event loop while waiting."""
+        while (wait := self._take_or_wait(tokens)) > 0:
+            await asyncio.sleep(wait)
+
+
+class ModelSlots:
+    """Per-model caps on concurrent calls; semaphores are created on first use.
+
+    Held around the provider call itself, after ``model="auto"`` has been
+    resolved, so each routed model gets its own ``limit``.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(1, limit)
+        self._sems: dict[str, threading.BoundedSemaphore] = {}
+        self._async_sems: dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def hold(self, model: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._sems.get(model)
+            if sem is None:
+                sem = self._sems[model] = threading.BoundedSemaphore(self.limit)
+            return sem
+
+    def hold_async(self, model: str) -> asyncio.Semaphore:
+        """Semaphore for ``async with``; bound to the loop that first waits on it."""
+        with self._lock:
+            sem = self._async_sems.get(model)
+            if sem is None:
+                sem = self._async_sems[model] = asyncio.Semaphore(self.limit)
+            return sem
+
+
+def model_slot(slots: ModelSlots | None, model: str) -> AbstractContextManager[Any]:
+    """``with`` target holding ``model``'s slot; a no-op without ``slots``."""
+    return slots.hold(model) if slots is not None else nullcontext()
+
+
+def model_slot_async(slots: ModelSlots | None, model: str) -> AbstractAsyncContextManager[Any]:
+    return slots.hold_async(model) if slots is not None else nullcontext()
@@ -0,0 +1,146 @@
+from __future__ import annotations
+import importlib
+import importlib.util
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .config import AppConfig
+
+DEFAULT_APP = "web.app:app"
+SERVERS = ("gunicorn", "waitress")
+
+
+@dataclass
+class ServeOptions:
+    """Settings for ``integra serve``; defaults come from the ``serve_*`` keys of ``AppConfig``."""
+
+    app: str = DEFAULT_APP
+    server: str = "auto"
+    host: str = "127.0.0.1"
+    port: int = 5000
+    workers: int = 0
+    threads: int = 4
+    preload: bool = True
+    timeout: float = 120.0
+    graceful_timeout: float = 30.0
+    keepalive: float = 5.0
+    max_requests: int = 0
+    backlog: int = 2048
+    connection_limit: int = 1000
+    pid_file: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, cfg: AppConfig, **overrides: Any) -> "ServeOptions":
+        opts = cls(
+            server=cfg.serve_server,
+            host=cfg.serve_host,
+            port=cfg.serve_port,
+            workers=cfg.serve_workers,
+            threads=cfg.serve_threads,
+            preload=cfg.serve_preload,
+            timeout=cfg.serve_timeout,
+            graceful_timeout=cfg.serve_graceful_timeout,
+            keepalive=cfg.serve_keepalive,
+            max_requests=cfg.serve_max_requests,
+            backlog=cfg.serve_backlog,
+            connection_limit=cfg.serve_connection_limit,
+        )
+        for key, value in overrides.items():
+            if value is not None:
+                setattr(opts, key, value)
+        return opts
+
+    @property
+    def worker_count(self) -> int:
+        return self.workers or 2 * (os.cpu_count() or 1) + 1
+
+
+def pick_server(name: str = "auto") -> str:
+    """``gunicorn`` (POSIX: processes + threads, graceful reload) or
+    ``waitress`` (pure Python, also on Windows: one process, threads)."""
+    if name != "auto":
+        if name not in SERVERS:
+            raise ValueError(f"unknown server {name!r} (expected auto, gunicorn or waitress)")
+        if importlib.util.find_spec(name) is None:
+            raise RuntimeError(f"{name} is not installed (pip install \"integra-ai[serve]\")")
+        return name
+    candidates = SERVERS if os.name == "posix" else ("waitress",)
+    for candidate in candidates:
+        if importlib.util.find_spec(candidate) is not None:
+            return candidate
+    raise RuntimeError("no production WSGI server installed (pip install \"integra-ai[serve]\")")
+
+
+def load_app(path: str) -> Any:
+    """WSGI callable from ``module:attribute``."""
+    module, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module), attr or "app")
+
+
+def gunicorn_settings(opts: ServeOptions) -> dict[str, Any]:
+    return {
+        "bind": f"{opts.host}:{opts.port}",
+        "workers": opts.worker_count,
+        "threads": opts.threads,
+        # gthread keeps idle keep-alive connections off the worker threads
+        "worker_class": "gthread" if opts.threads > 1 else "sync",
+        "worker_connections": opts.connection_limit,
+        "preload_app": opts.preload,
+        "timeout": int(opts.timeout),
+        "graceful_timeout": int(opts.graceful_timeout),
+        "keepalive": int(opts.keepalive),
+        "max_requests": opts.max_requests,
+        "max_requests_jitter": opts.max_requests // 10,
+        "backlog": opts.backlog,
+        "pidfile": opts.pid_file,
+        "accesslog": None,
+    }
+
+
+def waitress_settings(opts: ServeOptions) -> dict[str, Any]:
+    # One process: an explicit worker count multiplies the thread pool instead
+    return {
+        "host": opts.host,
+        "port": opts.port,
+        "threads": max(1, opts.workers) * opts.threads,
+        "connection_limit": opts.connection_limit,
+        "backlog": opts.backlog,
+        "channel_timeout": opts.timeout,
+        "ident": "integra",
+    }
+
+
+def serve(opts: ServeOptions) -> None:
+    """Run the web app until interrupted. Under gunicorn, SIGHUP starts fresh
+    workers and retires the old ones once their requests finish, and SIGTERM
+    drains in-flight requests for up to ``graceful_timeout`` seconds."""
+    server = pick_server(opts.server)
+    if server == "gunicorn":
+        _run_gunicorn(opts)
+    else:
+        import logging
+
+        import waitress
+
+        # Logs every queued request at WARNING once the thread pool is busy
+        logging.getLogger("waitress.queue").setLevel(logging.ERROR)
+        if opts.pid_file:
+            with open(opts.pid_file, "w", encoding="utf-8") as f:
+                f.write(str(os.getpid()))
+        waitress.serve(load_app(opts.app), **waitress_settings(opts))
+
+
+def _run_gunicorn(opts: ServeOptions) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class _Application(BaseApplication):
+        def load_config(self) -> None:
+            for key, value in gunicorn_settings(opts).items():
+                if value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self) -> Any:
+            return load_app(opts.app)
+
+    _Application().run()
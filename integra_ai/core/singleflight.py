@@ -0,0 +1,222 @@
+from __future__ import annotations
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from .cache import cache_key
+from .config import CONFIG_DIR
+from .metrics import COALESCED
+
+T = TypeVar("T")
+
+FLIGHTS_PATH = CONFIG_DIR / "flights.db"
+ROW_RETENTION = 3600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS flights (
+    key TEXT PRIMARY KEY,
+    flight_id TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_flights_finished_at ON flights(finished_at);
+"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse runs of whitespace so trivially different prompts share a key."""
+    return " ".join(prompt.split())
+
+
+def flight_key(prompt: str, model: str) -> str:
+    return cache_key("flight", model, normalize_prompt(prompt))
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Concurrent ``do(key, fn)`` calls in one process share a single ``fn()``.
+
+    The first caller for a key runs ``fn``; callers arriving while it is in
+    flight block and receive the same result (or exception). Nothing is kept
+    once the call returns, so this is deduplication, not caching.
+    """
+
+    def __init__(self, scope: str = "thread") -> None:
+        self.scope = scope
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], T]) -> tuple[T, bool]:
+        """Return ``(result, shared)``; ``shared`` is True for coalesced callers."""
+        with self._lock:
+            running = self._calls.get(key)
+            if running is None:
+                call = self._calls[key] = _Call()
+
+        if running is not None:
+            COALESCED.inc(scope=self.scope)
+            running.done.wait()
+            if running.error is not None:
+                raise running.error
+            return running.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class LeaseFlight:
+    """Cross-process single flight through a lease row in a local SQLite file.
+
+    The process that inserts the row for a key runs ``fn`` and writes the
+    JSON result back; others poll until that flight finishes and read it.
+    While ``fn`` runs the leader renews the lease every ``ttl / 3``, so a
+    long generation (map-reduce of a big document) keeps it; a lease left
+    unrenewed for ``ttl`` (leader crashed) is taken over by the next caller.
+    Finished rows are only served to callers that saw the flight in
+    progress; a later caller starts a new flight.
+    """
+
+    def __init__(self, path: Path = FLIGHTS_PATH, ttl: float = 120.0, poll_interval: float = 0.05) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        self._owner = uuid.uuid4().hex
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _acquire(self, key: str, watching: str | None) -> tuple[str, str, sqlite3.Row | None]:
+        """Take the lease or report the flight to wait on: ``(state, flight_id, row)``."""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT * FROM flights WHERE key = ?", (key,)).fetchone()
+            if row is not None and row["finished_at"] is not None and row["flight_id"] == watching:
+                conn.execute("COMMIT")
+                return "finished", row["flight_id"], row
+            if row is not None and row["finished_at"] is None and row["expires_at"] > now:
+                conn.execute("COMMIT")
+                return "running", row["flight_id"], row
+            # Rows of long-finished flights are only kept around for late pollers
+            conn.execute("DELETE FROM flights WHERE finished_at < ?", (now - ROW_RETENTION,))
+            flight_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT OR REPLACE INTO flights (key, flight_id, owner, expires_at) VALUES (?, ?, ?, ?)",
+                (key, flight_id, self._owner, now + self.ttl),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return "leader", flight_id, None
+
+    def do(self, key: str, fn: Callable[[], T]) -> tuple[T, bool]:
+        watching = None
+        delay = self.poll_interval
+        while True:
+            state, flight_id, row = self._acquire(key, watching)
+            if state == "leader":
+                break
+            if state == "finished" and row is not None:
+                COALESCED.inc(scope="process")
+                if row["error"] is not None:
+                    raise RuntimeError(f"coalesced call failed: {row['error']}")
+                return json.loads(row["result"]), True
+            watching = flight_id
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(key, flight_id, stop), name="flight-lease", daemon=True,
+        )
+        heartbeat.start()
+        try:
+            result = fn()
+        except Exception as e:
+            self._finish(key, flight_id, error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            stop.set()
+            heartbeat.join()
+        self._finish(key, flight_id, result=json.dumps(result))
+        return result, False
+
+    def _heartbeat(self, key: str, flight_id: str, stop: threading.Event) -> None:
+        try:
+            while not stop.wait(self.ttl / 3):
+                self._conn().execute(
+                    "UPDATE flights SET expires_at = ? WHERE key = ? AND flight_id = ? AND finished_at IS NULL",
+                    (time.time() + self.ttl, key, flight_id),
+                )
+        except sqlite3.Error:
+            # A missed renewal only risks a duplicate call once the lease lapses
+            pass
+        finally:
+            conn = getattr(self._local, "conn", None)
+            if conn is not None:
+                conn.close()
+                del self._local.conn
+
+    def _finish(self, key: str, flight_id: str, result: str | None = None, error: str | None = None) -> None:
+        self._conn().execute(
+            "UPDATE flights SET finished_at = ?, result = ?, error = ? WHERE key = ? AND flight_id = ?",
+            (time.time(), result, error, key, flight_id),
+        )
+
+
+_threads = SingleFlight()
+_lease: LeaseFlight | None = None
+_lease_lock = threading.Lock()
+
+
+def _get_lease() -> LeaseFlight:
+    global _lease
+    with _lease_lock:
+        if _lease is None:
+            from .http import http_config
+
+            _lease = LeaseFlight(ttl=http_config().gemini_timeout * 2)
+        return _lease
+
+
+def coalesce(key: str, fn: Callable[[], T], cross_process: bool = True) -> tuple[T, bool]:
+    """Run ``fn`` once per concurrent ``key``: threads of this process share
+    one call, and that call takes the cross-process lease first so other
+    processes (web tier, job workers) join it too. ``fn`` must return JSON."""
+    if not cross_process:
+        return _threads.do(key, fn)
+    (result, joined), shared = _threads.do(key, lambda: _get_lease().do(key, fn))
+    return result, shared or joined
@@ -1,11 +1,20 @@
 from __future__ import annotations
+from contextlib import contextmanager
 from pathlib import Path
 import json
-from typing import Any
+import os
+import sys
+import threading
+from typing import IO, Any, Iterator
+
+from .catalog import Catalog
 
 ROOT = Path.cwd()
-INTEGRATIONS_DIR = ROOT / "integrations"
-INTEGRATIONS_DIR.mkdir(parents=True, exist_ok=True)
+INTEGRATIONS_DIR = ROOT / "integrations"  # created on first write, not at import
+
+_locks: dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+_catalogs: dict[Path, Catalog] = {}
 
 
 def slugify(name: str) -> str:
@@ -21,10 +30,67 @@ def integration_dir(name: str) -> Path:
     return d
 
 
+def integration_lock(name: str) -> threading.Lock:
+    """Per-integration lock serializing writes from concurrent workers."""
+    key = slugify(name)
+    with _locks_guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = threading.Lock()
+        return lock
+
+
+@contextmanager
+def integration_file_lock(name: str) -> Iterator[None]:
+    """``integration_lock`` plus an OS lock on ``<integration>/.lock``, for
+    read-modify-write sequences that job worker processes run as well."""
+    d = integration_dir(name)
+    with integration_lock(name), open(d / ".lock", "a+b") as f:
+        _lock_file(f)
+        try:
+            yield
+        finally:
+            _unlock_file(f)
+
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock_file(f: IO[bytes]) -> None:
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue  # LK_LOCK gives up after ~10 s; keep waiting
+
+    def _unlock_file(f: IO[bytes]) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock_file(f: IO[bytes]) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f: IO[bytes]) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_text(p: Path, content: str) -> None:
+    tmp = p.with_name(f".{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(content, encoding="utf-8")
+    os.replace(tmp, p)
+
+
 def save_integration_metadata(name: str, meta: dict[str, Any]) -> Path:
     d = integration_dir(name)
     p = d / "integration.json"
-    p.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    with integration_lock(name):
+        atomic_write_text(p, json.dumps(meta, indent=2))
+        get_catalog().upsert(d.name, meta)
     return p
 
 
@@ -33,7 +99,75 @@ def load_integration_metadata(name: str) -> dict[str, Any]:
     return json.loads(p.read_text(encoding="utf-8")) if p.exists() else {}
 
 
+def get_catalog() -> Catalog:
+    """Catalog for the current integrations dir, stored in the sibling ``.integra/``.
+
+    Built from disk on first use so existing projects are indexed automatically.
+    """
+    catalog, opened = _open_catalog()
+    if opened and not catalog.is_built():
+        reindex()
+    return catalog
+
+
+def _open_catalog() -> tuple[Catalog, bool]:
+    path = INTEGRATIONS_DIR.parent / ".integra" / "catalog.db"
+    with _locks_guard:
+        catalog = _catalogs.get(path)
+        if catalog is not None:
+            return catalog, False
+        catalog = _catalogs[path] = Catalog(path)
+        return catalog, True
+
+
+def _latest_generated_mtime(d: Path) -> float | None:
+    mtimes = [p.stat().st_mtime for p in d.glob("generated_*")]
+    return max(mtimes) if mtimes else None
+
+
+def reindex() -> int:
+    """Rebuild the catalog from the ``integration.json`` files on disk."""
+    def entries():
+        if not INTEGRATIONS_DIR.exists():
+            return
+        for d in INTEGRATIONS_DIR.iterdir():
+            if not d.is_dir():
+                continue
+            p = d / "integration.json"
+            try:
+                meta = json.loads(p.read_text(encoding="utf-8")) if p.exists() else {}
+            except ValueError:
+                meta = {}
+            yield d.name, meta, _latest_generated_mtime(d)
+
+    catalog, _ = _open_catalog()
+    return catalog.replace_all(entries())
+
+
+def query_integrations(
+    language: str | None = None,
+    auth: str | None = None,
+    base_url: str | None = None,
+    sort: str = "name",
+    limit: int | None = None,
+    offset: int = 0,
+) -> tuple[list[dict[str, Any]], int]:
+    """Filtered, sorted page of catalog entries plus the total matching count."""
+    if not INTEGRATIONS_DIR.exists():
+        return [], 0
+    catalog = get_catalog()
+    items = catalog.query(language=language, auth=auth, base_url=base_url, sort=sort, limit=limit, offset=offset)
+    return items, catalog.count(language=language, auth=auth, base_url=base_url)
+
+
+def catalog_state() -> tuple[int, float]:
+    """``(version, modified_at)`` of the catalog, for cheap change detection."""
+    if not INTEGRATIONS_DIR.exists():
+        return 0, 0.0
+    return get_catalog().state()
+
+
 def list_integrations() -> list[str]:
     if not INTEGRATIONS_DIR.exists():
         return []
-    return sorted([p.name for p in INTEGRATIONS_DIR.iterdir() if p.is_dir()])
+    return get_catalog().names()
@@ -0,0 +1,455 @@
+from __future__ import annotations
+import json
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+import requests
+
+from . import storage
+from .cassette import normalize_url
+from .http import build_session, http_config
+from .metrics import SUITE_STEPS
+from .storage import integration_dir, list_integrations, load_integration_metadata, slugify
+
+SUITE_FILES = ("suite.yaml", "suite.yml", "suite.json")
+OUTCOMES = ("passed", "failed", "error", "skipped")
+
+_VAR = re.compile(r"\$\{([^}]+)\}")
+_MISSING = object()
+_TYPES: dict[str, Callable[[Any], bool]] = {
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+    "null": lambda v: v is None,
+}
+
+
+class SuiteError(ValueError):
+    """Invalid suite file, or a step referencing something that doesn't exist."""
+
+
+@dataclass
+class Step:
+    id: str
+    method: str = "GET"
+    endpoint: str = "/"
+    headers: dict[str, Any] = field(default_factory=dict)
+    params: dict[str, Any] = field(default_factory=dict)
+    json: Any = None
+    body: Optional[str] = None
+    status: Optional[list[int]] = None  # None: any 2xx
+    assertions: dict[str, Any] = field(default_factory=dict)
+    max_ms: Optional[float] = None
+    extract: dict[str, str] = field(default_factory=dict)
+    needs: list[str] = field(default_factory=list)
+    timeout: Optional[float] = None
+
+
+@dataclass
+class Suite:
+    """Declarative endpoint checks for one integration (``suite.yaml`` or
+    ``suite.json`` next to ``integration.json``)."""
+
+    integration: str
+    base_url: str
+    steps: list[Step]
+    headers: dict[str, Any] = field(default_factory=dict)
+    variables: dict[str, Any] = field(default_factory=dict)
+    path: Optional[Path] = None
+
+
+def suite_path(name: str) -> Optional[Path]:
+    d = storage.INTEGRATIONS_DIR / slugify(name)
+    return next((d / f for f in SUITE_FILES if (d / f).exists()), None)
+
+
+def integrations_with_suites() -> list[str]:
+    return [name for name in list_integrations() if suite_path(name) is not None]
+
+
+def _read(path: Path) -> dict[str, Any]:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise RuntimeError("PyYAML is required for YAML suites (pip install \"integra-ai[suite]\")") from e
+        try:
+            data = yaml.safe_load(text) or {}
+        except yaml.YAMLError as e:
+            raise SuiteError(f"{path}: {e}") from e
+    else:
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise SuiteError(f"{path}: {e}") from e
+    if isinstance(data, list):
+        data = {"steps": data}
+    if not isinstance(data, dict):
+        raise SuiteError(f"{path}: expected a mapping with a 'steps' list")
+    return data
+
+
+def _refs(value: Any) -> Iterable[str]:
+    """Names referenced as ``${name...}`` anywhere inside ``value``."""
+    if isinstance(value, str):
+        for m in _VAR.finditer(value):
+            yield m.group(1).split(".", 1)[0].strip()
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _refs(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _refs(v)
+
+
+def _step(raw: Any, index: int) -> Step:
+    if not isinstance(raw, dict):
+        raise SuiteError(f"step {index + 1}: expected a mapping, got {raw!r}")
+    expect = raw.get("expect") or {}
+    status = expect.get("status")
+    if status is not None:
+        status = [int(s) for s in (status if isinstance(status, list) else [status])]
+    return Step(
+        id=str(raw.get("id") or f"step{index + 1}"),
+        method=str(raw.get("method", "GET")).upper(),
+        endpoint=str(raw.get("endpoint", "/")),
+        headers=dict(raw.get("headers") or {}),
+        params=dict(raw.get("params") or {}),
+        json=raw.get("json"),
+        body=raw.get("body"),
+        status=status,
+        assertions=dict(expect.get("json") or {}),
+        max_ms=expect.get("max_ms"),
+        extract=dict(raw.get("extract") or {}),
+        needs=[str(n) for n in raw.get("needs") or []],
+        timeout=raw.get("timeout"),
+    )
+
+
+def _check_graph(steps: list[Step], where: str) -> None:
+    ids = [s.id for s in steps]
+    dupes = {i for i in ids if ids.count(i) > 1}
+    if dupes:
+        raise SuiteError(f"{where}: duplicate step ids {sorted(dupes)}")
+    known = set(ids)
+    for s in steps:
+        # Dependencies are declared with `needs` or implied by ${step.var} references
+        implied = {r for r in _refs([s.endpoint, s.headers, s.params, s.json, s.body]) if r in known}
+        unknown = set(s.needs) - known
+        if unknown:
+            raise SuiteError(f"{where}: step {s.id!r} needs unknown steps {sorted(unknown)}")
+        s.needs = sorted(set(s.needs) | implied)
+        if s.id in s.needs:
+            raise SuiteError(f"{where}: step {s.id!r} depends on itself")
+    done: set[str] = set()
+    remaining = list(steps)
+    while remaining:
+        ready = [s for s in remaining if set(s.needs) <= done]
+        if not ready:
+            raise SuiteError(f"{where}: dependency cycle among {sorted(s.id for s in remaining)}")
+        done.update(s.id for s in ready)
+        remaining = [s for s in remaining if s.id not in done]
+
+
+def load_suite(name: str, path: Optional[Path] = None) -> Suite:
+    """Parse and check an integration's suite; ``integration.json`` is read once
+    here for the default ``base_url``."""
+    path = Path(path) if path else suite_path(name)
+    if path is None:
+        raise FileNotFoundError(f"no suite for {name} (create {storage.INTEGRATIONS_DIR / slugify(name) / SUITE_FILES[0]})")
+    data = _read(path)
+    base_url = data.get("base_url") or load_integration_metadata(name).get("base_url")
+    if not base_url:
+        raise SuiteError(f"{path}: no base_url in the suite or in integration.json")
+    steps = [_step(raw, i) for i, raw in enumerate(data.get("steps") or [])]
+    if not steps:
+        raise SuiteError(f"{path}: no steps")
+    _check_graph(steps, str(path))
+    return Suite(
+        integration=slugify(name),
+        base_url=str(base_url),
+        steps=steps,
+        headers=dict(data.get("headers") or {}),
+        variables=dict(data.get("variables") or {}),
+        path=path,
+    )
+
+
+def lookup(data: Any, path: str) -> Any:
+    """Value at a dotted path (``data.0.id``; ``$`` or empty is the root), or ``_MISSING``."""
+    value = data
+    for part in [p for p in path.lstrip("$").split(".") if p]:
+        if isinstance(value, list) and part.lstrip("-").isdigit() and -len(value) <= int(part) < len(value):
+            value = value[int(part)]
+        elif isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return _MISSING
+    return value
+
+
+def _resolve(name: str, variables: dict[str, Any], extracted: dict[str, dict[str, Any]]) -> Any:
+    head, _, rest = name.strip().partition(".")
+    if head == "env":
+        if rest not in os.environ:
+            raise SuiteError(f"environment variable {rest} is not set")
+        return os.environ[rest]
+    if head in extracted:
+        value = extracted[head].get(rest, _MISSING) if rest else extracted[head]
+    elif head in variables:
+        value = lookup(variables[head], rest)
+    else:
+        value = _MISSING
+    if value is _MISSING:
+        raise SuiteError(f"undefined variable ${{{name}}}")
+    return value
+
+
+def render(value: Any, variables: dict[str, Any], extracted: dict[str, dict[str, Any]]) -> Any:
+    """Substitute ``${var}``, ``${step.var}`` and ``${env.NAME}``; a string that is
+    a single reference keeps the referenced value's type."""
+    if isinstance(value, str):
+        whole = _VAR.fullmatch(value)
+        if whole:
+            return _resolve(whole.group(1), variables, extracted)
+        return _VAR.sub(lambda m: str(_resolve(m.group(1), variables, extracted)), value)
+    if isinstance(value, dict):
+        return {k: render(v, variables, extracted) for k, v in value.items()}
+    if isinstance(value, list):
+        return [render(v, variables, extracted) for v in value]
+    return value
+
+
+def check_value(path: str, actual: Any, expected: Any) -> list[str]:
+    """Failures of one JSON assertion: a literal means equality, a mapping
+    holds operators (eq, ne, exists, type, contains, len, gt, gte, lt, lte, matches)."""
+    if not isinstance(expected, dict):
+        expected = {"eq": expected}
+    shown = "<missing>" if actual is _MISSING else repr(actual)
+    failures = []
+    for op, want in expected.items():
+        if op == "exists":
+            ok = (actual is not _MISSING) == bool(want)
+        elif actual is _MISSING:
+            ok = False
+        elif op == "eq":
+            ok = actual == want
+        elif op == "ne":
+            ok = actual != want
+        elif op == "type":
+            ok = _TYPES.get(want, lambda v: False)(actual)
+        elif op == "contains":
+            ok = isinstance(actual, (str, list, dict)) and want in actual
+        elif op == "len":
+            ok = hasattr(actual, "__len__") and len(actual) == want
+        elif op == "matches":
+            ok = isinstance(actual, str) and re.search(want, actual) is not None
+        elif op in ("gt", "gte", "lt", "lte"):
+            try:
+                ok = {"gt": actual > want, "gte": actual >= want, "lt": actual < want, "lte": actual <= want}[op]
+            except TypeError:
+                ok = False
+        else:
+            failures.append(f"{path}: unknown operator {op!r}")
+            continue
+        if not ok:
+            failures.append(f"{path}: expected {op} {want!r}, got {shown}")
+    return failures
+
+
+def _run_step(
+    suite: Suite, step: Step, session: requests.Session, extracted: dict[str, dict[str, Any]], timeout: float,
+) -> dict[str, Any]:
+    result: dict[str, Any] = {"id": step.id, "method": step.method, "url": None, "status": None, "elapsed_ms": 0.0, "failures": []}
+    start = time.perf_counter()
+    try:
+        ctx = (suite.variables, extracted)
+        url = suite.base_url.rstrip("/") + "/" + str(render(step.endpoint, *ctx)).lstrip("/")
+        result["url"] = normalize_url(url, http_config().cassette_ignore_params)  # reports never hold credentials
+        resp = session.request(
+            step.method, url,
+            headers={k: str(v) for k, v in render({**suite.headers, **step.headers}, *ctx).items()},
+            params=render(step.params, *ctx) or None,
+            json=render(step.json, *ctx),
+            data=render(step.body, *ctx),
+            timeout=step.timeout or timeout,
+        )
+        resp.content  # include the body transfer in the timing
+    except (SuiteError, requests.RequestException) as e:
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return result | {"outcome": "error", "error": f"{type(e).__name__}: {e}"}
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    result["status"] = resp.status_code
+
+    failures = result["failures"]
+    if step.status is None and not 200 <= resp.status_code < 300:
+        failures.append(f"status: expected 2xx, got {resp.status_code}")
+    elif step.status is not None and resp.status_code not in step.status:
+        failures.append(f"status: expected {step.status}, got {resp.status_code}")
+    if step.max_ms is not None and result["elapsed_ms"] > step.max_ms:
+        failures.append(f"latency: {result['elapsed_ms']:.0f} ms > {step.max_ms} ms")
+    if step.assertions or step.extract:
+        try:
+            body = resp.json()
+        except ValueError:
+            body = _MISSING
+            failures.append("body: not JSON")
+        for path, expected in step.assertions.items():
+            failures.extend(check_value(path, lookup(body, path), expected))
+        values = {}
+        for var, path in step.extract.items():
+            value = lookup(body, path)
+            if value is _MISSING:
+                failures.append(f"extract {var}: nothing at {path}")
+            else:
+                values[var] = value
+        result["extracted"] = values
+    return result | {"outcome": "failed" if failures else "passed", "error": None}
+
+
+def run_suites(
+    suites: list[Suite],
+    concurrency: int = 8,
+    sessions: Optional[dict[str, requests.Session]] = None,
+    timeout: Optional[float] = None,
+    on_result: Optional[Callable[[Suite, dict[str, Any]], None]] = None,
+) -> dict[str, Any]:
+    """Run the steps of every suite on one thread pool, each as soon as the
+    steps it depends on have passed; dependents of a failed step are skipped.
+
+    Requests share a keep-alive session with ``concurrency`` pooled
+    connections per host and no retries, unless ``sessions`` supplies one per
+    integration (record/replay cassettes).
+    """
+    concurrency = max(1, concurrency)
+    timeout = timeout or http_config().http_timeout
+    shared = build_session(pool_maxsize=concurrency, retries=0)
+    sessions = sessions or {}
+    by_key = {(s.integration, st.id): (s, st) for s in suites for st in s.steps}
+    waiting = {key: set(st.needs) for key, (_, st) in by_key.items()}
+    extracted: dict[str, dict[str, dict[str, Any]]] = {s.integration: {} for s in suites}
+    results: dict[tuple[str, str], dict[str, Any]] = {}
+    started = {s.integration: time.perf_counter() for s in suites}
+    finished: dict[str, float] = {}
+    start = time.perf_counter()
+
+    def settle(key: tuple[str, str], result: dict[str, Any]) -> None:
+        suite, _ = by_key[key]
+        results[key] = result
+        SUITE_STEPS.inc(integration=suite.integration, outcome=result["outcome"])
+        if on_result is not None:
+            on_result(suite, result)
+        if all((suite.integration, st.id) in results for st in suite.steps):
+            finished[suite.integration] = time.perf_counter()
+
+    def skip_dependents(key: tuple[str, str]) -> None:
+        integration, step_id = key
+        for other, needs in list(waiting.items()):
+            if other[0] == integration and step_id in needs and other not in results:
+                waiting.pop(other)
+                settle(other, {"id": other[1], "method": by_key[other][1].method, "url": None, "status": None,
+                               "elapsed_ms": 0.0, "failures": [], "outcome": "skipped", "error": f"{step_id} did not pass"})
+                skip_dependents(other)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="suite") as pool:
+        running: dict[Future, tuple[str, str]] = {}
+
+        def submit_ready() -> None:
+            for key, needs in list(waiting.items()):
+                if not needs:
+                    waiting.pop(key)
+                    suite, step = by_key[key]
+                    session = sessions.get(suite.integration, shared)
+                    # Dependencies finished before this submit, so their extracted values are in place
+                    running[pool.submit(_run_step, suite, step, session, extracted[suite.integration], timeout)] = key
+
+        submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                key = running.pop(fut)
+                result = fut.result()
+                # Values (tokens, ids) feed the dependent steps but only their names go in the report
+                values = result.pop("extracted", None)
+                if values:
+                    extracted[key[0]][key[1]] = values
+                    result["extracted"] = sorted(values)
+                settle(key, result)
+                if result["outcome"] == "passed":
+                    for other, needs in waiting.items():
+                        if other[0] == key[0]:
+                            needs.discard(key[1])
+                else:
+                    skip_dependents(key)
+            submit_ready()
+    shared.close()
+
+    suite_reports = []
+    totals = dict.fromkeys(OUTCOMES, 0)
+    for s in suites:
+        steps = [results[(s.integration, st.id)] for st in s.steps]
+        counts = {o: sum(1 for r in steps if r["outcome"] == o) for o in OUTCOMES}
+        for o in OUTCOMES:
+            totals[o] += counts[o]
+        suite_reports.append({
+            "integration": s.integration,
+            "file": str(s.path) if s.path else None,
+            "base_url": s.base_url,
+            **counts,
+            "duration_s": round(finished.get(s.integration, start) - started[s.integration], 3),
+            "steps": steps,
+        })
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "concurrency": concurrency,
+        "duration_s": round(time.perf_counter() - start, 3),
+        "totals": totals,
+        "ok": totals["failed"] == 0 and totals["error"] == 0,
+        "suites": suite_reports,
+    }
+
+
+def to_junit(report: dict[str, Any]) -> str:
+    """JUnit XML (one ``testsuite`` per integration, one ``testcase`` per step) for CI."""
+    totals = report["totals"]
+    root = ET.Element("testsuites", {
+        "name": "integra", "tests": str(sum(totals.values())), "failures": str(totals["failed"]),
+        "errors": str(totals["error"]), "skipped": str(totals["skipped"]), "time": str(report["duration_s"]),
+    })
+    for s in report["suites"]:
+        ts = ET.SubElement(root, "testsuite", {
+            "name": s["integration"], "tests": str(len(s["steps"])), "failures": str(s["failed"]),
+            "errors": str(s["error"]), "skipped": str(s["skipped"]), "time": str(s["duration_s"]),
+            "timestamp": report["timestamp"],
+        })
+        for r in s["steps"]:
+            case = ET.SubElement(ts, "testcase", {
+                "classname": s["integration"], "name": f"{r['id']} ({r['method']})", "time": str(round(r["elapsed_ms"] / 1000, 4)),
+            })
+            if r["outcome"] == "failed":
+                ET.SubElement(case, "failure", {"message": r["failures"][0]}).text = "\n".join(r["failures"])
+            elif r["outcome"] == "error":
+                ET.SubElement(case, "error", {"message": r["error"]}).text = r["error"]
+            elif r["outcome"] == "skipped":
+                ET.SubElement(case, "skipped", {"message": r["error"]})
+    ET.indent(root)
+    return ET.tostring(root, encoding="unicode", xml_declaration=True) + "\n"
+
+
+def save_suite_report(name: str, report: dict[str, Any]) -> Path:
+    """Store one integration's results as ``suite_<ts>.json`` next to ``integration.json``."""
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    p = integration_dir(name) / f"suite_{ts}.json"
+    p.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return p
@@ -1,11 +1,16 @@
 from __future__ import annotations
-import requests
 from typing import Any
+from .http import async_request, get_session, http_config
 
 
 def simple_request_test(base_url: str, endpoint: str, method: str = "GET", headers: dict[str, str] | None = None, payload: Any = None) -> tuple[int, str]:
     url = base_url.rstrip("/") + "/" + endpoint.lstrip("/")
     m = method.upper()
-    func = getattr(requests, m.lower(), requests.get)
-    resp = func(url, headers=headers or {}, json=payload, timeout=30)
+    resp = get_session().request(m, url, headers=headers or {}, json=payload, timeout=http_config().http_timeout)
+    return resp.status_code, resp.text
+
+
+async def simple_request_test_async(base_url: str, endpoint: str, method: str = "GET", headers: dict[str, str] | None = None, payload: Any = None) -> tuple[int, str]:
+    url = base_url.rstrip("/") + "/" + endpoint.lstrip("/")
+    resp = await async_request(method.upper(), url, headers=headers or {}, json=payload, timeout=http_config().http_timeout)
     return resp.status_code, resp.text
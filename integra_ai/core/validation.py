@@ -0,0 +1,265 @@
+from __future__ import annotations
+import ast
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from .cache import ResponseCache, cache_key
+from .config import CONFIG_DIR, AppConfig
+from .logger import get_logger
+from .metrics import VALIDATIONS
+
+log = get_logger(__name__)
+
+VALIDATION_CACHE_DIR = CONFIG_DIR / "validation"
+# Bumped whenever the checks change, so cached verdicts from older checks are ignored
+CHECKS_VERSION = "1"
+
+_FENCE_BLOCK = re.compile(r"^[ \t]*```[ \t]*([\w+#.-]*)[^\n]*\n(.*?)^[ \t]*```[ \t]*$", re.M | re.S)
+_LANG_TAGS = {
+    "python": {"python", "py", "python3"},
+    "node": {"javascript", "js", "node", "nodejs", "mjs", "cjs"},
+}
+
+# Executes the generated module for real. This is not a sandbox: the child
+# process has the user's permissions and filesystem, and the socket patches
+# below only catch well-behaved code. `-I` keeps user site-packages and PYTHON*
+# variables out, the module is loaded under a non-__main__ name so
+# `if __name__ == "__main__"` blocks stay out, and memory is capped.
+_IMPORT_RUNNER = r"""
+import importlib.util, socket, sys
+try:
+    import resource
+    resource.setrlimit(resource.RLIMIT_AS, (1 << 30, 1 << 30))
+except (ImportError, ValueError, OSError):
+    pass
+def _offline(*a, **k):
+    raise OSError("network access is disabled during validation")
+socket.socket.connect = socket.socket.connect_ex = _offline
+socket.create_connection = socket.getaddrinfo = _offline
+spec = importlib.util.spec_from_file_location("generated_client", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+try:
+    spec.loader.exec_module(module)
+except ModuleNotFoundError as e:
+    print(f"missing dependency: {e.name}", file=sys.stderr)
+    sys.exit(3)
+"""
+
+
+class ValidationError(RuntimeError):
+    """Generated code failed validation (``validation: "strict"``)."""
+
+    def __init__(self, report: dict[str, Any]) -> None:
+        super().__init__("generated code failed validation: " + "; ".join(errors(report)))
+        self.report = report
+
+
+def strip_fences(text: str, language: str | None = None) -> str:
+    """Code out of a markdown reply: the fenced blocks tagged with ``language``
+    (or else the untagged ones, or else all of them), joined in order.
+
+    Text without fences is returned unchanged, except for a dangling opening
+    fence left by a truncated reply.
+    """
+    blocks = _FENCE_BLOCK.findall(text)
+    if not blocks:
+        stripped = text.lstrip()
+        if stripped.startswith("```"):
+            return stripped.split("\n", 1)[1] if "\n" in stripped else ""
+        return text
+    tags = _LANG_TAGS.get(language or "", set())
+    chosen = [body for tag, body in blocks if tag.lower() in tags] or [body for tag, body in blocks if not tag] or [
+        body for _, body in blocks
+    ]
+    return "\n\n".join(body.rstrip("\n") for body in chosen) + "\n"
+
+
+def _check(name: str, status: str, message: str, started: float) -> dict[str, Any]:
+    return {"name": name, "status": status, "message": message, "seconds": round(time.perf_counter() - started, 4)}
+
+
+def _python_syntax(code: str) -> tuple[ast.Module | None, dict[str, Any]]:
+    start = time.perf_counter()
+    try:
+        tree = ast.parse(code, "generated.py")
+        compile(tree, "generated.py", "exec")
+    except SyntaxError as e:
+        return None, _check("syntax", "error", f"line {e.lineno}: {e.msg}", start)
+    return tree, _check("syntax", "ok", "", start)
+
+
+def _builtin_lint(tree: ast.Module) -> list[str]:
+    """Small fallback when pyflakes is not installed: unused imports,
+    star imports and bare ``except:``."""
+    problems = []
+    imported: dict[str, int] = {}
+    used: set[str] = set()
+    exported: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if isinstance(node, ast.ImportFrom) and alias.name == "*":
+                    problems.append(f"line {node.lineno}: star import from {node.module}")
+                elif node in tree.body:
+                    imported[(alias.asname or alias.name).split(".")[0]] = node.lineno
+        elif isinstance(node, ast.Name):
+            used.add(node.id)
+        elif isinstance(node, ast.ExceptHandler) and node.type is None:
+            problems.append(f"line {node.lineno}: bare except")
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            exported.add(node.value)  # names listed in __all__ or used in strings
+    for name, lineno in imported.items():
+        if name not in used and name not in exported:
+            problems.append(f"line {lineno}: '{name}' imported but unused")
+    return problems
+
+
+def _python_lint(code: str, tree: ast.Module) -> dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        from pyflakes.api import check
+        from pyflakes.reporter import Reporter
+    except ImportError:
+        problems = _builtin_lint(tree)
+    else:
+        import io
+
+        out = io.StringIO()
+        check(code, "generated.py", Reporter(out, out))
+        problems = [line.split(":", 1)[1].strip() if ":" in line else line for line in out.getvalue().splitlines()]
+    return _check("lint", "warn" if problems else "ok", "; ".join(problems[:10]), start)
+
+
+def _python_import(path: str, timeout: float) -> dict[str, Any]:
+    start = time.perf_counter()
+    env = {"PATH": os.environ.get("PATH", ""), "PYTHONDONTWRITEBYTECODE": "1", "PYTHONIOENCODING": "utf-8"}
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-I", "-c", _IMPORT_RUNNER, path],
+            cwd=os.path.dirname(path), env=env, capture_output=True, text=True, timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return _check("import", "error", f"import did not finish within {timeout:g}s", start)
+    if proc.returncode == 0:
+        return _check("import", "ok", "", start)
+    lines = proc.stderr.strip().splitlines()
+    message = lines[-1] if lines else f"exit status {proc.returncode}"
+    # A dependency missing from this environment is not a defect of the code
+    return _check("import", "warn" if proc.returncode == 3 else "error", message, start)
+
+
+def _node_syntax(path: str, timeout: float) -> dict[str, Any]:
+    start = time.perf_counter()
+    node = shutil.which("node")
+    if node is None:
+        return _check("syntax", "skipped", "node not found", start)
+    try:
+        proc = subprocess.run([node, "--check", path], capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return _check("syntax", "error", f"node --check did not finish within {timeout:g}s", start)
+    if proc.returncode == 0:
+        return _check("syntax", "ok", "", start)
+    lines = [ln for ln in proc.stderr.strip().splitlines() if ln.strip()]
+    return _check("syntax", "error", next((ln for ln in lines if "Error" in ln), lines[-1] if lines else "syntax error"), start)
+
+
+def run_checks(code: str, language: str, import_check: bool = True, timeout: float = 10.0) -> dict[str, Any]:
+    """Validate one piece of generated code; runs in a pool worker process.
+
+    Python gets a compile/AST check, a lint pass and, with ``import_check``,
+    an import of the module, which runs its top-level code unsandboxed;
+    JavaScript gets ``node --check`` when node is installed.
+    """
+    start = time.perf_counter()
+    checks = []
+    with tempfile.TemporaryDirectory(prefix="integra-validate-") as d:
+        if language == "node":
+            path = os.path.join(d, "generated.js")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(code)
+            checks.append(_node_syntax(path, timeout))
+        else:
+            tree, syntax = _python_syntax(code)
+            checks.append(syntax)
+            if tree is not None:
+                checks.append(_python_lint(code, tree))
+                if import_check:
+                    path = os.path.join(d, "generated_client.py")
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(code)
+                    checks.append(_python_import(path, timeout))
+    statuses = {c["status"] for c in checks}
+    status = "failed" if "error" in statuses else "warning" if "warn" in statuses else "passed"
+    return {"status": status, "checks": checks, "seconds": round(time.perf_counter() - start, 4)}
+
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_cache: ResponseCache | None = None
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            import multiprocessing
+
+            # spawn: forking a process that already runs threads (web, batch) is unsafe
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _validation_cache() -> ResponseCache:
+    global _cache
+    with _executor_lock:
+        if _cache is None:
+            # Verdicts never go stale for the same content and checks; only the count is bounded
+            _cache = ResponseCache(VALIDATION_CACHE_DIR, ttl=0, max_entries=5000)
+        return _cache
+
+
+def validate_code(code: str, language: str, cfg: AppConfig | None = None) -> dict[str, Any]:
+    """Validation report for ``code``, cached by content hash.
+
+    The checks run on a shared process pool (``validation_workers``; 0 runs
+    them in the calling thread), so concurrent batch items validate in parallel.
+    """
+    cfg = cfg or AppConfig.cached()
+    key = cache_key("validation", CHECKS_VERSION, language, str(cfg.validation_import), code)
+    cache = _validation_cache()
+    if (cached := cache.get(key)) is not None:
+        report = json.loads(cached) | {"cached": True}
+        VALIDATIONS.inc(language=language, status=report["status"], cached="true")
+        return report
+    args = (code, language, cfg.validation_import, cfg.validation_timeout)
+    if cfg.validation_workers > 0:
+        report = _pool(cfg.validation_workers).submit(run_checks, *args).result()
+    else:
+        report = run_checks(*args)
+    cache.set(key, json.dumps(report), meta={"language": language})
+    VALIDATIONS.inc(language=language, status=report["status"], cached="false")
+    if report["status"] != "passed":
+        log.warning("Generated code did not pass validation", extra={"language": language, "status": report["status"]})
+    return report | {"cached": False}
+
+
+def errors(report: dict[str, Any]) -> list[str]:
+    """``check: message`` for every failed check of a report."""
+    return [f"{c['name']}: {c['message']}" for c in report["checks"] if c["status"] == "error"]
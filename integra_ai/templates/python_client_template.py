@@ -1,12 +1,75 @@
 """
 Cliente Python gerado por Integra.AI
+
+Síncrono (requests, sessão com pool e retry) e, se o httpx estiver instalado,
+assíncrono com as mesmas funções prefixadas por "a" (acall_api, apaginate).
+Benchmark embutido: python <este_arquivo>.py bench [PATH] [N]
 """
 from __future__ import annotations
+import asyncio
+import json
 import os
+import time
+import weakref
+from typing import Any, AsyncIterator, Callable, Iterator
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_loads: Callable[[str | bytes], Any]
+try:  # JSON mais rápido, se disponível
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+try:  # variante assíncrona opcional: pip install httpx
+    import httpx
+except ImportError:
+    httpx = None  # type: ignore[assignment]
 
 BASE_URL = os.getenv("API_BASE_URL", "{{BASE_URL}}")
 TOKEN = os.getenv("API_TOKEN", "{{TOKEN}}")
+TIMEOUT = float(os.getenv("API_TIMEOUT", "30"))
+RETRIES = int(os.getenv("API_RETRIES", "3"))
+BACKOFF = float(os.getenv("API_BACKOFF", "0.5"))
+POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# POST/PATCH que expirou ou recebeu 5xx pode já ter sido executado (pagamento,
+# criação de recurso): só é repetido com API_RETRY_POST=1 ou retry_post=True
+RETRY_POST = os.getenv("API_RETRY_POST", "").lower() in ("1", "true", "yes")
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+
+def _build_session(retry_post: bool = False) -> requests.Session:
+    # Uma sessão por processo: conexões keep-alive reutilizadas entre chamadas
+    retry = Retry(
+        total=RETRIES, backoff_factor=BACKOFF, status_forcelist=RETRY_STATUSES,
+        allowed_methods=None if retry_post else IDEMPOTENT_METHODS,
+        respect_retry_after_header=True, raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+_SESSION = _build_session()
+_SESSION_RETRY_POST = _build_session(retry_post=True)
+
+
+def _session(method: str, retry_post: bool | None) -> requests.Session:
+    if method not in IDEMPOTENT_METHODS and (RETRY_POST if retry_post is None else retry_post):
+        return _SESSION_RETRY_POST
+    return _SESSION
+
+
+def _url(path: str) -> str:
+    if path.startswith(("http://", "https://")):
+        return path
+    return BASE_URL.rstrip("/") + "/" + path.lstrip("/")
 
 
 def _headers(extra: dict[str, str] | None = None) -> dict[str, str]:
@@ -18,17 +81,257 @@ def _headers(extra: dict[str, str] | None = None) -> dict[str, str]:
     return h
 
 
-def call_api(path: str, method: str = "GET", params: dict | None = None, json_body: dict | None = None):
-    url = BASE_URL.rstrip("/") + "/" + path.lstrip("/")
-    func = getattr(requests, method.lower(), requests.get)
-    resp = func(url, headers=_headers(), params=params, json=json_body, timeout=30)
+def _decode(status: int, content_type: str, content: bytes, text: Any) -> Any:
+    if status == 204 or not content:
+        return None
+    # Decodifica os bytes direto, sem detecção de charset de resp.text/resp.json()
+    return _loads(content) if "json" in content_type else text()
+
+
+def call_api(
+    path: str,
+    method: str = "GET",
+    params: dict | None = None,
+    json_body: Any = None,
+    headers: dict[str, str] | None = None,
+    stream: bool = False,
+    retry_post: bool | None = None,
+) -> Any:
+    """Chama a API e devolve o corpo decodificado (JSON, texto ou None).
+
+    Com ``stream=True`` devolve a ``requests.Response`` aberta, sem ler o
+    corpo: use ``with call_api(..., stream=True) as resp`` e
+    ``resp.iter_content()``/``iter_lines()`` para respostas grandes.
+    ``retry_post=True`` repete também POST/PATCH (padrão: ``API_RETRY_POST``);
+    só use se a API tratar o pedido repetido sem duplicar o efeito.
+    """
+    method = method.upper()
+    resp = _session(method, retry_post).request(
+        method, _url(path), headers=_headers(headers), params=params, json=json_body,
+        timeout=TIMEOUT, stream=stream,
+    )
     try:
         resp.raise_for_status()
     except requests.HTTPError as e:
         raise RuntimeError(f"API error {resp.status_code}: {resp.text}") from e
-    return resp.json() if "application/json" in resp.headers.get("Content-Type", "") else resp.text
+    if stream:
+        return resp
+    return _decode(resp.status_code, resp.headers.get("Content-Type", ""), resp.content, lambda: resp.text)
+
+
+def stream_api(path: str, method: str = "GET", chunk_size: int = 64 * 1024, **kwargs: Any) -> Iterator[bytes]:
+    """Gera o corpo da resposta em blocos, sem carregá-lo inteiro na memória."""
+    with call_api(path, method, stream=True, **kwargs) as resp:
+        yield from resp.iter_content(chunk_size)
+
+
+def _page_items(body: Any, items_key: str | None) -> list:
+    if items_key:
+        return (body or {}).get(items_key) or []
+    if isinstance(body, list):
+        return body
+    if isinstance(body, dict):
+        for key in ("items", "data", "results", "records"):
+            if isinstance(body.get(key), list):
+                return body[key]
+    return []
+
+
+def _next_page(
+    links: dict, body: Any, params: dict, items: list, last: list, page_param: str | None, cursor_param: str,
+) -> tuple[str | None, dict]:
+    """Próxima página: header Link rel=next, campo "next"/"next_cursor" do corpo ou número da página."""
+    nxt = (links.get("next") or {}).get("url")
+    if nxt:
+        return nxt, {}
+    if isinstance(body, dict):
+        for key in ("next", "next_cursor", "nextPageToken"):
+            if key not in body:
+                continue
+            token = body[key]
+            if not token:  # API com cursor: acabou
+                return None, params
+            if isinstance(token, str) and token.startswith(("http://", "https://", "/")):
+                return token, {}
+            return "", {**params, cursor_param: token}
+    # Página repetida: a API ignora o parâmetro de página
+    if items and page_param and items != last:
+        return "", {**params, page_param: int(params.get(page_param, 1)) + 1}
+    return None, params
+
+
+def paginate(
+    path: str,
+    params: dict | None = None,
+    items_key: str | None = None,
+    page_param: str | None = "page",
+    cursor_param: str = "cursor",
+    max_pages: int | None = None,
+) -> Iterator[Any]:
+    """Gera os itens de todas as páginas, buscando a próxima só quando a anterior foi consumida.
+
+    ``items_key`` é o campo com a lista (padrão: corpo-lista ou items/data/results/records).
+    """
+    url, params, pages = _url(path), dict(params or {}), 0
+    last: list[Any] = []
+    while max_pages is None or pages < max_pages:
+        resp = _SESSION.request("GET", url, headers=_headers(), params=params, timeout=TIMEOUT)
+        try:
+            resp.raise_for_status()
+        except requests.HTTPError as e:
+            raise RuntimeError(f"API error {resp.status_code}: {resp.text}") from e
+        body = _decode(resp.status_code, resp.headers.get("Content-Type", ""), resp.content, lambda: resp.text)
+        items = _page_items(body, items_key)
+        yield from items
+        pages += 1
+        nxt, params = _next_page(resp.links, body, params, items, last, page_param, cursor_param)
+        last = items
+        if nxt is None:
+            return
+        url = _url(nxt) if nxt else url
+
+
+# --- assíncrono (httpx) ------------------------------------------------------
+
+# O AsyncClient fica preso ao event loop em que foi criado: um por loop
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+def _async_client():
+    if httpx is None:
+        raise RuntimeError("httpx é necessário para as funções assíncronas (pip install httpx)")
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+            timeout=TIMEOUT,
+        )
+        _ASYNC_CLIENTS[loop] = client
+    return client
+
+
+async def _arequest(method: str, url: str, retry_post: bool | None = None, **kwargs: Any):
+    # Mesma política do retry síncrono: erros de transporte e 429/5xx, com backoff e
+    # Retry-After; POST/PATCH só quando a conexão falhou (o pedido não chegou à API)
+    client = _async_client()
+    retry_all = method in IDEMPOTENT_METHODS or (RETRY_POST if retry_post is None else retry_post)
+    for attempt in range(RETRIES + 1):
+        try:
+            resp = await client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            if attempt >= RETRIES or not (retry_all or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))):
+                raise
+            delay = BACKOFF * (2 ** attempt)
+        else:
+            if resp.status_code not in RETRY_STATUSES or attempt >= RETRIES or not retry_all:
+                break
+            retry_after = resp.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else BACKOFF * (2 ** attempt)
+        await asyncio.sleep(delay)
+    if resp.is_error:
+        raise RuntimeError(f"API error {resp.status_code}: {resp.text}")
+    return resp
+
+
+async def acall_api(
+    path: str,
+    method: str = "GET",
+    params: dict | None = None,
+    json_body: Any = None,
+    headers: dict[str, str] | None = None,
+    retry_post: bool | None = None,
+) -> Any:
+    """Versão assíncrona de ``call_api`` (httpx, pool por event loop)."""
+    resp = await _arequest(
+        method.upper(), _url(path), retry_post, headers=_headers(headers), params=params, json=json_body,
+    )
+    return _decode(resp.status_code, resp.headers.get("Content-Type", ""), resp.content, lambda: resp.text)
+
+
+async def astream_api(path: str, method: str = "GET", **kwargs: Any) -> AsyncIterator[bytes]:
+    """Versão assíncrona de ``stream_api`` (sem retry: o corpo é consumido aos poucos)."""
+    async with _async_client().stream(method.upper(), _url(path), headers=_headers(kwargs.pop("headers", None)), **kwargs) as resp:
+        if resp.is_error:
+            await resp.aread()
+            raise RuntimeError(f"API error {resp.status_code}: {resp.text}")
+        async for chunk in resp.aiter_bytes():
+            yield chunk
+
+
+async def apaginate(
+    path: str,
+    params: dict | None = None,
+    items_key: str | None = None,
+    page_param: str | None = "page",
+    cursor_param: str = "cursor",
+    max_pages: int | None = None,
+) -> AsyncIterator[Any]:
+    """Versão assíncrona de ``paginate``."""
+    url, params, pages = _url(path), dict(params or {}), 0
+    last: list[Any] = []
+    while max_pages is None or pages < max_pages:
+        resp = await _arequest("GET", url, headers=_headers(), params=params)
+        body = _decode(resp.status_code, resp.headers.get("Content-Type", ""), resp.content, lambda: resp.text)
+        items = _page_items(body, items_key)
+        for item in items:
+            yield item
+        pages += 1
+        nxt, params = _next_page(resp.links, body, params, items, last, page_param, cursor_param)
+        last = items
+        if nxt is None:
+            return
+        url = _url(nxt) if nxt else url
+
+
+async def aclose() -> None:
+    client = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+# --- benchmark ---------------------------------------------------------------
+
+def bench(path: str = "/", n: int = 200, concurrency: int = 10) -> dict[str, float]:
+    """Mede ms por chamada: requests sem pool, sessão com pool e (com httpx) assíncrono concorrente."""
+    def timed(fn) -> float:
+        fn()  # aquecimento (conexão, DNS)
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        return (time.perf_counter() - start) / n * 1000
+
+    results = {
+        "requests sem pool": timed(lambda: requests.get(_url(path), headers=_headers(), timeout=TIMEOUT).content),
+        "sessão com pool": timed(lambda: call_api(path)),
+    }
+    if httpx is not None:
+        async def run() -> float:
+            await acall_api(path)
+            sem = asyncio.Semaphore(concurrency)
+
+            async def one() -> None:
+                async with sem:
+                    await acall_api(path)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(n)))
+            elapsed = (time.perf_counter() - start) / n * 1000
+            await aclose()
+            return elapsed
+
+        results[f"async x{concurrency}"] = asyncio.run(run())
+    return results
 
 
 if __name__ == "__main__":
-    # Exemplo: GET /
-    print(call_api("/"))
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        path = sys.argv[2] if len(sys.argv) > 2 else "/"
+        n = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+        for label, ms in bench(path, n).items():
+            print(f"{label:20} {ms:8.3f} ms/chamada")
+    else:
+        # Exemplo: GET /
+        print(call_api("/"))
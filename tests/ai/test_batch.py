@@ -0,0 +1,184 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from integra_ai.ai.batch import load_manifest, run_batch
+from integra_ai.ai.routing import Router
+from integra_ai.core.config import AppConfig
+from integra_ai.core.ratelimit import TokenBucket
+from integra_ai.core.singleflight import LeaseFlight
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name) / "integrations"
+        self.root.mkdir()
+        patcher = patch('integra_ai.core.storage.INTEGRATIONS_DIR', self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        lease = patch('integra_ai.core.singleflight._lease', LeaseFlight(Path(self._tmp.name) / "flights.db"))
+        lease.start()
+        self.addCleanup(lease.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_load_manifest_jsonl(self):
+        """Testa a leitura de manifesto JSONL com strings e objetos."""
+        p = self.root / "jobs.jsonl"
+        p.write_text('"prompt simples"\n\n{"prompt": "outro", "name": "x", "model": "gemini-pro"}\n', encoding="utf-8")
+        jobs = load_manifest(p)
+        self.assertEqual(jobs, [{"prompt": "prompt simples"}, {"prompt": "outro", "name": "x", "model": "gemini-pro"}])
+
+    def test_load_manifest_rejects_missing_prompt(self):
+        """Testa que itens sem prompt são rejeitados."""
+        p = self.root / "jobs.jsonl"
+        p.write_text('{"name": "sem-prompt"}\n', encoding="utf-8")
+        with self.assertRaises(ValueError):
+            load_manifest(p)
+
+    @patch('integra_ai.ai.gemini.generate_code')
+    def test_run_batch_same_integration_concurrently(self, mock_generate):
+        """Testa que workers concorrentes na mesma integração não sobrescrevem arquivos."""
+        mock_generate.side_effect = lambda prompt, **kw: f"# {prompt}"
+        jobs = [{"prompt": f"p{i}", "name": "shared"} for i in range(12)]
+        results = list(run_batch(jobs, workers=6, rpm=None, cache=False))
+
+        self.assertEqual(sorted(r["index"] for r in results), list(range(12)))
+        self.assertTrue(all(r["ok"] for r in results))
+        files = {r["generated_file"] for r in results}
+        self.assertEqual(len(files), 12)
+        contents = sorted(Path(f).read_text(encoding="utf-8") for f in files)
+        self.assertEqual(contents, sorted(f"# p{i}" for i in range(12)))
+        meta = json.loads((self.root / "shared" / "integration.json").read_text(encoding="utf-8"))
+        self.assertIn(meta["generated_file"], files)
+
+    @patch('integra_ai.ai.gemini.generate_code')
+    def test_run_batch_per_model_limit_and_errors(self, mock_generate):
+        """Testa o limite de concorrência por modelo e que falhas não param o lote."""
+        active, peak = {}, {}
+        lock = threading.Lock()
+
+        def fake(prompt, model, **kw):
+            # A failing call fails over to the next routed model, which has its own slots
+            with lock:
+                active[model] = active.get(model, 0) + 1
+                peak[model] = max(peak.get(model, 0), active[model])
+            time.sleep(0.02)
+            with lock:
+                active[model] -= 1
+            if prompt == "boom":
+                raise RuntimeError("falhou")
+            return "ok"
+
+        mock_generate.side_effect = fake
+        jobs = [{"prompt": "boom" if i == 3 else f"p{i}"} for i in range(8)]
+        results = list(run_batch(jobs, workers=8, per_model=2, rpm=None, cache=False))
+
+        self.assertLessEqual(max(peak.values()), 2)
+        failed = [r for r in results if not r["ok"]]
+        self.assertEqual([r["index"] for r in failed], [3])
+        self.assertEqual(failed[0]["error"], "falhou")
+
+    @patch('integra_ai.ai.gemini.generate_code')
+    def test_run_batch_per_model_limit_applies_to_routed_models(self, mock_generate):
+        """Testa que, com model "auto", o limite vale para cada modelo escolhido pelo roteador, não para "auto"."""
+        active, peak = {}, {}
+        lock = threading.Lock()
+
+        def fake(prompt, model, **kw):
+            with lock:
+                active[model] = active.get(model, 0) + 1
+                peak[model] = max(peak.get(model, 0), active[model])
+                peak["total"] = max(peak.get("total", 0), sum(active.values()))
+            time.sleep(0.1)
+            with lock:
+                active[model] -= 1
+            return "ok"
+
+        mock_generate.side_effect = fake
+        cfg = AppConfig(model_routes=[{"max_tokens": 10, "models": ["fast"]}, {"models": ["strong"]}], model_hedge=False)
+        jobs = [{"prompt": f"p{i}", "model": "auto"} for i in range(4)]
+        jobs += [{"prompt": f"prompt longo {i} " + "x" * 100, "model": "auto"} for i in range(4)]
+        with patch('integra_ai.ai.routing._router', Router(cfg)):
+            results = list(run_batch(jobs, workers=8, per_model=2, rpm=None, cache=False))
+
+        self.assertTrue(all(r["ok"] for r in results))
+        self.assertEqual((peak["fast"], peak["strong"]), (2, 2))
+        self.assertEqual(peak["total"], 4)
+
+    @patch('integra_ai.ai.gemini.generate_code')
+    def test_run_batch_coalesces_duplicate_items(self, mock_generate):
+        """Testa que itens duplicados (mesmo prompt normalizado, modelo e nome) geram uma chamada e um arquivo."""
+        def fake(prompt, **kw):
+            time.sleep(0.1)
+            return "# shared"
+
+        mock_generate.side_effect = fake
+        jobs = [{"prompt": "gerar  cliente\n" if i % 2 else "gerar cliente", "name": "dup"} for i in range(4)]
+        results = list(run_batch(jobs, workers=4, rpm=None, cache=False))
+
+        self.assertEqual(mock_generate.call_count, 1)
+        self.assertEqual(len({r["generated_file"] for r in results}), 1)
+        self.assertEqual(sum(r["coalesced"] for r in results), 3)
+
+    @patch('integra_ai.ai.gemini.generate_code')
+    def test_rerun_skips_unchanged_items(self, mock_generate):
+        """Testa que rodar o mesmo lote de novo não chama o Gemini nem grava arquivos, salvo com force."""
+        mock_generate.side_effect = lambda prompt, **kw: f"# {prompt}"
+        jobs = [{"prompt": f"p{i}", "name": f"n{i}"} for i in range(3)]
+        first = {r["index"]: r for r in run_batch(jobs, workers=3, rpm=None, cache=False)}
+        again = {r["index"]: r for r in run_batch(jobs, workers=3, rpm=None, cache=False)}
+
+        self.assertEqual(mock_generate.call_count, 3)
+        self.assertTrue(all(r["unchanged"] for r in again.values()))
+        self.assertEqual({i: r["generated_file"] for i, r in again.items()}, {i: r["generated_file"] for i, r in first.items()})
+
+        list(run_batch(jobs, workers=3, rpm=None, cache=False, force=True))
+        self.assertEqual(mock_generate.call_count, 6)
+        self.assertEqual(len(list((self.root / "n0").glob("generated_*"))), 1)
+
+    @patch('integra_ai.ai.batch.generate_code_async')
+    def test_run_batch_async_engine(self, mock_generate):
+        """Testa o motor assíncrono: mesmos resultados, um único event loop."""
+        loops = set()
+
+        async def fake(prompt, **kw):
+            import asyncio
+            loops.add(id(asyncio.get_running_loop()))
+            await asyncio.sleep(0.01)
+            if prompt == "boom":
+                raise RuntimeError("falhou")
+            return f"# {prompt}"
+
+        mock_generate.side_effect = fake
+        jobs = [{"prompt": "boom" if i == 2 else f"p{i}", "name": f"n{i}"} for i in range(6)]
+        results = list(run_batch(jobs, workers=3, rpm=None, cache=False, engine="async"))
+
+        self.assertEqual(len(loops), 1)
+        self.assertEqual(sorted(r["index"] for r in results), list(range(6)))
+        self.assertEqual([r["index"] for r in results if not r["ok"]], [2])
+        ok = next(r for r in results if r["index"] == 0)
+        self.assertEqual(Path(ok["generated_file"]).read_text(encoding="utf-8"), "# p0")
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_acquire_respects_rate(self):
+        """Testa que o balde de tokens limita a taxa após o burst inicial."""
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+        self.assertFalse(bucket.try_acquire())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import io
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from integra_ai.ai.chunking import generate_code_chunked, iter_chunks, merge_locally, split_instruction
+
+
+def _spec(endpoints: int, body_lines: int = 20) -> str:
+    out = ["# Minha API\n", "Autenticação via Bearer.\n"]
+    for i in range(endpoints):
+        out.append(f"## GET /items/{i}\n")
+        out.extend(f"campo_{j}: descrição do campo {j}\n" for j in range(body_lines))
+    return "".join(out)
+
+
+class TestChunking(unittest.TestCase):
+
+    def test_chunks_follow_sections_and_size(self):
+        """Testa que as partes respeitam o limite e cortam nas seções de endpoints."""
+        doc = _spec(50)
+        chunks = list(iter_chunks(doc, max_tokens=500))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), doc)
+        self.assertTrue(all(len(c) <= 500 * 4 for c in chunks))
+        self.assertTrue(all(c.startswith("## GET /items/") for c in chunks[1:]))
+
+    def test_long_lines_are_cut(self):
+        """Testa que uma linha enorme (JSON minificado) é dividida."""
+        doc = '{"paths": ' + "x" * 10000 + "}"
+        chunks = list(iter_chunks(doc, max_tokens=100))
+        self.assertEqual("".join(chunks), doc)
+        self.assertTrue(all(len(c) <= 400 for c in chunks))
+
+    def test_split_instruction(self):
+        """Testa a separação entre a instrução e a documentação colada no prompt."""
+        self.assertEqual(split_instruction("Gere um cliente.\n\n# Docs\n..."), ("Gere um cliente.", "# Docs\n..."))
+
+    def test_merge_locally_dedupes_imports(self):
+        """Testa a junção local: sem cercas de código e imports únicos no topo."""
+        merged = merge_locally(["```python\nimport requests\n\ndef a(): pass\n```", "import requests\nimport os\ndef b(): pass"])
+        self.assertEqual(merged.count("import requests"), 1)
+        self.assertTrue(merged.startswith("import requests\nimport os"))
+        self.assertNotIn("```", merged)
+        self.assertLess(merged.index("def a"), merged.index("def b"))
+
+    @patch('integra_ai.ai.gemini.generate_code')
+    def test_small_prompt_is_sent_as_is(self, mock_generate):
+        """Testa que prompts pequenos vão direto para generate_code."""
+        mock_generate.return_value = "code"
+        self.assertEqual(generate_code_chunked("Gere um cliente", max_tokens=1000), "code")
+        mock_generate.assert_called_once()
+        self.assertEqual(mock_generate.call_args[0][0], "Gere um cliente")
+
+    @patch('integra_ai.ai.gemini.generate_code')
+    def test_large_doc_map_reduce(self, mock_generate):
+        """Testa o map-reduce: uma chamada por parte, em paralelo, e a junção final pelo modelo."""
+        threads = set()
+
+        def fake(prompt, **kw):
+            threads.add(threading.get_ident())
+            if "Merge them" in prompt:
+                return "# merged\n" + "\n".join(line for line in prompt.splitlines() if line.startswith("def "))
+            part = prompt.split("This is part ")[1].split(".")[0]
+            return f"def part_{part}(): pass"
+
+        mock_generate.side_effect = fake
+        out = generate_code_chunked("Gere um cliente", docs=_spec(40), max_tokens=800, workers=4, language="python")
+
+        map_calls = [c for c in mock_generate.call_args_list if "documentation part" in c[0][0]]
+        self.assertGreater(len(map_calls), 2)
+        self.assertGreater(len(threads), 1)
+        self.assertTrue(out.startswith("# merged"))
+        for i in range(1, len(map_calls) + 1):
+            self.assertIn(f"def part_{i}()", out)
+
+    # Plain function instead of a Mock, which would keep every prompt in call_args_list
+    @patch('integra_ai.ai.gemini.generate_code', new=lambda prompt, **kw: "def f(): pass")
+    def test_multi_megabyte_file_memory_is_bounded(self):
+        """Testa que um arquivo de vários MB é processado sem carregar tudo na memória."""
+        with tempfile.TemporaryDirectory() as tmp:
+            doc = Path(tmp) / "api.md"
+            with doc.open("w", encoding="utf-8") as f:
+                for _ in range(40):
+                    f.write(_spec(200))  # ~8 MB no total
+            size = doc.stat().st_size
+            self.assertGreater(size, 5 * 1024 * 1024)
+
+            tracemalloc.start()
+            generate_code_chunked("Gere um cliente", docs=doc, max_tokens=8000, workers=4)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.assertLess(peak, size / 4)
+
+
+    @patch('integra_ai.ai.gemini.generate_code', new=lambda prompt, **kw: "def f(): pass")
+    def test_stream_docs_are_read_in_blocks(self):
+        """Testa que uma documentação vinda de um stream é lida em blocos, nunca inteira de uma vez."""
+        sizes = []
+
+        class Stream(io.StringIO):
+            def read(self, size=-1):
+                sizes.append(size)
+                return super().read(size)
+
+        generate_code_chunked("Gere um cliente", docs=Stream(_spec(400)), max_tokens=8000, workers=2)
+        self.assertGreater(len(sizes), 2)
+        self.assertTrue(all(0 < size for size in sizes), sizes)
+
+
+if __name__ == "__main__":
+    unittest.main()
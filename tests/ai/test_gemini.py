@@ -1,5 +1,6 @@
+import importlib.util
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, call
 import os
 import requests
 from integra_ai.ai.gemini import generate_code
@@ -7,7 +8,7 @@ from integra_ai.ai.gemini import generate_code
 class TestGeminiAI(unittest.TestCase):
 
     @patch('integra_ai.ai.gemini.log') # Mock the logger
-    @patch('requests.post')
+    @patch('requests.Session.post')
     @patch('os.getenv')
     def test_generate_code_success(self, mock_getenv, mock_post, mock_log):
         """Testa a geração de código bem-sucedida com uma resposta válida da API."""
@@ -45,7 +46,7 @@ class TestGeminiAI(unittest.TestCase):
         mock_log.error.assert_not_called()
 
     @patch('integra_ai.ai.gemini.log') # Mock the logger
-    @patch('requests.post')
+    @patch('requests.Session.post')
     @patch('os.getenv')
     def test_generate_code_http_error(self, mock_getenv, mock_post, mock_log):
         """Testa o tratamento de erro HTTP da API."""
@@ -81,7 +82,7 @@ class TestGeminiAI(unittest.TestCase):
         mock_log.error.assert_not_called()
 
     @patch('integra_ai.ai.gemini.log') # Mock the logger
-    @patch('requests.post')
+    @patch('requests.Session.post')
     @patch('os.getenv')
     def test_generate_code_empty_candidates(self, mock_getenv, mock_post, mock_log):
         """Testa o caso em que a API retorna uma lista de candidatos vazia."""
@@ -102,7 +103,7 @@ class TestGeminiAI(unittest.TestCase):
         mock_log.error.assert_not_called()
 
     @patch('integra_ai.ai.gemini.log') # Mock the logger
-    @patch('requests.post')
+    @patch('requests.Session.post')
     @patch('os.getenv')
     def test_generate_code_no_text_in_parts(self, mock_getenv, mock_post, mock_log):
         """Testa o caso em que a API retorna conteúdo sem a chave 'text'."""
@@ -131,7 +132,7 @@ class TestGeminiAI(unittest.TestCase):
         mock_log.error.assert_not_called()
 
     @patch('integra_ai.ai.gemini.log') # Mock the logger
-    @patch('requests.post')
+    @patch('requests.Session.post')
     @patch('os.getenv')
     def test_generate_code_api_key_from_arg(self, mock_getenv, mock_post, mock_log):
         """Testa o uso da chave da API fornecida como argumento da função."""
@@ -158,7 +159,7 @@ class TestGeminiAI(unittest.TestCase):
         result = generate_code(prompt, api_key=api_key_arg)
 
         self.assertEqual(result, "API key from arg")
-        mock_getenv.assert_called_with("GEMINI_API_KEY")
+        self.assertNotIn(call("GEMINI_API_KEY"), mock_getenv.call_args_list)
         mock_post.assert_called_once_with(
             "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent",
             headers={"Content-Type": "application/json"},
@@ -170,7 +171,7 @@ class TestGeminiAI(unittest.TestCase):
         mock_log.error.assert_not_called()
 
     @patch('integra_ai.ai.gemini.log') # Mock the logger
-    @patch('requests.post')
+    @patch('requests.Session.post')
     @patch('os.getenv')
     def test_generate_code_custom_model(self, mock_getenv, mock_post, mock_log):
         """Testa o uso de um modelo personalizado."""
@@ -198,7 +199,7 @@ class TestGeminiAI(unittest.TestCase):
 
         self.assertEqual(result, "Response from custom model")
         mock_post.assert_called_once_with(
-            f"https://generativelanguage.googleapis.com/v1beta/models/{custom_model}:generateContent",
+            f"https://generativelanguage.googleapis.com/v1/models/{custom_model}:generateContent",
             headers={"Content-Type": "application/json"},
             params={"key": "TEST_API_KEY"},
             json={"contents": [{"parts": [{"text": prompt}]}]},
@@ -207,3 +208,84 @@ class TestGeminiAI(unittest.TestCase):
         mock_log.info.assert_called_once()
         mock_log.error.assert_not_called()
 
+
+    @patch('integra_ai.ai.gemini.get_response_cache')
+    @patch('integra_ai.ai.gemini.log') # Mock the logger
+    @patch('requests.Session.post')
+    @patch('os.getenv')
+    def test_generate_code_cache_hit_skips_network(self, mock_getenv, mock_post, mock_log, mock_cache):
+        """Testa que uma resposta em cache é servida sem chamar a API."""
+        import tempfile
+        from integra_ai.core.cache import ResponseCache
+
+        mock_getenv.return_value = "TEST_API_KEY"
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"candidates": [{"content": {"parts": [{"text": "cached code"}]}}]}
+        mock_response.raise_for_status.return_value = None
+        mock_post.return_value = mock_response
+
+        with tempfile.TemporaryDirectory() as tmp:
+            mock_cache.return_value = ResponseCache(root=tmp)
+            self.assertEqual(generate_code("Cache me", cache=True), "cached code")
+            mock_getenv.return_value = ""
+            self.assertEqual(generate_code("Cache me", cache=True), "cached code")
+            mock_getenv.return_value = "TEST_API_KEY"
+            self.assertEqual(generate_code("Cache me", model="gemini-pro", cache=True), "cached code")
+
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch('integra_ai.ai.gemini.log') # Mock the logger
+    @patch('requests.Session.post')
+    @patch('os.getenv')
+    def test_stream_generate_code_yields_chunks(self, mock_getenv, mock_post, mock_log):
+        """Testa o streaming SSE: cada linha data: vira um pedaço de texto."""
+        from integra_ai.ai.gemini import stream_generate_code
+
+        mock_getenv.return_value = "TEST_API_KEY"
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.raise_for_status.return_value = None
+        mock_response.iter_lines.return_value = iter([
+            'data: {"candidates": [{"content": {"parts": [{"text": "import os\\n"}]}}]}',
+            '',
+            'data: {"candidates": [{"content": {"parts": [{"text": "print(1)"}]}}]}',
+            'data: {"usageMetadata": {}}',
+        ])
+        mock_post.return_value = mock_response
+
+        chunks = list(stream_generate_code("Stream me"))
+
+        self.assertEqual(chunks, ["import os\n", "print(1)"])
+        args, kwargs = mock_post.call_args
+        self.assertEqual(args[0], "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:streamGenerateContent")
+        self.assertEqual(kwargs["params"], {"key": "TEST_API_KEY", "alt": "sse"})
+        self.assertTrue(kwargs["stream"])
+        self.assertIn("ttfb_ms", mock_log.info.call_args_list[1].kwargs["extra"])
+
+
+    @unittest.skipUnless(importlib.util.find_spec("httpx"), "httpx não instalado")
+    @patch('integra_ai.ai.gemini.async_request')
+    @patch('integra_ai.ai.gemini.log') # Mock the logger
+    @patch('os.getenv')
+    def test_generate_code_async(self, mock_getenv, mock_log, mock_request):
+        """Testa a versão assíncrona: mesma URL, corpo e extração de texto."""
+        import asyncio
+        httpx = __import__('httpx')
+        from integra_ai.ai.gemini import generate_code_async
+
+        mock_getenv.return_value = "TEST_API_KEY"
+        req = httpx.Request("POST", "https://example")
+        mock_request.side_effect = [
+            httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": "async ok"}]}}]}, request=req),
+            httpx.Response(400, text="Bad Request", request=req),
+        ]
+
+        self.assertEqual(asyncio.run(generate_code_async("Async prompt")), "async ok")
+        args, kwargs = mock_request.call_args
+        self.assertEqual(args, ("POST", "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"))
+        self.assertEqual(kwargs["params"], {"key": "TEST_API_KEY"})
+        self.assertEqual(kwargs["json"], {"contents": [{"parts": [{"text": "Async prompt"}]}]})
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            asyncio.run(generate_code_async("Async prompt"))
+        mock_log.error.assert_called_once()
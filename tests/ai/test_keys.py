@@ -0,0 +1,111 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from integra_ai.ai import keys
+from integra_ai.ai.gemini import generate_code
+from integra_ai.ai.keys import KeyPool, retry_after
+
+
+def _response(status, text="", headers=None, data=None):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.text = text
+    resp.headers = headers or {}
+    resp.json.return_value = data or {}
+    if status >= 400:
+        import requests
+        resp.raise_for_status.side_effect = requests.HTTPError(f"{status}", response=resp)
+    return resp
+
+
+class TestKeyPool(unittest.TestCase):
+
+    def test_spreads_calls_by_headroom(self):
+        """Testa que cada chamada vai para a chave com mais folga e que o orçamento por minuto é respeitado."""
+        pool = KeyPool([("key-aaaa", 2, 1000), ("key-bbbb", 4, 1000)], max_wait=0)
+        used = [pool.acquire(10).key for _ in range(6)]
+        self.assertEqual(used.count("key-aaaa"), 2)
+        self.assertEqual(used.count("key-bbbb"), 4)
+        with self.assertRaises(RuntimeError):
+            pool.acquire(10)
+
+    def test_tokens_budget_and_settle(self):
+        """Testa o orçamento de tokens/minuto e a troca da estimativa pelo uso real."""
+        pool = KeyPool([("key-aaaa", 100, 1000)], max_wait=0)
+        lease = pool.acquire(900)
+        with self.assertRaises(RuntimeError):
+            pool.acquire(200)
+        pool.settle(lease, {"usageMetadata": {"totalTokenCount": 300}})
+        self.assertEqual(pool.acquire(200).key, "key-aaaa")
+        self.assertEqual(pool.snapshot()[0]["tokens"], 500)
+
+    def test_rate_limited_key_cools_down(self):
+        """Testa que uma chave com 429 fica de fora até o Retry-After passar."""
+        pool = KeyPool([("key-aaaa", 100, 10_000), ("key-bbbb", 100, 10_000)], max_wait=1)
+        lease = pool.acquire()
+        pool.rate_limited(lease, 0.2)
+        other = "key-bbbb" if lease.key == "key-aaaa" else "key-aaaa"
+        self.assertEqual({pool.acquire().key for _ in range(5)}, {other})
+        pool.rate_limited(pool.acquire(), 0.3)
+        # As duas em pausa: espera a primeira voltar
+        self.assertEqual(pool.acquire().key, lease.key)
+
+    def test_retry_after_sources(self):
+        """Testa a leitura do atraso pelo header e pelo RetryInfo do corpo do erro."""
+        self.assertEqual(retry_after({"Retry-After": "7"}), 7.0)
+        body = '{"error": {"details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "13s"}]}}'
+        self.assertEqual(retry_after({}, body), 13.0)
+        self.assertIsNone(retry_after({}, "not json"))
+
+    def test_keys_file_and_env(self):
+        """Testa o arquivo de chaves (com orçamentos próprios) somado a GEMINI_API_KEYS e GEMINI_API_KEY."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "gemini_keys"
+            path.write_text("# chaves do time\nkey-file rpm=15 tpm=250000\n\n", encoding="utf-8")
+            cfg = MagicMock(gemini_keys_file=str(path), gemini_key_rpm=60, gemini_key_tpm=1000)
+            env = {"GEMINI_API_KEYS": "key-one, key-two,key-file", "GEMINI_API_KEY": "key-one"}
+            with patch('integra_ai.ai.keys.http_config', return_value=cfg), \
+                    patch('os.getenv', side_effect=lambda name, default=None: env.get(name, default)):
+                specs = keys.configured_keys()
+                self.assertEqual(keys.configured_keys("explicit"), [("explicit", 60, 1000)])
+        self.assertEqual(specs, [("key-file", 15.0, 250000.0), ("key-one", 60, 1000), ("key-two", 60, 1000)])
+
+    def test_zero_budgets_are_rejected(self):
+        """Testa que rpm/tpm zerados no arquivo de chaves ou no config são recusados em vez de dividir por zero."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "gemini_keys"
+            path.write_text("key-ok\nkey-off rpm=0\n", encoding="utf-8")
+            cfg = MagicMock(gemini_keys_file=str(path), gemini_key_rpm=60, gemini_key_tpm=1000)
+            with patch('integra_ai.ai.keys.http_config', return_value=cfg):
+                with self.assertRaisesRegex(ValueError, "gemini_keys:2"):
+                    keys.configured_keys()
+                cfg.gemini_key_tpm = 0
+                with self.assertRaisesRegex(ValueError, "gemini_key_tpm"):
+                    keys.configured_keys("explicit")
+
+
+class TestGenerateCodeRotation(unittest.TestCase):
+
+    @patch('requests.Session.post')
+    def test_429_moves_to_another_key(self, mock_post):
+        """Testa que um 429 numa chave faz a chamada ser refeita em outra, sem parar a geração."""
+        pool = KeyPool([("key-aaaa", 60, 100_000), ("key-bbbb", 60, 100_000)])
+        ok = {"candidates": [{"content": {"parts": [{"text": "print(1)"}]}}], "usageMetadata": {"totalTokenCount": 42}}
+        mock_post.side_effect = [_response(429, headers={"Retry-After": "30"}), _response(200, data=ok), _response(200, data=ok)]
+
+        with patch('integra_ai.ai.gemini.key_pool', return_value=pool):
+            self.assertEqual(generate_code("prompt"), "print(1)")
+            self.assertEqual(generate_code("prompt"), "print(1)")
+
+        first, second, third = (c.kwargs["params"]["key"] for c in mock_post.call_args_list)
+        self.assertNotEqual(first, second)
+        self.assertEqual(second, third)  # a chave com 429 continua em pausa
+        rows = {r["key"]: r for r in pool.snapshot()}
+        self.assertGreater(rows[keys.mask(first)]["cooldown"], 25)
+        self.assertEqual(rows[keys.mask(second)]["tokens"], 84)
+
+
+if __name__ == "__main__":
+    unittest.main()
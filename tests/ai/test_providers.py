@@ -0,0 +1,82 @@
+import asyncio
+import importlib.util
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from integra_ai.ai import gemini, providers
+from integra_ai.ai.providers import OpenAICompatibleProvider
+from integra_ai.ai.stub import StubServer, stub_code
+
+
+class TestStubProviders(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.srv = StubServer(chunks=4).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.srv.stop()
+
+    def test_openai_compatible_provider(self):
+        """Testa o provedor compatível com OpenAI contra o stub: resposta inteira, streaming e cache."""
+        provider = OpenAICompatibleProvider(self.srv.url + "/v1", name="stub")
+        expected = stub_code("Gere um cliente", "local")
+        self.assertEqual(provider.generate("Gere um cliente", "local"), expected)
+        chunks = list(provider.stream("Gere um cliente", "local"))
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual("".join(chunks), expected)
+        compile(expected, "stub.py", "exec")
+
+    @unittest.skipUnless(importlib.util.find_spec("httpx"), "httpx não instalado")
+    def test_openai_compatible_provider_async(self):
+        """Testa a variante assíncrona do provedor compatível com OpenAI."""
+        from integra_ai.core.http import close_async_client
+
+        provider = OpenAICompatibleProvider(self.srv.url + "/v1", name="stub")
+
+        async def run():
+            try:
+                return await provider.generate_async("async", "local")
+            finally:
+                await close_async_client()
+
+        self.assertEqual(asyncio.run(run()), stub_code("async", "local"))
+
+    def test_gemini_flow_against_stub(self):
+        """Testa o cliente Gemini completo (pool de chaves, SSE) apontado para o stub, sem rede externa."""
+        with patch.object(gemini, "GEMINI_BASE_URL", self.srv.url):
+            self.assertEqual(gemini.generate_code("p", api_key="stub-key"), stub_code("p", gemini.DEFAULT_MODEL))
+            streamed = "".join(gemini.stream_generate_code("p", api_key="stub-key"))
+        self.assertEqual(streamed, stub_code("p", gemini.DEFAULT_MODEL))
+
+    def test_configured_provider_is_used(self):
+        """Testa que as funções de providers usam o provedor configurado."""
+        providers.set_provider(OpenAICompatibleProvider(self.srv.url + "/v1", name="stub"))
+        self.addCleanup(providers.set_provider, None)
+        self.assertEqual(providers.generate_code("x", model="m"), stub_code("x", "m"))
+        self.assertEqual("".join(providers.stream_generate_code("x", model="m")), stub_code("x", "m"))
+
+
+class TestStubServer(unittest.TestCase):
+
+    def _statuses(self, seed):
+        with StubServer(error_rate=0.5, error_status=429, seed=seed) as srv:
+            return [
+                requests.post(srv.url + "/v1/chat/completions", json={"messages": [{"content": "x"}]}, timeout=5).status_code
+                for _ in range(12)
+            ], srv.stats()
+
+    def test_error_injection_is_reproducible(self):
+        """Testa que a mesma semente reproduz as mesmas falhas, requisição a requisição."""
+        first, stats = self._statuses(7)
+        again, _ = self._statuses(7)
+        self.assertEqual(first, again)
+        self.assertEqual(set(first), {200, 429})
+        self.assertEqual(stats["errors"], first.count(429))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import asyncio
+import os
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from integra_ai.ai.gemini import generate_code
+from integra_ai.ai.routing import Router
+from integra_ai.core.config import AppConfig
+
+
+def _router(**overrides):
+    cfg = AppConfig(
+        model_routes=[
+            {"task": "reduce", "models": ["strong", "fast"]},
+            {"max_tokens": 100, "models": ["fast", "strong"]},
+            {"models": ["strong", "fast"]},
+        ],
+        model_min_samples=2,
+        model_hedge=True,
+        model_hedge_min_delay=0.05,
+    )
+    for k, v in overrides.items():
+        setattr(cfg, k, v)
+    return Router(cfg)
+
+
+class TestRouter(unittest.TestCase):
+
+    def test_chain_by_size_and_task(self):
+        """Testa a escolha da cadeia pelo tamanho do prompt e pelo tipo de tarefa."""
+        router = _router()
+        self.assertEqual(router.chain("curto"), ["fast", "strong"])
+        self.assertEqual(router.chain("x" * 1000), ["strong", "fast"])
+        self.assertEqual(router.chain("curto", task="reduce"), ["strong", "fast"])
+
+    def test_failover_and_demotion(self):
+        """Testa que um modelo com erro passa a vez ao próximo e, com taxa de erro alta, cai para o fim da cadeia."""
+        router = _router(model_hedge=False)
+        calls = []
+
+        def call(model):
+            calls.append(model)
+            if model == "fast":
+                raise RuntimeError("503")
+            return f"code from {model}"
+
+        for _ in range(2):
+            self.assertEqual(router.run("curto", call), "code from strong")
+        self.assertEqual(calls, ["fast", "strong", "fast", "strong"])
+        self.assertEqual(router.chain("curto"), ["strong", "fast"])
+        self.assertEqual(router.run("curto", call), "code from strong")
+        self.assertEqual(calls[-1], "strong")
+
+        with self.assertRaises(RuntimeError):
+            router.run("curto", lambda model: (_ for _ in ()).throw(RuntimeError(model)))
+
+    def test_hedges_slow_primary(self):
+        """Testa o hedge: passado o p95 do modelo principal, o segundo modelo é chamado e a primeira resposta vence."""
+        router = _router()
+        for _ in range(3):
+            router.stats("fast").record(0.01, True)
+
+        def call(model):
+            if model == "fast":
+                time.sleep(1)
+            return model
+
+        start = time.perf_counter()
+        self.assertEqual(router.run("curto", call), "strong")
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+        async def acall(model):
+            await asyncio.sleep(1 if model == "fast" else 0)
+            return model
+
+        start = time.perf_counter()
+        self.assertEqual(asyncio.run(router.run_async("curto", acall)), "strong")
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_stream_fails_over_before_first_chunk(self):
+        """Testa que o streaming troca de modelo se o erro vier antes do primeiro pedaço."""
+        router = _router(model_hedge=False)
+
+        def call(model):
+            if model == "fast":
+                raise RuntimeError("429")
+            yield from ("a", "b")
+
+        self.assertEqual(list(router.stream("curto", call)), ["a", "b"])
+
+
+class TestAutoModel(unittest.TestCase):
+
+    @patch('requests.Session.post')
+    def test_generate_code_auto_falls_back(self, mock_post):
+        """Testa generate_code com model="auto": erro 500 no modelo rápido e resposta do seguinte na cadeia."""
+        def post(url, **kw):
+            resp = MagicMock()
+            resp.status_code = 500 if "flash" in url else 200
+            resp.text = "erro"
+            if resp.status_code == 500:
+                resp.raise_for_status.side_effect = requests.HTTPError("500", response=resp)
+            resp.json.return_value = {"candidates": [{"content": {"parts": [{"text": url.rsplit("/", 1)[1]}]}}]}
+            return resp
+
+        mock_post.side_effect = post
+        env = {"GEMINI_API_KEY": "key-test", "GEMINI_API_KEYS": ""}
+        with patch.dict(os.environ, env), patch('integra_ai.ai.routing._router', Router(AppConfig())):
+            self.assertEqual(generate_code("Gere um cliente", model="auto"), "gemini-1.5-pro:generateContent")
+        self.assertEqual([c.args[0].rsplit("/", 1)[1] for c in mock_post.call_args_list],
+                         ["gemini-1.5-flash:generateContent", "gemini-1.5-pro:generateContent"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import multiprocessing
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from integra_ai.core import artifacts
+from integra_ai.core.generator import GeneratedCodeWriter, save_generated_code
+
+
+def _save_versions(worker, count):
+    for i in range(count):
+        save_generated_code("integration", "python", f"w = {worker}\ni = {i}\n")
+
+
+class TestArtifacts(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name) / "integrations"
+        self.root.mkdir()
+        patcher = patch('integra_ai.core.storage.INTEGRATIONS_DIR', self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _files(self, name):
+        return sorted(p.name for p in (self.root / name).iterdir() if p.name.startswith("generated"))
+
+    def test_identical_content_is_stored_once(self):
+        """Testa que conteúdo repetido não gera novo arquivo nem nova versão."""
+        inputs = artifacts.ai_inputs("prompt", "m", "python")
+        paths = {save_generated_code("api", "python", "print(1)\n", inputs) for _ in range(20)}
+        self.assertEqual(len(paths), 1)
+        self.assertEqual(len(self._files("api")), 1)
+        self.assertEqual(len(artifacts.history("api")), 1)
+        self.assertTrue(next(iter(paths)).name.startswith("generated_"))
+
+    def test_versions_are_linked_by_parent_hash(self):
+        """Testa o encadeamento das versões e a volta a um conteúdo anterior sem regravar o arquivo."""
+        a = save_generated_code("api", "python", "a = 1\n")
+        b = save_generated_code("api", "python", "a = 2\n")
+        again = save_generated_code("api", "python", "a = 1\n")
+
+        entries = artifacts.history("api")
+        self.assertEqual([e["version"] for e in entries], [1, 2, 3])
+        self.assertIsNone(entries[0]["parent"])
+        self.assertEqual(entries[1]["parent"], entries[0]["sha256"])
+        self.assertEqual(entries[2]["sha256"], entries[0]["sha256"])
+        self.assertEqual(again, a)
+        self.assertEqual(self._files("api"), sorted([a.name, b.name]))
+        self.assertEqual(artifacts.head("api")["version"], 3)
+
+    def test_find_unchanged_matches_only_same_inputs(self):
+        """Testa que só entradas idênticas reaproveitam o artefato atual."""
+        inputs = artifacts.ai_inputs("prompt", "m", "python")
+        self.assertIsNone(artifacts.find_unchanged("api", inputs))
+        path = save_generated_code("api", "python", "x = 1\n", inputs)
+        self.assertEqual(artifacts.find_unchanged("api", dict(inputs)), path)
+        self.assertIsNone(artifacts.find_unchanged("api", artifacts.ai_inputs("prompt", "outro", "python")))
+
+        # Versão gravada sem entradas (ex.: fallback offline) nunca conta como inalterada
+        save_generated_code("api", "python", "fallback\n")
+        self.assertIsNone(artifacts.find_unchanged("api", inputs))
+
+    def test_failed_write_leaves_no_files(self):
+        """Testa que uma escrita interrompida não deixa arquivo temporário nem versão."""
+        with self.assertRaises(RuntimeError):
+            with GeneratedCodeWriter("api", "node") as w:
+                w.write("// parcial")
+                raise RuntimeError("stream caiu")
+        self.assertEqual([p.name for p in (self.root / "api").iterdir()], [])
+        self.assertEqual(artifacts.history("api"), [])
+
+    def test_streamed_fences_are_cleaned_before_storing(self):
+        """Testa que o texto completo passa pelo `clean` antes do hash e da gravação."""
+        from integra_ai.core.validation import strip_fences
+
+        with GeneratedCodeWriter("api", "python", clean=strip_fences) as w:
+            for chunk in ("```py", "thon\nx = 1\n", "```\n"):
+                w.write(chunk)
+        self.assertEqual(w.path.read_text(encoding="utf-8"), "x = 1\n")
+        self.assertEqual(w.path, save_generated_code("api", "python", "x = 1\n"))
+
+    def test_diff_between_versions(self):
+        """Testa o diff padrão (anterior vs atual) e por número/prefixo de hash."""
+        save_generated_code("api", "python", "a = 1\nb = 2\n")
+        save_generated_code("api", "python", "a = 1\nb = 3\n")
+        text = artifacts.diff("api")
+        self.assertIn("-b = 2", text)
+        self.assertIn("+b = 3", text)
+
+        first = artifacts.history("api")[0]["sha256"]
+        self.assertEqual(artifacts.diff("api", first[:8], "2"), text)
+        self.assertEqual(artifacts.diff("api", "1", "1"), "")
+        with self.assertRaises(LookupError):
+            artifacts.diff("api", "9")
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "requer fork")
+    def test_concurrent_processes_get_distinct_versions(self):
+        """Testa que processos gravando a mesma integração não repetem número de versão."""
+        ctx = multiprocessing.get_context("fork")
+        procs = [ctx.Process(target=_save_versions, args=(w, 10)) for w in range(4)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        self.assertEqual([p.exitcode for p in procs], [0] * 4)
+        entries = artifacts.history("integration")
+        self.assertEqual([e["version"] for e in entries], list(range(1, 41)))
+        self.assertEqual([e["parent"] for e in entries[1:]], [e["sha256"] for e in entries[:-1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
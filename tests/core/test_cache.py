@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from integra_ai.core.cache import ResponseCache, cache_key
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_cache_key_is_content_addressed(self):
+        """Testa que a chave depende apenas do conteúdo e separa as partes."""
+        self.assertEqual(cache_key("m", "v1", "p"), cache_key("m", "v1", "p"))
+        self.assertNotEqual(cache_key("m", "v1", "p"), cache_key("m", "v1beta", "p"))
+        self.assertNotEqual(cache_key("ab", "c"), cache_key("a", "bc"))
+
+    def test_get_set_and_counters(self):
+        """Testa leitura/escrita e os contadores de hit/miss."""
+        cache = ResponseCache(root=self.root)
+        self.assertIsNone(cache.get("k" * 64))
+        cache.set("k" * 64, "print('ok')")
+        self.assertEqual(cache.get("k" * 64), "print('ok')")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+
+    def test_ttl_expires_entries(self):
+        """Testa que entradas mais antigas que o TTL são descartadas."""
+        cache = ResponseCache(root=self.root, ttl=10)
+        cache.set("a" * 64, "old")
+        p = cache._path("a" * 64)
+        p.write_text('{"created": %f, "value": "old"}' % (time.time() - 3600), encoding="utf-8")
+        self.assertIsNone(cache.get("a" * 64))
+        self.assertFalse(p.exists())
+
+    def test_lru_eviction_by_entries(self):
+        """Testa que a entrada menos usada recentemente é removida primeiro."""
+        cache = ResponseCache(root=self.root, max_entries=2)
+        cache.set("a" * 64, "a")
+        cache.set("b" * 64, "b")
+        past = time.time() - 100
+        os.utime(cache._path("b" * 64), (past, past))
+        os.utime(cache._path("a" * 64), (past + 50, past + 50))
+        cache.set("c" * 64, "c")
+        self.assertIsNone(cache.get("b" * 64))
+        self.assertEqual(cache.get("a" * 64), "a")
+        self.assertEqual(cache.get("c" * 64), "c")
+
+    def test_eviction_by_bytes(self):
+        """Testa o limite de tamanho total em bytes."""
+        cache = ResponseCache(root=self.root, max_bytes=300)
+        for i, ch in enumerate("abcd"):
+            cache.set(ch * 64, "x" * 100)
+            t = time.time() - 100 + i
+            os.utime(cache._path(ch * 64), (t, t))
+        self.assertLessEqual(cache.stats()["bytes"], 300)
+        self.assertEqual(cache.get("d" * 64), "x" * 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
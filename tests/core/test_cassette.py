@@ -0,0 +1,120 @@
+import asyncio
+import importlib.util
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+import requests
+
+from integra_ai.ai import gemini
+from integra_ai.ai.stub import StubServer, stub_code
+from integra_ai.core import http
+from integra_ai.core.cassette import Cassette, CassetteMiss, CassetteServer, cassette_path, installed, use_cassette
+from integra_ai.core.testing import simple_request_test
+
+
+class _Api(BaseHTTPRequestHandler):
+    hits = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        type(self).hits += 1
+        body = json.dumps({"path": self.path, "hit": type(self).hits}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestCassette(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.path = self.tmp / "default.json.gz"
+        _Api.hits = 0
+        self.api = ThreadingHTTPServer(("127.0.0.1", 0), _Api)
+        threading.Thread(target=self.api.serve_forever, daemon=True).start()
+        self.addCleanup(self.api.server_close)
+        self.addCleanup(self.api.shutdown)
+        self.base = f"http://127.0.0.1:{self.api.server_address[1]}"
+        self.addCleanup(http.set_interceptor, None)
+
+    def test_record_then_replay_offline(self):
+        """Testa que a resposta gravada é reproduzida sem acessar a API, ignorando a chave na URL."""
+        with use_cassette(self.path, "record"):
+            status, text = simple_request_test(self.base, "/users?key=segredo", "GET", {})
+        self.assertEqual((status, _Api.hits), (200, 1))
+        self.assertNotIn("segredo", self.path.read_bytes().decode("latin-1"))
+
+        with use_cassette(self.path, "replay"):
+            self.assertEqual(simple_request_test(self.base, "/users?key=outra", "GET", {}), (status, text))
+            with self.assertRaises(CassetteMiss):
+                simple_request_test(self.base, "/orders", "GET", {})
+        self.assertEqual(_Api.hits, 1)
+
+    def test_sequence_and_missing_cassette(self):
+        """Testa a reprodução em ordem de respostas repetidas e o erro sem cassete gravado."""
+        with use_cassette(self.path, "record"):
+            hits = [json.loads(simple_request_test(self.base, "/", "GET", {})[1])["hit"] for _ in range(2)]
+        with use_cassette(self.path, "replay"):
+            replayed = [json.loads(simple_request_test(self.base, "/", "GET", {})[1])["hit"] for _ in range(3)]
+        self.assertEqual(replayed, hits + hits[-1:])
+        with self.assertRaises(FileNotFoundError):
+            Cassette(self.path.with_name("outro.json.gz"))
+
+    def test_loopback_server(self):
+        """Testa o servidor em loopback usado por clientes gerados e pela carga: grava, reproduz e marca faltas com 599."""
+        with CassetteServer(Cassette(self.path, "record"), self.base) as srv:
+            recorded = requests.get(srv.url + "/items", timeout=5).json()
+        with CassetteServer(Cassette(self.path, "replay", latency=0.01), self.base) as srv:
+            self.assertEqual(requests.get(srv.url + "/items", timeout=5).json(), recorded)
+            self.assertEqual(requests.get(srv.url + "/nada", timeout=5).status_code, 599)
+        self.assertEqual(_Api.hits, 1)
+
+    def test_generation_calls_replay(self):
+        """Testa a gravação e reprodução das chamadas ao Gemini (inteira e streaming) contra o stub."""
+        with StubServer(chunks=3) as stub, patch.object(gemini, "GEMINI_BASE_URL", stub.url):
+            with use_cassette(self.path, "record"):
+                code = gemini.generate_code("p", api_key="k1")
+                streamed = list(gemini.stream_generate_code("p", api_key="k1"))
+            url = stub.url
+        self.assertEqual(code, stub_code("p", gemini.DEFAULT_MODEL))
+
+        # O stub já foi encerrado: tudo vem do cassete
+        with patch.object(gemini, "GEMINI_BASE_URL", url), use_cassette(self.path, "replay"):
+            self.assertEqual(gemini.generate_code("p", api_key="k2"), code)
+            self.assertEqual(list(gemini.stream_generate_code("p", api_key="k2")), streamed)
+
+    @unittest.skipUnless(importlib.util.find_spec("httpx"), "httpx não instalado")
+    def test_async_client_replay(self):
+        """Testa que o cliente assíncrono compartilhado também passa pelo cassete."""
+        async def get():
+            try:
+                resp = await http.get_async_client().get(self.base + "/async")
+                return resp.json()
+            finally:
+                await http.close_async_client()
+
+        with installed(Cassette(self.path, "record")):
+            recorded = asyncio.run(get())
+        with installed(Cassette(self.path, "replay")):
+            self.assertEqual(asyncio.run(get()), recorded)
+        self.assertEqual(_Api.hits, 1)
+
+    def test_cassette_path(self):
+        """Testa que os cassetes ficam no diretório da integração."""
+        with patch("integra_ai.core.storage.INTEGRATIONS_DIR", self.tmp):
+            self.assertEqual(cassette_path("Minha API", "smoke"), self.tmp / "minha-api" / "cassettes" / "smoke.json.gz")
+
+
+if __name__ == "__main__":
+    unittest.main()
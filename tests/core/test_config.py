@@ -0,0 +1,33 @@
+import os
+import tempfile
+import unittest
+
+from integra_ai.core.config import AppConfig
+
+
+class TestCachedConfig(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cwd = os.getcwd()
+        os.chdir(tmp.name)
+        self.addCleanup(os.chdir, cwd)
+
+    def test_reloaded_only_when_file_changes(self):
+        """Testa que a configuração fica em memória e é relida quando o config.json muda."""
+        first = AppConfig.cached()
+        self.assertFalse(os.path.exists(".integra/config.json"))  # não cria o arquivo
+        self.assertIs(AppConfig.cached(), first)
+
+        AppConfig(serve_port=8081).save()
+        changed = AppConfig.cached()
+        self.assertEqual(changed.serve_port, 8081)
+        self.assertIs(AppConfig.cached(), changed)
+
+        AppConfig(serve_port=8082).save()
+        self.assertEqual(AppConfig.cached().serve_port, 8082)
+
+
+if __name__ == "__main__":
+    unittest.main()
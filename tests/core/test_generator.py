@@ -0,0 +1,140 @@
+import asyncio
+import json
+import threading
+import types
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from integra_ai.core.generator import render_python_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    flaky = {"n": 0}
+    created = {"n": 0}
+
+    def _send(self, status, body, headers=None):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json" if not isinstance(body, bytes) else "application/octet-stream")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        q = parse_qs(url.query)
+        if url.path == "/pages":
+            page = int(q.get("page", ["1"])[0])
+            self._send(200, {"items": [page * 10 + i for i in range(2)] if page <= 3 else []})
+        elif url.path == "/linked":
+            n = int(q.get("n", ["0"])[0])
+            link = {"Link": f'<{self.server.url}/linked?n={n + 1}>; rel="next"'} if n < 2 else {}
+            self._send(200, [n], link)
+        elif url.path == "/cursor":
+            cursor = q.get("cursor", [""])[0]
+            self._send(200, {"data": [cursor or "start"], "next_cursor": "" if cursor else "c1"})
+        elif url.path == "/flaky":
+            self.flaky["n"] += 1
+            if self.flaky["n"] % 2:
+                self._send(503, {"error": "tente de novo"}, {"Retry-After": "0"})
+            else:
+                self._send(200, {"ok": True})
+        elif url.path == "/big":
+            self._send(200, b"x" * 300_000)
+        else:
+            self._send(200, {"auth": self.headers.get("Authorization")})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        # Cada pedido cria um recurso, mas a primeira resposta se perde num 503
+        self.created["n"] += 1
+        if self.created["n"] % 2:
+            self._send(503, {"error": "tente de novo"}, {"Retry-After": "0"})
+        else:
+            self._send(201, {"id": self.created["n"]})
+
+    def log_message(self, *args):
+        pass
+
+
+class TestGeneratedPythonClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.srv.daemon_threads = True
+        cls.srv.url = f"http://127.0.0.1:{cls.srv.server_address[1]}"
+        threading.Thread(target=cls.srv.serve_forever, daemon=True).start()
+        cls.client = types.ModuleType("generated_client")
+        code = render_python_client(base_url=cls.srv.url, token="tok")
+        exec(compile(code, "generated_client.py", "exec"), cls.client.__dict__)
+        cls.client.BACKOFF = 0
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.srv.shutdown()
+        cls.srv.server_close()
+
+    def test_call_api_uses_pooled_session_and_token(self):
+        """Testa a chamada simples: sessão compartilhada, token no header e JSON decodificado."""
+        self.assertEqual(self.client.call_api("/"), {"auth": "Bearer tok"})
+        adapter = self.client._SESSION.get_adapter(self.srv.url)
+        self.assertEqual(adapter.max_retries.total, self.client.RETRIES)
+
+    def test_paginate_streams_pages(self):
+        """Testa a paginação por número de página, header Link e cursor no corpo."""
+        pages = self.client.paginate("/pages")
+        self.assertEqual(next(pages), 10)  # só a primeira página foi buscada
+        self.assertEqual(list(pages), [11, 20, 21, 30, 31])
+        self.assertEqual(list(self.client.paginate("/linked", page_param=None)), [0, 1, 2])
+        self.assertEqual(list(self.client.paginate("/cursor")), ["start", "c1"])
+        self.assertEqual(list(self.client.paginate("/pages", max_pages=2)), [10, 11, 20, 21])
+
+    def test_stream_api_yields_chunks(self):
+        """Testa que respostas grandes podem ser lidas em blocos."""
+        chunks = list(self.client.stream_api("/big", chunk_size=65536))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(sum(map(len, chunks)), 300_000)
+
+    def test_retries_on_503(self):
+        """Testa o retry com backoff em 503 (síncrono e assíncrono)."""
+        self.assertEqual(self.client.call_api("/flaky"), {"ok": True})
+
+        async def run():
+            try:
+                return await self.client.acall_api("/flaky"), [x async for x in self.client.apaginate("/pages")]
+            finally:
+                await self.client.aclose()
+
+        result, items = asyncio.run(run())
+        self.assertEqual(result, {"ok": True})
+        self.assertEqual(items, [10, 11, 20, 21, 30, 31])
+
+    def test_post_is_not_retried_unless_asked(self):
+        """Testa que POST não é repetido por padrão (efeito duplicado), só com retry_post=True."""
+        _Handler.created["n"] = 0
+        with self.assertRaisesRegex(RuntimeError, "503"):
+            self.client.call_api("/orders", "POST", json_body={"valor": 10})
+        self.assertEqual(_Handler.created["n"], 1)
+        _Handler.created["n"] = 0
+        self.assertEqual(self.client.call_api("/orders", "POST", json_body={"valor": 10}, retry_post=True), {"id": 2})
+
+        async def run():
+            try:
+                with self.assertRaisesRegex(RuntimeError, "503"):
+                    await self.client.acall_api("/orders", "POST", json_body={})
+                _Handler.created["n"] = 0
+                return await self.client.acall_api("/orders", "POST", json_body={}, retry_post=True)
+            finally:
+                await self.client.aclose()
+
+        _Handler.created["n"] = 0
+        self.assertEqual(asyncio.run(run()), {"id": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
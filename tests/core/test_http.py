@@ -0,0 +1,44 @@
+import unittest
+from unittest.mock import patch
+
+from integra_ai.core import http
+from integra_ai.core.config import AppConfig
+
+
+class TestHttpSession(unittest.TestCase):
+
+    def tearDown(self):
+        http.reset_session()
+
+    def test_build_session_pools_and_retries(self):
+        """Testa que a sessão monta adaptadores com pool e retry em 429/5xx."""
+        s = http.build_session(pool_maxsize=4, retries=2)
+        adapter = s.get_adapter("https://generativelanguage.googleapis.com")
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+        self.assertNotIn("POST", adapter.max_retries.allowed_methods)
+
+    def test_post_retried_only_for_provider_sessions(self):
+        """Testa que só a sessão dos provedores repete POST; a compartilhada só repete métodos idempotentes."""
+        shared = http.get_session().get_adapter("https://api.example.com").max_retries
+        provider = http.get_session(retry_post=True).get_adapter("https://api.example.com").max_retries
+        self.assertTrue(shared.is_retry("GET", 503))
+        self.assertFalse(shared.is_retry("POST", 503))
+        self.assertTrue(provider.is_retry("POST", 503))
+        self.assertIsNot(http.get_session(), http.get_session(retry_post=True))
+
+    @patch('integra_ai.core.http.AppConfig.load')
+    def test_get_session_is_shared_and_uses_config(self, mock_load):
+        """Testa que a sessão é única por processo e lida do AppConfig uma vez."""
+        mock_load.return_value = AppConfig(http_pool_maxsize=7, http_timeout=5.0)
+        s1 = http.get_session()
+        s2 = http.get_session()
+        self.assertIs(s1, s2)
+        self.assertEqual(s1.get_adapter("http://x")._pool_maxsize, 7)
+        self.assertEqual(http.http_config().http_timeout, 5.0)
+        mock_load.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
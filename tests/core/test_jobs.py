@@ -0,0 +1,121 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from integra_ai.core import jobs
+from integra_ai.core.jobs import JobQueue, WorkerPool, run_worker
+
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "jobs.db"
+        self.q = JobQueue(self.path, retry_backoff=0)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_claims_by_priority_then_age(self):
+        """Testa que jobs de maior prioridade saem primeiro e, empatados, os mais antigos."""
+        low = self.q.enqueue("generate", {"prompt": "a"})
+        high = self.q.enqueue("generate", {"prompt": "b"}, priority=10)
+        low2 = self.q.enqueue("generate", {"prompt": "c"})
+
+        claimed = [self.q.claim("w")["id"] for _ in range(3)]
+        self.assertEqual(claimed, [high, low, low2])
+        self.assertIsNone(self.q.claim("w"))
+        self.assertEqual(self.q.get(high)["status"], "running")
+
+    def test_enqueue_or_join_coalesces_active_jobs(self):
+        """Testa que pedidos idênticos reaproveitam o job pendente e não um já concluído."""
+        first, joined = self.q.enqueue_or_join("generate", {"prompt": "a"}, "chave")
+        second, joined2 = self.q.enqueue_or_join("generate", {"prompt": "a"}, "chave", priority=5)
+        self.assertEqual((second, joined, joined2), (first, False, True))
+        self.assertEqual(self.q.get(first)["priority"], 5)
+
+        self.q.claim("w")
+        self.q.complete(first, {"saved_to": "x"})
+        third, joined3 = self.q.enqueue_or_join("generate", {"prompt": "a"}, "chave")
+        self.assertNotEqual(third, first)
+        self.assertFalse(joined3)
+
+    def test_concurrent_first_connections(self):
+        """Testa que várias threads abrindo o banco novo ao mesmo tempo não falham na migração do esquema."""
+        errors = []
+        start = threading.Barrier(8)
+
+        def enqueue(i):
+            start.wait()
+            try:
+                self.q.enqueue_or_join("generate", {"prompt": str(i)}, f"k{i}")
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+
+        threads = [threading.Thread(target=enqueue, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+
+    def test_failed_attempts_retry_until_max(self):
+        """Testa que falhas são reenfileiradas até max_attempts e depois marcadas como failed."""
+        job_id = self.q.enqueue("generate", {"prompt": "a"}, max_attempts=2)
+        self.q.claim("w")
+        self.assertEqual(self.q.fail(job_id, "boom"), "queued")
+        self.assertEqual(self.q.claim("w")["attempts"], 2)
+        self.assertEqual(self.q.fail(job_id, "boom again"), "failed")
+        job = self.q.get(job_id)
+        self.assertEqual((job["status"], job["error"]), ("failed", "boom again"))
+        self.assertIsNone(self.q.claim("w"))
+
+    def test_expired_lease_survives_restart(self):
+        """Testa que um job preso em 'running' (worker morto/reinício) volta para a fila ao expirar o lease."""
+        job_id = self.q.enqueue("generate", {"prompt": "a"}, timeout=1)
+        self.q.claim("w-morto")
+
+        fresh = JobQueue(self.path)  # como após reiniciar o processo
+        self.assertIsNone(fresh.claim("w2"))
+        later = time.time() + 1 + jobs.LEASE_GRACE + 1
+        with patch("integra_ai.core.jobs.time.time", return_value=later):
+            job = fresh.claim("w2")
+        self.assertEqual((job["id"], job["attempts"], job["worker"]), (job_id, 2, "w2"))
+
+    def test_worker_runs_jobs_and_enforces_timeout(self):
+        """Testa que o worker grava o resultado e registra timeout de jobs travados."""
+        ok = self.q.enqueue("echo", {"value": 42})
+        stuck = self.q.enqueue("sleep", {}, timeout=0.2, max_attempts=1)
+
+        def handler(job):
+            if job["kind"] == "sleep":
+                time.sleep(5)
+            return {"value": job["payload"]["value"]}
+
+        stop = threading.Event()
+        t = threading.Thread(target=run_worker, args=(self.path, handler, 0.01, stop))
+        t.start()
+        t.join(5)  # returns after the timed-out job
+        stop.set()
+        t.join()
+
+        self.assertEqual(self.q.get(ok)["result"], {"value": 42})
+        self.assertEqual(self.q.get(stuck)["status"], "failed")
+        self.assertIn("timed out", self.q.get(stuck)["error"])
+
+    def test_worker_pool_processes(self):
+        """Testa o pool de processos consumindo a fila."""
+        ids = [self.q.enqueue("echo", {"i": i}) for i in range(4)]
+        with WorkerPool(processes=2, path=self.path, handler="json:dumps", poll_interval=0.05):
+            deadline = time.time() + 30
+            while time.time() < deadline and self.q.counts()["done"] < len(ids):
+                time.sleep(0.05)
+        self.assertEqual(self.q.counts()["done"], len(ids))
+        self.assertIn('"kind": "echo"', self.q.get(ids[0])["result"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+from integra_ai.core.loadtest import histogram, percentile, run_load_test, save_load_test_report
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        status = 500 if self.path.endswith("/fail") else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class TestLoadTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_percentile_nearest_rank(self):
+        """Testa percentis pelo método nearest-rank."""
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_histogram_buckets(self):
+        """Testa a distribuição de latências nos buckets do histograma."""
+        buckets = {b["bucket"]: b["count"] for b in histogram([1, 7, 7, 20000])}
+        self.assertEqual((buckets["<=5ms"], buckets["<=10ms"], buckets[">10000ms"]), (1, 2, 1))
+
+    def test_run_load_test_counts_requests_and_statuses(self):
+        """Testa que o número de requisições e os códigos de status são contabilizados."""
+        report = run_load_test(self.base_url, "/ok", requests=40, concurrency=5)
+        self.assertEqual(report["requests"], 40)
+        self.assertEqual(report["status_codes"], {"200": 40})
+        self.assertLessEqual(report["latency_ms"]["p50"], report["latency_ms"]["p99"])
+        self.assertEqual(sum(b["count"] for b in report["histogram"]), 40)
+
+        failing = run_load_test(self.base_url, "/fail", requests=5, concurrency=2)
+        self.assertEqual(failing["status_codes"], {"500": 5})
+
+    def test_run_load_test_duration_and_rps(self):
+        """Testa o modo por duração com taxa alvo."""
+        report = run_load_test(self.base_url, "/", requests=None, duration=0.5, concurrency=4, rps=20)
+        self.assertLessEqual(report["requests"], 15)
+        self.assertGreater(report["requests"], 0)
+
+    def test_payload_callable_per_request(self):
+        """Testa que um payload chamável recebe o índice de cada requisição."""
+        seen = []
+        lock = threading.Lock()
+
+        def payload(i):
+            with lock:
+                seen.append(i)
+            return {"n": i}
+
+        report = run_load_test(self.base_url, "/", payload=payload, requests=12, concurrency=3)
+        self.assertEqual(report["requests"], 12)
+        self.assertEqual(sorted(seen), list(range(12)))
+
+    def test_save_report_next_to_metadata(self):
+        """Testa que o relatório é salvo na pasta da integração."""
+        with tempfile.TemporaryDirectory() as tmp, patch('integra_ai.core.storage.INTEGRATIONS_DIR', Path(tmp) / "integrations"):
+            p = save_load_test_report("Minha API", {"requests": 1})
+            self.assertEqual(p.parent, Path(tmp) / "integrations" / "minha-api")
+            self.assertTrue(p.name.startswith("loadtest_"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import gzip
+import json
+import logging
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from integra_ai.core.logger import RotatingGzipFileHandler, json_formatter
+
+
+def _record(msg="hello", **extra):
+    record = logging.LogRecord("integra_ai.test", logging.INFO, __file__, 1, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestLogger(unittest.TestCase):
+
+    def test_json_formatter_keeps_extra_fields(self):
+        """Testa que os campos de extra= aparecem na saída JSON."""
+        out = json.loads(json_formatter().format(_record(model="gemini-1.5-flash", status=429)))
+        self.assertEqual(out["event"], "hello")
+        self.assertEqual(out["level"], "info")
+        self.assertEqual(out["logger"], "integra_ai.test")
+        self.assertEqual((out["model"], out["status"]), ("gemini-1.5-flash", 429))
+        self.assertIn("timestamp", out)
+
+    def test_size_rotation_gzips_backups(self):
+        """Testa a rotação por tamanho com compressão dos arquivos antigos."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "logs" / "integra.log"
+            h = RotatingGzipFileHandler(path, max_bytes=200, backup_count=2, interval=0)
+            h.setFormatter(logging.Formatter("%(message)s"))
+            self.assertFalse(path.parent.exists())  # nada é criado antes do primeiro registro
+            for i in range(30):
+                h.emit(_record(f"linha {i:02d} " + "x" * 20))
+            h.close()
+
+            backups = sorted(p.name for p in path.parent.iterdir())
+            self.assertEqual(backups, ["integra.log", "integra.log.1.gz", "integra.log.2.gz"])
+            with gzip.open(path.parent / "integra.log.1.gz", "rt", encoding="utf-8") as f:
+                self.assertIn("linha", f.read())
+
+    def test_time_rotation(self):
+        """Testa a rotação por tempo."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "integra.log"
+            h = RotatingGzipFileHandler(path, max_bytes=0, backup_count=3, interval=3600)
+            h.setFormatter(logging.Formatter("%(message)s"))
+            h.emit(_record("antes"))
+            h.rollover_at = time.time() - 1
+            h.emit(_record("depois"))
+            h.close()
+            self.assertEqual(path.read_text(encoding="utf-8").strip(), "depois")
+            self.assertTrue(os.path.exists(str(path) + ".1.gz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
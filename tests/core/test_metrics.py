@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from integra_ai.core.metrics import Histogram, Registry, load_persisted, persist, record_usage, GEMINI_TOKENS
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_counter_and_histogram_exposition(self):
+        """Testa o formato de exposição Prometheus de contadores e histogramas."""
+        reg = Registry()
+        c = reg.counter("x_total", "Contador", ("result",))
+        c.inc(result="hit")
+        c.inc(2, result="hit")
+        h = reg.histogram("lat_seconds", "Latência", ("route",), buckets=(0.1, 1.0))
+        h.observe(0.05, route="/a")
+        h.observe(0.5, route="/a")
+        h.observe(5, route="/a")
+
+        text = reg.render()
+        self.assertIn("# TYPE x_total counter", text)
+        self.assertIn('x_total{result="hit"} 3', text)
+        self.assertIn('lat_seconds_bucket{route="/a",le="0.1"} 1', text)
+        self.assertIn('lat_seconds_bucket{route="/a",le="1.0"} 2', text)
+        self.assertIn('lat_seconds_bucket{route="/a",le="+Inf"} 3', text)
+        self.assertIn('lat_seconds_count{route="/a"} 3', text)
+
+    def test_histogram_timer_labels_filled_in_block(self):
+        """Testa que labels podem ser definidos dentro do bloco cronometrado."""
+        h = Registry().histogram("t_seconds", "t", ("status",))
+        with h.time(status="error") as labels:
+            labels["status"] = 200
+        self.assertEqual(h.count(status="200"), 1)
+        self.assertEqual(h.count(status="error"), 0)
+
+    def test_quantile_from_counts(self):
+        """Testa a estimativa de quantil a partir dos buckets."""
+        self.assertEqual(Histogram.quantile_from_counts((0.1, 1.0), [90, 9, 1], 0.95), 1.0)
+        self.assertEqual(Histogram.quantile_from_counts((0.1, 1.0), [0, 0, 0], 0.95), 0.0)
+
+    def test_record_usage_counts_tokens(self):
+        """Testa a contagem de tokens a partir de usageMetadata."""
+        before = GEMINI_TOKENS.value(model="m-test", kind="total")
+        record_usage("m-test", {"usageMetadata": {"promptTokenCount": 3, "totalTokenCount": 10}})
+        self.assertEqual(GEMINI_TOKENS.value(model="m-test", kind="total") - before, 10)
+
+    def test_persist_merges_across_runs(self):
+        """Testa que execuções sucessivas da CLI somam as métricas no arquivo."""
+        record_usage("m-persist", {"usageMetadata": {"totalTokenCount": 5}})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "metrics.json"
+            persist(path)
+            persist(path)
+            reg = load_persisted(path)
+            tokens = next(m for m in reg.metrics() if m.name == "integra_gemini_tokens_total")
+            self.assertEqual(tokens.value(model="m-persist", kind="total"), 2 * GEMINI_TOKENS.value(model="m-persist", kind="total"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import json
+import shutil
+import subprocess
+import tempfile
+import types
+import typing
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from integra_ai.core import openapi
+from integra_ai.core.openapi import parse_spec, render_openapi_client
+
+SPEC = {
+    "openapi": "3.0.3",
+    "info": {"title": "Petstore", "version": "1.0"},
+    "servers": [{"url": "https://pets.example.com/v1"}],
+    "paths": {
+        "/pets": {
+            "get": {
+                "operationId": "listPets",
+                "summary": "List all pets",
+                "parameters": [
+                    {"name": "limit", "in": "query", "schema": {"type": "integer"}},
+                    {"name": "class", "in": "query", "schema": {"type": "string"}},
+                ],
+                "responses": {"200": {"description": "ok", "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pets"}}}}},
+            },
+            "post": {
+                "operationId": "createPet",
+                "requestBody": {"required": True, "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+                "responses": {"201": {"description": "created"}},
+            },
+        },
+        "/pets/{petId}": {
+            "parameters": [{"name": "petId", "in": "path", "required": True, "schema": {"type": "string"}}],
+            "delete": {"responses": {"204": {"description": "gone"}}},
+        },
+    },
+    # Depois de "paths" de propósito: o parser em streaming precisa resolver refs adiante
+    "components": {
+        "securitySchemes": {"key": {"type": "apiKey", "in": "header", "name": "X-API-Key"}},
+        "schemas": {
+            "Pet": {
+                "type": "object",
+                "required": ["id"],
+                "properties": {
+                    "id": {"type": "integer"},
+                    "status": {"type": "string", "enum": ["available", "sold"]},
+                },
+            },
+            "Pets": {"type": "array", "items": {"$ref": "#/components/schemas/Pet"}},
+        },
+    },
+}
+
+
+class TestOpenAPI(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.cache = self.tmp / "cache"
+        self.json_path = self.tmp / "pets.json"
+        self.json_path.write_text(json.dumps(SPEC), encoding="utf-8")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _load_python(self, spec):
+        module = types.ModuleType("generated_client")
+        exec(compile("".join(render_openapi_client(spec, "python")), "generated_client.py", "exec"), module.__dict__)
+        return module
+
+    def test_parses_operations_schemas_and_auth(self):
+        """Testa a normalização: nomes das operações, parâmetros, auth e servidor."""
+        spec = parse_spec(self.json_path, cache_dir=self.cache)
+        self.assertEqual((spec.title, spec.base_url, spec.auth), ("Petstore", "https://pets.example.com/v1", "ApiKey"))
+        self.assertEqual(spec.api_key, {"name": "X-API-Key", "in": "header"})
+        ops = {op["name"]: op for op in spec.operations()}
+        self.assertEqual(set(ops), {"list_pets", "create_pet", "delete_pets_by_pet_id"})
+        self.assertEqual([p["ident"] for p in ops["list_pets"]["params"]], ["limit", "class_"])
+        self.assertEqual(ops["list_pets"]["returns"], {"k": "ref", "name": "Pets"})
+        self.assertEqual(ops["delete_pets_by_pet_id"]["params"][0]["in"], "path")
+        self.assertEqual(spec.schemas["Pet"]["kind"], "object")
+
+    def test_streamed_json_matches_yaml(self):
+        """Testa que o JSON lido em streaming e o YAML carregado inteiro geram o mesmo cliente."""
+        import yaml
+
+        yaml_path = self.tmp / "pets.yaml"
+        yaml_path.write_text(yaml.safe_dump(SPEC), encoding="utf-8")
+        from_json = parse_spec(self.json_path, cache_dir=self.cache)
+        from_yaml = parse_spec(yaml_path, cache_dir=self.cache)
+        self.assertEqual(list(from_json.operations()), list(from_yaml.operations()))
+        self.assertEqual("".join(render_openapi_client(from_json)), "".join(render_openapi_client(from_yaml)))
+
+    def test_cached_spec_is_not_parsed_again(self):
+        """Testa que a segunda leitura do mesmo arquivo vem do cache, sem parsear de novo."""
+        first = parse_spec(self.json_path, cache_dir=self.cache)
+        with patch.object(openapi, "_operation", side_effect=AssertionError("parsed again")):
+            second = parse_spec(self.json_path, cache_dir=self.cache)
+        self.assertEqual(second.ops_path, first.ops_path)
+        self.assertEqual(second.operation_count, 3)
+
+        # Conteúdo diferente, chave diferente
+        self.json_path.write_text(json.dumps({**SPEC, "info": {"title": "Outro"}}), encoding="utf-8")
+        self.assertEqual(parse_spec(self.json_path, cache_dir=self.cache).title, "Outro")
+
+    def test_rejects_non_openapi_documents(self):
+        """Testa que um JSON qualquer é rejeitado com ValueError."""
+        bad = self.tmp / "bad.json"
+        bad.write_text(json.dumps({"hello": "world"}), encoding="utf-8")
+        with self.assertRaises(ValueError):
+            parse_spec(bad, cache_dir=self.cache)
+
+    def test_generated_python_client_calls_api(self):
+        """Testa o cliente Python gerado: tipos, path com escape, query, corpo e API key."""
+        client = self._load_python(parse_spec(self.json_path, cache_dir=self.cache))
+        hints = typing.get_type_hints(client.list_pets)
+        self.assertEqual(hints["return"], list[client.Pet])
+
+        resp = MagicMock(status_code=200, content=b"[]", headers={"Content-Type": "application/json"})
+        resp.json.return_value = []
+        with patch.object(client, "TOKEN", "segredo"), patch.object(client._SESSION, "request", return_value=resp) as req:
+            self.assertEqual(client.list_pets(limit=5), [])
+            client.create_pet({"id": 1})
+            client.delete_pets_by_pet_id("a/b")
+
+        (method, url), kw = req.call_args_list[0]
+        self.assertEqual((method, url, kw["params"]), ("GET", "https://pets.example.com/v1/pets", {"limit": 5}))
+        self.assertEqual(kw["headers"]["X-API-Key"], "segredo")
+        self.assertEqual(req.call_args_list[1].kwargs["json"], {"id": 1})
+        self.assertEqual(req.call_args_list[2].args[1], "https://pets.example.com/v1/pets/a%2Fb")
+
+    @unittest.skipUnless(shutil.which("node"), "node não instalado")
+    def test_generated_node_client_is_valid(self):
+        """Testa que o cliente Node gerado passa no node --check e exporta as operações."""
+        out = self.tmp / "client.js"
+        out.write_text("".join(render_openapi_client(parse_spec(self.json_path, cache_dir=self.cache), "node")), encoding="utf-8")
+        subprocess.run(["node", "--check", str(out)], check=True)
+        exported = subprocess.run(
+            ["node", "-e", f"console.log(Object.keys(require({json.dumps(str(out))})).join(','))"],
+            check=True, capture_output=True, text=True,
+        ).stdout.strip()
+        self.assertEqual(exported, "listPets,createPet,deletePetsByPetId")
+
+
+if __name__ == "__main__":
+    unittest.main()
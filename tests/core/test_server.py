@@ -0,0 +1,42 @@
+import unittest
+from unittest.mock import patch
+
+from integra_ai.core import server
+from integra_ai.core.config import AppConfig
+from integra_ai.core.server import ServeOptions, gunicorn_settings, pick_server, waitress_settings
+
+
+class TestServeOptions(unittest.TestCase):
+
+    def test_config_defaults_and_overrides(self):
+        """Testa que as opções vêm do config e que só as informadas na CLI substituem."""
+        opts = ServeOptions.from_config(AppConfig(serve_port=9000, serve_threads=2), port=None, workers=3)
+        self.assertEqual((opts.port, opts.threads, opts.workers), (9000, 2, 3))
+
+        g = gunicorn_settings(opts)
+        self.assertEqual((g["bind"], g["workers"], g["worker_class"]), ("127.0.0.1:9000", 3, "gthread"))
+        self.assertIsInstance(g["timeout"], int)
+        self.assertEqual(waitress_settings(opts)["threads"], 6)
+
+        with patch("os.cpu_count", return_value=2):
+            self.assertEqual(ServeOptions(workers=0).worker_count, 5)
+
+    def test_pick_server(self):
+        """Testa a escolha do servidor e os erros para nomes inválidos ou servidor ausente."""
+        with self.assertRaises(ValueError):
+            pick_server("uwsgi")
+        with patch("importlib.util.find_spec", return_value=None):
+            with self.assertRaises(RuntimeError):
+                pick_server()
+            with self.assertRaises(RuntimeError):
+                pick_server("waitress")
+
+    def test_load_app(self):
+        """Testa a importação do app WSGI a partir de módulo:atributo."""
+        from web.app import app
+
+        self.assertIs(server.load_app("web.app:app"), app)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from integra_ai.core.metrics import COALESCED
+from integra_ai.core.singleflight import LeaseFlight, SingleFlight, flight_key, normalize_prompt
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_flight_key_ignores_whitespace(self):
+        """Testa que a chave de deduplicação ignora diferenças de espaços."""
+        self.assertEqual(normalize_prompt("  gerar\n cliente\t X "), "gerar cliente X")
+        self.assertEqual(flight_key("gerar  cliente", "m"), flight_key("gerar cliente\n", "m"))
+        self.assertNotEqual(flight_key("gerar cliente", "m"), flight_key("gerar cliente", "outro"))
+
+    def test_concurrent_threads_share_one_call(self):
+        """Testa que chamadas concorrentes com a mesma chave executam a função uma única vez."""
+        sf = SingleFlight()
+        calls = []
+        before = COALESCED.value(scope="thread")
+
+        def fn():
+            calls.append(1)
+            time.sleep(0.1)
+            return "resultado"
+
+        out = []
+        threads = [threading.Thread(target=lambda: out.append(sf.do("k", fn))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(out), [("resultado", False)] + [("resultado", True)] * 4)
+        self.assertEqual(COALESCED.value(scope="thread") - before, 4)
+        self.assertEqual(sf.do("k", lambda: "nova chamada"), ("nova chamada", False))
+
+    def test_errors_reach_every_waiter(self):
+        """Testa que a exceção do líder é entregue a quem aguardava."""
+        sf = SingleFlight()
+        errors = []
+
+        def fn():
+            time.sleep(0.05)
+            raise RuntimeError("falhou")
+
+        def call():
+            try:
+                sf.do("k", fn)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, ["falhou"] * 3)
+
+    def test_lease_shares_result_across_processes(self):
+        """Testa o lease em SQLite: instâncias independentes (como processos distintos) compartilham a chamada."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "flights.db"
+            calls = []
+
+            def fn():
+                calls.append(1)
+                time.sleep(0.2)
+                return {"code": "# ok"}
+
+            out = []
+            threads = [
+                threading.Thread(target=lambda: out.append(LeaseFlight(path, poll_interval=0.01).do("k", fn)))
+                for _ in range(3)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(sorted(shared for _, shared in out), [False, True, True])
+            self.assertTrue(all(result == {"code": "# ok"} for result, _ in out))
+            # Finished flights are not served to later callers
+            self.assertEqual(LeaseFlight(path).do("k", lambda: "novo"), ("novo", False))
+
+    def test_expired_lease_is_taken_over(self):
+        """Testa que um lease abandonado (líder morto) é assumido por outro chamador."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "flights.db"
+            dead = LeaseFlight(path, ttl=0.1)
+            dead._acquire("k", None)  # leader that never finishes
+            time.sleep(0.15)
+            self.assertEqual(LeaseFlight(path).do("k", lambda: 42), (42, False))
+
+    def test_running_lease_is_renewed(self):
+        """Testa que o líder renova o lease enquanto a chamada dura mais que o ttl."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "flights.db"
+            calls = []
+
+            def fn():
+                calls.append(1)
+                time.sleep(0.5)
+                return "gerado"
+
+            out = []
+            leader = threading.Thread(target=lambda: out.append(LeaseFlight(path, ttl=0.15).do("k", fn)))
+            leader.start()
+            time.sleep(0.3)  # past the original ttl
+            out.append(LeaseFlight(path, ttl=0.15, poll_interval=0.01).do("k", fn))
+            leader.join()
+
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(sorted(out), [("gerado", False), ("gerado", True)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from integra_ai.core import storage
+from integra_ai.core.generator import save_generated_code
+
+
+class TestCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name) / "integrations"
+        self.root.mkdir()
+        patcher = patch('integra_ai.core.storage.INTEGRATIONS_DIR', self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_existing_integrations_are_indexed_on_first_use(self):
+        """Testa que integrações já existentes em disco entram no catálogo automaticamente."""
+        d = self.root / "legado"
+        d.mkdir()
+        (d / "integration.json").write_text(json.dumps({"language": "node"}), encoding="utf-8")
+        (self.root / "sem-metadata").mkdir()
+
+        self.assertEqual(storage.list_integrations(), ["legado", "sem-metadata"])
+        items, total = storage.query_integrations(language="node")
+        self.assertEqual((total, [i["name"] for i in items]), (1, ["legado"]))
+
+    def test_save_keeps_catalog_in_sync_and_filters(self):
+        """Testa que salvar metadados/código atualiza o catálogo (filtros, paginação, ordenação)."""
+        for i in range(5):
+            lang = "python" if i % 2 == 0 else "node"
+            storage.save_integration_metadata(f"api-{i}", {"language": lang, "auth": "Bearer", "base_url": f"https://api{i}.test"})
+        save_generated_code("api-1", "node", "// old")
+        time.sleep(0.01)
+        save_generated_code("api-3", "node", "// new")
+
+        self.assertEqual(storage.list_integrations(), [f"api-{i}" for i in range(5)])
+        items, total = storage.query_integrations(language="python", limit=2, offset=1)
+        self.assertEqual(total, 3)
+        self.assertEqual([i["name"] for i in items], ["api-2", "api-4"])
+
+        recent, _ = storage.query_integrations(sort="recent", limit=2)
+        self.assertEqual([i["name"] for i in recent], ["api-3", "api-1"])
+        self.assertTrue(recent[0]["generated_file"].endswith(".js"))
+
+        only, _ = storage.query_integrations(base_url="https://api0.test")
+        self.assertEqual([i["name"] for i in only], ["api-0"])
+
+    def test_reindex_picks_up_manual_changes(self):
+        """Testa que reindex reconstrói o catálogo a partir do disco."""
+        storage.save_integration_metadata("a", {"language": "python"})
+        (self.root / "manual").mkdir()
+        self.assertEqual(storage.list_integrations(), ["a"])
+        self.assertEqual(storage.reindex(), 2)
+        self.assertEqual(storage.list_integrations(), ["a", "manual"])
+
+    def test_state_changes_on_every_write(self):
+        """Testa que a versão do catálogo muda a cada escrita e fica estável nas leituras."""
+        storage.save_integration_metadata("a", {"language": "python"})
+        first = storage.catalog_state()
+        storage.query_integrations()
+        self.assertEqual(storage.catalog_state(), first)
+        save_generated_code("a", "python", "x = 1\n")
+        version, modified = storage.catalog_state()
+        self.assertGreater(version, first[0])
+        self.assertGreaterEqual(modified, first[1])
+
+    def test_invalid_sort_rejected(self):
+        """Testa que uma ordenação inválida gera ValueError."""
+        with self.assertRaises(ValueError):
+            storage.query_integrations(sort="bogus")
+
+
+if __name__ == "__main__":
+    unittest.main()
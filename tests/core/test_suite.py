@@ -0,0 +1,143 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+from integra_ai.core.cassette import Cassette, cassette_session
+from integra_ai.core.storage import save_integration_metadata
+from integra_ai.core.suite import SuiteError, check_value, integrations_with_suites, load_suite, run_suites, to_junit
+
+
+class _Api(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/login" and payload.get("password") == "s3nha":
+            self._send(200, {"token": "tok-1", "user": {"id": 7}})
+        else:
+            self._send(401, {"error": "unauthorized"})
+
+    def do_GET(self):
+        if self.path.startswith("/slow"):
+            time.sleep(0.2)
+            return self._send(200, {"ok": True})
+        if self.headers.get("Authorization") != "Bearer tok-1":
+            return self._send(401, {"error": "unauthorized"})
+        if self.path == "/users/7":
+            return self._send(200, {"id": 7, "name": "Ana", "tags": ["admin"]})
+        self._send(404, {"error": "not found"})
+
+
+SUITE = {
+    "variables": {"password": "s3nha"},
+    "steps": [
+        {"id": "login", "method": "POST", "endpoint": "/login", "json": {"password": "${password}"},
+         "expect": {"status": 200, "json": {"token": {"type": "string"}}}, "extract": {"token": "token", "uid": "user.id"}},
+        {"id": "me", "endpoint": "/users/${login.uid}", "headers": {"Authorization": "Bearer ${login.token}"},
+         "expect": {"json": {"name": "Ana", "tags": {"contains": "admin"}}}},
+        {"id": "slow1", "endpoint": "/slow?n=1"},
+        {"id": "slow2", "endpoint": "/slow?n=2"},
+    ],
+}
+
+
+class TestSuite(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        patcher = patch("integra_ai.core.storage.INTEGRATIONS_DIR", self.tmp / "integrations")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.api = ThreadingHTTPServer(("127.0.0.1", 0), _Api)
+        threading.Thread(target=self.api.serve_forever, daemon=True).start()
+        self.addCleanup(self.api.server_close)
+        self.addCleanup(self.api.shutdown)
+        self.base = f"http://127.0.0.1:{self.api.server_address[1]}"
+
+    def _suite(self, name, data):
+        save_integration_metadata(name, {"name": name, "base_url": self.base})
+        path = self.tmp / "integrations" / name / "suite.json"
+        path.write_text(json.dumps(data), encoding="utf-8")
+        return load_suite(name)
+
+    def test_login_token_and_parallel_steps(self):
+        """Testa que o token do login alimenta o passo dependente e que passos independentes rodam em paralelo."""
+        suite = self._suite("api", SUITE)
+        self.assertEqual(suite.steps[1].needs, ["login"])
+
+        report = run_suites([suite], concurrency=4)
+        steps = {r["id"]: r for r in report["suites"][0]["steps"]}
+        self.assertTrue(report["ok"], steps)
+        self.assertEqual(report["totals"]["passed"], 4)
+        self.assertEqual(steps["login"]["extracted"], ["token", "uid"])
+        self.assertNotIn("tok-1", json.dumps(report))
+        self.assertLess(report["duration_s"], 0.39)
+
+    def test_failure_skips_dependents(self):
+        """Testa que um passo que falha pula os dependentes e gera JUnit com falha e pulo."""
+        data = json.loads(json.dumps(SUITE))
+        data["variables"]["password"] = "errada"
+        report = run_suites([self._suite("api", data), self._suite("outra", {"steps": SUITE["steps"][2:]})])
+
+        self.assertFalse(report["ok"])
+        api, outra = report["suites"]
+        self.assertEqual((api["passed"], api["failed"], api["skipped"]), (2, 1, 1))
+        self.assertEqual(outra["passed"], 2)
+        self.assertIn("expected [200], got 401", api["steps"][0]["failures"][0])
+
+        root = ET.fromstring(to_junit(report))
+        self.assertEqual((root.get("tests"), root.get("failures"), root.get("skipped")), ("6", "1", "1"))
+        self.assertEqual([ts.get("name") for ts in root], ["api", "outra"])
+        self.assertEqual(sorted(integrations_with_suites()), ["api", "outra"])
+
+    def test_invalid_suites(self):
+        """Testa a rejeição de ciclos, dependências desconhecidas e variáveis indefinidas."""
+        with self.assertRaisesRegex(SuiteError, "cycle"):
+            self._suite("api", {"steps": [{"id": "a", "needs": ["b"]}, {"id": "b", "endpoint": "/${a.x}"}]})
+        with self.assertRaisesRegex(SuiteError, "unknown"):
+            self._suite("api", {"steps": [{"id": "a", "needs": ["zzz"]}]})
+
+        report = run_suites([self._suite("api", {"steps": [{"id": "a", "endpoint": "/${nada}"}]})])
+        self.assertEqual(report["suites"][0]["steps"][0]["outcome"], "error")
+        self.assertIn("undefined variable", report["suites"][0]["steps"][0]["error"])
+
+    def test_replay_from_cassette(self):
+        """Testa que a suíte roda de novo a partir do cassete gravado, sem a API."""
+        suite = self._suite("api", SUITE)
+        tape = Cassette(self.tmp / "suite.json.gz", "record")
+        self.assertTrue(run_suites([suite], sessions={"api": cassette_session(tape)})["ok"])
+        tape.save()
+        self.api.shutdown()
+        self.api.server_close()
+
+        replay = {"api": cassette_session(Cassette(self.tmp / "suite.json.gz", "replay"))}
+        self.assertTrue(run_suites([suite], sessions=replay)["ok"])
+
+    def test_check_value(self):
+        """Testa os operadores das asserções de JSON."""
+        self.assertEqual(check_value("n", 3, {"gte": 1, "lt": 5, "type": "integer"}), [])
+        self.assertEqual(check_value("s", "abc", {"matches": "^a", "len": 3}), [])
+        self.assertEqual(len(check_value("x", 1, {"eq": 2, "type": "string"})), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
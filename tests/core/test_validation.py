@@ -0,0 +1,100 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from integra_ai.ai.repair import validated_code
+from integra_ai.core import validation
+from integra_ai.core.cache import ResponseCache
+from integra_ai.core.config import AppConfig
+from integra_ai.core.validation import ValidationError, run_checks, strip_fences, validate_code
+
+GOOD = "import json\n\n\ndef dump(x):\n    return json.dumps(x)\n"
+
+
+def _statuses(report):
+    return {c["name"]: c["status"] for c in report["checks"]}
+
+
+class TestStripFences(unittest.TestCase):
+
+    def test_picks_blocks_for_the_language(self):
+        """Testa a extração do bloco de código da linguagem pedida, descartando texto e blocos de shell."""
+        reply = "Aqui está:\n```bash\npip install requests\n```\n\n```python\nimport requests\n```\nPronto."
+        self.assertEqual(strip_fences(reply, "python"), "import requests\n")
+        self.assertEqual(strip_fences("```\nx = 1\n```", "node"), "x = 1\n")
+
+    def test_plain_and_truncated_replies(self):
+        """Testa que código sem cercas fica intacto e que uma cerca de abertura sem fechamento é removida."""
+        self.assertEqual(strip_fences(GOOD, "python"), GOOD)
+        self.assertEqual(strip_fences("```python\nx = 1\n", "python"), "x = 1\n")
+
+
+class TestRunChecks(unittest.TestCase):
+
+    def test_python_checks(self):
+        """Testa sintaxe, lint e importação de teste de código Python."""
+        self.assertEqual(run_checks(GOOD, "python")["status"], "passed")
+
+        broken = run_checks("def f(:\n    pass\n", "python")
+        self.assertEqual((broken["status"], _statuses(broken)), ("failed", {"syntax": "error"}))
+
+        lint = run_checks("import os\nx = 1\n", "python", import_check=False)
+        self.assertEqual((lint["status"], _statuses(lint)["lint"]), ("warning", "warn"))
+
+        raising = run_checks("raise RuntimeError('boom')\n", "python")
+        self.assertEqual(_statuses(raising)["import"], "error")
+        self.assertIn("boom", raising["checks"][-1]["message"])
+
+    def test_import_is_offline_and_missing_deps_only_warn(self):
+        """Testa que a importação de teste não acessa a rede e que dependência ausente é só aviso."""
+        net = run_checks("import socket\nsocket.create_connection(('example.com', 80))\n", "python")
+        self.assertEqual(_statuses(net)["import"], "error")
+        self.assertIn("network access is disabled", net["checks"][-1]["message"])
+
+        missing = run_checks("import integra_nao_existe\n\nintegra_nao_existe.run()\n", "python")
+        self.assertEqual(_statuses(missing)["import"], "warn")
+
+    @unittest.skipUnless(shutil.which("node"), "node não instalado")
+    def test_node_check(self):
+        """Testa a checagem de sintaxe JavaScript com node --check."""
+        self.assertEqual(run_checks("const x = 1;\nmodule.exports = { x };\n", "node")["status"], "passed")
+        self.assertEqual(run_checks("function (\n", "node")["status"], "failed")
+
+
+class TestValidatedCode(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = patch.object(validation, "_cache", ResponseCache(Path(tmp.name), ttl=0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cfg = AppConfig(validation_workers=0, validation_import=False)
+
+    def test_results_cached_by_content(self):
+        """Testa que o mesmo conteúdo não é validado de novo."""
+        with patch.object(validation, "run_checks", wraps=run_checks) as checks:
+            first = validate_code(GOOD, "python", self.cfg)
+            second = validate_code(GOOD, "python", self.cfg)
+        self.assertEqual(checks.call_count, 1)
+        self.assertEqual((first["cached"], second["cached"]), (False, True))
+        self.assertEqual(first["checks"], second["checks"])
+
+    def test_repair_reprompt_and_strict_mode(self):
+        """Testa a correção pela IA de código inválido e a recusa em salvar no modo estrito."""
+        self.cfg.validation_repair_attempts = 1
+        with patch("integra_ai.ai.providers.generate_code", return_value="```python\n" + GOOD + "```") as gen:
+            code, report = validated_code("```python\ndef f(:\n```", "python", cfg=self.cfg)
+        self.assertEqual((code, report["status"], report["repairs"]), (GOOD, "passed", 1))
+        self.assertIn("syntax: line 1", gen.call_args.args[0])
+        self.assertEqual(gen.call_args.kwargs["task"], "repair")
+
+        self.cfg.validation, self.cfg.validation_repair_attempts = "strict", 0
+        with self.assertRaises(ValidationError):
+            validated_code("def f(:\n", "python", cfg=self.cfg)
+
+
+if __name__ == "__main__":
+    unittest.main()
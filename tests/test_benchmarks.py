@@ -0,0 +1,34 @@
+import unittest
+
+from benchmarks.suite import compare, metric
+
+
+class TestBaselineCompare(unittest.TestCase):
+
+    def test_direction_follows_unit(self):
+        """Testa que latência maior e vazão menor que a baseline além do limite contam como regressão."""
+        baseline = {
+            "lat": metric(10.0, "ms"),
+            "rps": metric(100.0, "req/s"),
+            "ok": metric(10.0, "ms"),
+            "faster": metric(10.0, "ms"),
+        }
+        current = {
+            "lat": metric(13.0, "ms"),
+            "rps": metric(70.0, "req/s"),
+            "ok": metric(12.0, "ms"),
+            "faster": metric(2.0, "ms"),
+            "new": metric(1.0, "ms"),
+        }
+        found = {r["metric"]: r["change"] for r in compare(baseline, current, 0.25)}
+        self.assertEqual(found, {"lat": 0.3, "rps": -0.3})
+
+    def test_metric_threshold_loosens_comparison(self):
+        """Testa que a tolerância própria de uma métrica ruidosa prevalece sobre a global quando maior."""
+        baseline = {"p99": metric(10.0, "ms")}
+        self.assertEqual(compare(baseline, {"p99": metric(18.0, "ms", threshold=1.0)}, 0.25), [])
+        self.assertEqual(len(compare(baseline, {"p99": metric(25.0, "ms", threshold=1.0)}, 0.25)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+class TestCliStartup(unittest.TestCase):
+
+    def test_import_is_lazy_and_side_effect_free(self):
+        """Testa que importar a CLI não carrega dependências pesadas nem cria diretórios."""
+        code = (
+            "import sys, integra_ai.cli; "
+            "print(','.join(m for m in ('requests', 'rich.console', 'dotenv', 'sqlite3', 'integra_ai.ai.gemini') if m in sys.modules))"
+        )
+        with tempfile.TemporaryDirectory() as cwd:
+            out = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True)
+            self.assertEqual(out.stdout.strip(), "")
+            self.assertEqual(list(Path(cwd).iterdir()), [])
+
+    def test_list_in_empty_project_creates_nothing(self):
+        """Testa que `integra list` sem integrações não cria .integra/, integrations/ nem logs/."""
+        with tempfile.TemporaryDirectory() as cwd:
+            out = subprocess.run([sys.executable, "-m", "integra_ai.cli", "list"], cwd=cwd, capture_output=True, text=True)
+            self.assertEqual(out.returncode, 0)
+            self.assertEqual(list(Path(cwd).iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
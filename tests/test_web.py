@@ -0,0 +1,92 @@
+import gzip
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from integra_ai.core.generator import save_generated_code
+from integra_ai.core.storage import save_integration_metadata
+from web.app import app
+
+CODE = "".join(f"def f{i}():\n    return {i}\n\n\n" for i in range(100))
+
+
+class TestHttpCaching(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = patch("integra_ai.core.storage.INTEGRATIONS_DIR", Path(tmp.name) / "integrations")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = app.test_client()
+        path = save_generated_code("api", "python", CODE)
+        save_integration_metadata("api", {"name": "api", "language": "python", "generated_file": str(path)})
+
+    def test_list_not_modified_until_catalog_changes(self):
+        """Testa que o polling da lista recebe 304 sem mudanças e 200 depois de uma gravação."""
+        first = self.client.get("/api/integrations")
+        etag = first.headers["ETag"]
+        self.assertEqual(first.headers["Cache-Control"], "no-cache")
+
+        again = self.client.get("/api/integrations", headers={"If-None-Match": etag})
+        self.assertEqual((again.status_code, again.data), (304, b""))
+        other_page = self.client.get("/api/integrations?limit=1", headers={"If-None-Match": etag})
+        self.assertEqual(other_page.status_code, 200)
+
+        save_integration_metadata("outra", {"name": "outra"})
+        changed = self.client.get("/api/integrations", headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json["total"], 2)
+
+    def test_code_endpoint_compression_and_ranges(self):
+        """Testa o download do código: gzip negociado, 304 pelo hash e Range sem compressão."""
+        full = self.client.get("/api/integrations/api/code", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual((full.status_code, full.headers["Content-Encoding"]), (200, "gzip"))
+        self.assertEqual(gzip.decompress(full.data).decode(), CODE)
+        self.assertIn("Accept-Encoding", full.headers["Vary"])
+
+        cached = self.client.get("/api/integrations/api/code", headers={"If-None-Match": full.headers["ETag"]})
+        self.assertEqual(cached.status_code, 304)
+
+        part = self.client.get("/api/integrations/api/code", headers={"Range": "bytes=0-7", "Accept-Encoding": "gzip"})
+        self.assertEqual((part.status_code, part.data), (206, b"def f0()"))
+        self.assertNotIn("Content-Encoding", part.headers)
+
+        plain = self.client.get("/api/integrations/api/code?version=1")
+        self.assertEqual(plain.get_data(as_text=True), CODE)
+        self.assertEqual(self.client.get("/api/integrations/api/code?version=7").status_code, 404)
+        self.assertEqual(self.client.get("/api/integrations/nenhuma/code").status_code, 404)
+
+    def test_index_validators(self):
+        """Testa ETag, compressão e 304 na página do dashboard."""
+        page = self.client.get("/", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(page.headers["Content-Encoding"], "gzip")
+        self.assertIn(b"<html", gzip.decompress(page.data))
+        self.assertEqual(self.client.get("/", headers={"If-None-Match": page.headers["ETag"]}).status_code, 304)
+
+
+
+class TestGenerateRequests(unittest.TestCase):
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    @patch("web.app.get_job_queue")
+    def test_cache_flag_must_be_boolean(self, mock_queue):
+        """Testa que "cache" só aceita booleano JSON: strings como "false" recebem 400 em vez de ligar o cache."""
+        mock_queue.return_value.enqueue_or_join.return_value = ("job-1", False)
+        for value in ("false", "0", 0):
+            resp = self.client.post("/api/generate", json={"prompt": "p", "cache": value})
+            self.assertEqual((resp.status_code, resp.json["error"]), (400, "cache must be a boolean"))
+            resp = self.client.post("/api/generate/batch", json={"items": ["p"], "cache": value})
+            self.assertEqual(resp.status_code, 400)
+        mock_queue.return_value.enqueue_or_join.assert_not_called()
+
+        self.client.post("/api/generate", json={"prompt": "p", "cache": False})
+        payload = mock_queue.return_value.enqueue_or_join.call_args.args[1]
+        self.assertIs(payload["cache"], False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,16 +1,129 @@
 from __future__ import annotations
-from flask import Flask, jsonify, request, render_template # Importar render_template
+import hashlib
+import json
+import time
+from functools import lru_cache, partial
+from flask import Flask, Response, g, jsonify, request, render_template, send_file, stream_with_context, url_for # Importar render_template
 from dotenv import load_dotenv
 from pathlib import Path
 
-from integra_ai.core.storage import list_integrations, save_integration_metadata
-from integra_ai.core.generator import save_generated_code, render_python_client
-from integra_ai.ai.gemini import generate_code
+from integra_ai.core import artifacts, storage
+from integra_ai.core.storage import catalog_state, load_integration_metadata, query_integrations, save_integration_metadata, slugify
+from integra_ai.core.artifacts import ai_inputs, find_unchanged
+from integra_ai.core.compress import COMPRESSIBLE_TYPES, compress, negotiate
+from integra_ai.core.generator import GeneratedCodeWriter
+from integra_ai.core.validation import strip_fences
+from integra_ai.core.cache import cache_key
+from integra_ai.core.jobs import get_job_queue
+from integra_ai.core.singleflight import flight_key
+from integra_ai.ai.providers import stream_generate_code
+from integra_ai.ai.batch import normalize_job, run_batch
+from integra_ai.ai.keys import key_pool
+from integra_ai.ai.routing import get_router
+from integra_ai.ai.repair import validate_saved
 from integra_ai.core.config import AppConfig
+from integra_ai.core.metrics import HTTP_LATENCY, REGISTRY
 
 load_dotenv()
 
 app = Flask(__name__)
+# Corpos maiores recebem 413 antes de chegar às rotas (vale para `integra serve` e o servidor de desenvolvimento)
+app.config["MAX_CONTENT_LENGTH"] = AppConfig.cached().web_max_request_bytes
+
+
+@app.before_request
+def _start_timer():
+    g._started = time.perf_counter()
+
+
+@app.after_request
+def _record_latency(response):
+    # Para respostas em streaming mede o tempo até os cabeçalhos
+    started = g.pop("_started", None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_LATENCY.observe(time.perf_counter() - started, route=route, method=request.method, status=response.status_code)
+    return response
+
+
+# Variantes de um mesmo recurso diferem só na codificação; o validador de qualquer uma vale
+_CODINGS = ("", "-gzip", "-br")
+_CODE_TYPES = {".py": "text/x-python", ".js": "application/javascript"}
+
+
+def _is_fresh(etag: str, last_modified: float | None = None) -> bool:
+    # If-None-Match tem precedência; If-Modified-Since só vale sem ele
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if request.if_none_match:
+        return any(request.if_none_match.contains_weak(etag + c) for c in _CODINGS)
+    if request.if_modified_since and last_modified:
+        return int(last_modified) <= request.if_modified_since.timestamp()
+    return False
+
+
+def _not_modified(etag: str, weak: bool = False, cache_control: str = "no-cache") -> Response:
+    resp = Response(status=304)
+    resp.set_etag(etag, weak=weak)
+    resp.headers["Cache-Control"] = cache_control
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+@app.after_request
+def _http_caching(response):
+    # Validadores para respostas pequenas (status de job, index.html) e compressão negociada
+    if (
+        request.method in ("GET", "HEAD") and response.status_code == 200 and not response.is_streamed
+        and not response.direct_passthrough and response.mimetype in ("application/json", "text/html")
+        and response.get_etag()[0] is None
+    ):
+        response.add_etag(weak=True)
+        response.cache_control.no_cache = True
+        etag = response.get_etag()[0]
+        if _is_fresh(etag):
+            return _not_modified(etag, weak=True)
+    return _compress(response)
+
+
+def _compress(response):
+    if (
+        response.status_code != 200 or response.is_streamed or response.direct_passthrough
+        or "Content-Encoding" in response.headers or response.mimetype not in COMPRESSIBLE_TYPES
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    cfg = AppConfig.cached()
+    data = response.get_data()
+    encoding = negotiate(request.accept_encodings) if len(data) >= cfg.web_compress_min_bytes else None
+    if encoding is None:
+        return response
+    response.set_data(compress(data, encoding, cfg.web_compress_level))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag is not None:
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+    return response
+
+
+@app.get("/metrics")
+def metrics():
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.get("/api/keys")
+def api_keys():
+    # Uso por chave do Gemini no minuto corrente (chaves mascaradas)
+    try:
+        return jsonify({"keys": key_pool().snapshot()})
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+
+
+@app.get("/api/models")
+def api_models():
+    # Latência p95 e taxa de erro por modelo na janela móvel usada pelo roteador
+    return jsonify({"models": get_router().snapshot()})
 
 
 @app.get("/")
@@ -21,28 +134,203 @@ def index():
 
 @app.get("/api/integrations")
 def api_list():
-    return jsonify({"items": list_integrations()})
+    # Paginação/filtros servidos pelo catálogo (.integra/catalog.db), sem varrer o disco
+    args = request.args
+    # O ETag vem do contador de escritas do catálogo: um polling sem mudanças responde 304 sem consultar a lista
+    version, modified = catalog_state()
+    etag = hashlib.sha256(f"{storage.INTEGRATIONS_DIR}|{version}|{request.query_string.decode()}".encode()).hexdigest()[:32]
+    if _is_fresh(etag, modified):
+        return _not_modified(etag, weak=True)
+    try:
+        limit = args.get("limit", type=int)
+        offset = args.get("offset", default=0, type=int)
+        entries, total = query_integrations(
+            language=args.get("language"),
+            auth=args.get("auth"),
+            base_url=args.get("base_url"),
+            sort=args.get("sort", "name"),
+            limit=limit,
+            offset=offset,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    resp = jsonify({"items": [e["name"] for e in entries], "entries": entries, "total": total, "offset": offset, "limit": limit})
+    resp.set_etag(etag, weak=True)
+    resp.last_modified = modified or None
+    resp.cache_control.no_cache = True
+    return resp
+
+
+@app.get("/api/integrations/<name>/code")
+def api_code(name: str):
+    # Código gerado (atual ou ?version=N, -1 ou prefixo do hash). O ETag é o hash do conteúdo;
+    # Range é atendido sem compressão, e os arquivos pedidos inteiros saem comprimidos
+    d = storage.INTEGRATIONS_DIR / slugify(name)
+    if not (d / "integration.json").exists():
+        return jsonify({"error": "integration not found"}), 404
+    version = request.args.get("version")
+    try:
+        entry = artifacts.resolve(name, version)
+        path, digest, created = d / Path(entry["file"]).name, entry["sha256"], entry.get("created")
+    except LookupError as e:
+        generated = load_integration_metadata(name).get("generated_file")
+        if version is not None or not generated:
+            return jsonify({"error": str(e)}), 404
+        # Integrações anteriores ao histórico de versões
+        path = d / Path(generated).name
+        digest, created = (artifacts.file_digest(path), path.stat().st_mtime) if path.exists() else (None, None)
+    if digest is None or not path.exists():
+        return jsonify({"error": "generated file not found"}), 404
+
+    # Uma versão pedida pelo hash nunca muda; a atual precisa ser revalidada
+    cache_control = "public, max-age=31536000, immutable" if version and not version.lstrip("-").isdigit() else "no-cache"
+    if _is_fresh(digest, created):
+        return _not_modified(digest, cache_control=cache_control)
+    mimetype = _CODE_TYPES.get(path.suffix, "text/plain")
+    cfg = AppConfig.cached()
+    encoding = None
+    if request.range is None and path.stat().st_size >= cfg.web_compress_min_bytes:
+        encoding = negotiate(request.accept_encodings)
+    if encoding is None:
+        resp = send_file(path, mimetype=mimetype, conditional=True, etag=digest, last_modified=created, max_age=None)
+    else:
+        resp = Response(_compressed_file(str(path), digest, encoding, cfg.web_compress_level), mimetype=mimetype)
+        resp.headers["Content-Encoding"] = encoding
+        resp.set_etag(f"{digest}-{encoding}")
+        resp.last_modified = created
+    resp.headers["Cache-Control"] = cache_control
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+@lru_cache(maxsize=64)
+def _compressed_file(path: str, digest: str, encoding: str, level: int) -> bytes:
+    # Arquivos gerados são endereçados por conteúdo: o hash identifica a versão comprimida
+    return compress(Path(path).read_bytes(), encoding, level)
 
 
 @app.post("/api/generate")
 def api_generate():
+    # Só enfileira: a geração roda nos workers (`integra worker`), fora do processo web
     data = request.get_json(silent=True) or {}
     prompt = data.get("prompt")
-    name = data.get("name")
-    # Obter o modelo da requisição ou usar "gemini-1.5-flash" como padrão
-    model_to_use = data.get("model", "gemini-1.5-flash")
+    if not prompt:
+        return jsonify({"error": "prompt is required"}), 400
+    try:
+        priority = int(data.get("priority", 0))
+        timeout = float(data.get("timeout") or 0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "priority and timeout must be numbers"}), 400
+    # Só booleano JSON: a string "false" seria verdadeira
+    cache = data.get("cache", True)
+    if not isinstance(cache, bool):
+        return jsonify({"error": "cache must be a boolean"}), 400
+
+    cfg = AppConfig.cached()
+    payload = {
+        "prompt": prompt,
+        "name": data.get("name") or "integration",
+        # Modelo da requisição ou model_default do config ("auto": roteado por tamanho do prompt)
+        "model": data.get("model") or cfg.model_default,
+        "language": cfg.language,
+        "cache": cache,
+        "force": bool(data.get("force", False)),
+    }
+    # Pedidos idênticos (prompt normalizado, modelo, nome, linguagem) em andamento compartilham o mesmo job
+    dedupe_key = cache_key(flight_key(prompt, payload["model"]), payload["name"], payload["language"])
+    job_id, coalesced = get_job_queue().enqueue_or_join(
+        "generate", payload, dedupe_key,
+        priority=priority, timeout=timeout or cfg.job_timeout, max_attempts=cfg.job_max_attempts,
+    )
+    status_url = url_for("api_job", job_id=job_id)
+    body = {"job_id": job_id, "status": "queued", "status_url": status_url, "coalesced": coalesced}
+    return jsonify(body), 202, {"Location": status_url}
+
+
+@app.get("/api/jobs/<job_id>")
+def api_job(job_id: str):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "job not found"}), 404
+    keys = ("id", "kind", "status", "priority", "attempts", "max_attempts", "result", "error", "created_at", "started_at", "finished_at")
+    return jsonify({k: job[k] for k in keys})
+
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route("/api/generate/stream", methods=["GET", "POST"])
+def api_generate_stream():
+    # GET com query string para uso direto via EventSource; POST com JSON
+    data = (request.get_json(silent=True) if request.method == "POST" else None) or request.args.to_dict()
+    prompt = data.get("prompt")
+    name = data.get("name") or "integration"
     if not prompt:
         return jsonify({"error": "prompt is required"}), 400
 
-    cfg = AppConfig.load()
-    integ_name = name or "integration"
-    code = None
+    cfg = AppConfig.cached()
+    model_to_use = data.get("model") or cfg.model_default
+    inputs = ai_inputs(prompt, model_to_use, cfg.language)
+    force = str(data.get("force", "")).lower() in ("1", "true", "yes")
+
+    def stream():
+        unchanged = None if force else find_unchanged(name, inputs)
+        if unchanged is not None:
+            yield _sse("done", {"saved_to": str(unchanged), "unchanged": True})
+            return
+        try:
+            with GeneratedCodeWriter(name, cfg.language, inputs, clean=partial(strip_fences, language=cfg.language)) as w:
+                for chunk in stream_generate_code(prompt, model=model_to_use):
+                    w.write(chunk)
+                    yield _sse("chunk", {"text": chunk})
+        except Exception as e:  # noqa: BLE001 - reported to the client as an SSE event
+            yield _sse("error", {"error": str(e)})
+            return
+        meta = {"generated_file": str(w.path), "language": cfg.language}
+        done = {"saved_to": str(w.path)}
+        report = validate_saved(w.path, cfg.language, cfg)
+        if report is not None:
+            meta["validation"] = report
+            done["validation"] = report["status"]
+        save_integration_metadata(name, meta)
+        yield _sse("done", done)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/generate/batch")
+def api_generate_batch():
+    data = request.get_json(silent=True) or {}
     try:
-        code = generate_code(prompt, model=model_to_use)  # Passar o modelo explicitamente
-    except Exception as e:  # fallback offline
-        # Produce a minimal client template as a stub
-        code = render_python_client(base_url="https://httpbin.org", token=None)
-    path = save_generated_code(integ_name, cfg.language, code)
-    save_integration_metadata(integ_name, {"generated_file": str(path), "language": cfg.language})
-    return jsonify({"saved_to": str(path)})
+        jobs = [normalize_job(item) for item in data.get("items") or []]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not jobs:
+        return jsonify({"error": "items is required"}), 400
+    if data.get("engine") not in (None, "thread", "async"):
+        return jsonify({"error": "engine must be 'thread' or 'async'"}), 400
+    cache = data.get("cache", True)
+    if not isinstance(cache, bool):
+        return jsonify({"error": "cache must be a boolean"}), 400
+
+    cfg = AppConfig.cached()
+
+    def stream():
+        # Uma linha JSON (NDJSON) por item, na ordem em que terminam
+        for res in run_batch(
+            jobs,
+            workers=cfg.batch_workers,
+            per_model=cfg.batch_per_model_concurrency,
+            rpm=cfg.gemini_rpm,
+            language=cfg.language,
+            cache=cache,
+            engine=data.get("engine") or cfg.batch_engine,
+        ):
+            yield json.dumps(res) + "\n"
+
+    return Response(stream_with_context(stream()), mimetype="application/x-ndjson")